@@ -1,7 +1,14 @@
+import argparse
+import json
 import os
-import requests
-import getpass
 import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
 
 # Prompt for API URL and token if not set
 API_URL = "http://localhost:8080/api/"
@@ -13,191 +20,172 @@ HEADERS = {
     "Accept": "application/json",
 }
 
+SERVICENOW_GROUPS_ENDPOINT = "plugins/service_now_groups/servicenowgroups/"
+
+# Concurrent requests per wave and objects per bulk POST, overridden from the command line
+WORKERS = 8
+BATCH_SIZE = 200
+
+# Objects per list GET when indexing existing objects, capped by the server's MAX_PAGE_SIZE
+PAGE_SIZE = 1000
+
+# Checkpoint file recording completed waves and created object IDs, and the
+# minimum number of seconds between writes while a wave is in progress
+CHECKPOINT_PATH = ".synthetic_data_checkpoint.json"
+CHECKPOINT_INTERVAL = 5
+
+# One pooled session shared by every worker thread
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+
+
+def configure_session(workers):
+    """Size the session's connection pool so every worker keeps its connection alive."""
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=3)
+    SESSION.mount("http://", adapter)
+    SESSION.mount("https://", adapter)
+
+
+class Throughput:
+    """Objects, requests and time spent per wave, printed as a summary at the end."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.waves = []
+
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def record(self, name, objects, created, updated, requests_made, seconds):
+        self.waves.append((name, objects, created, updated, requests_made, seconds))
+
+    def print_summary(self):
+        print(f"\n{'Wave':<20} {'Objects':>8} {'Created':>8} {'Updated':>8} {'Requests':>9} {'Seconds':>9} {'Objects/s':>10}")
+        for name, objects, created, updated, requests_made, seconds in self.waves:
+            print(f"{name:<20} {objects:>8} {created:>8} {updated:>8} {requests_made:>9} {seconds:>9.2f} {objects / max(seconds, 1e-9):>10.1f}")
+        totals = [sum(wave[column] for wave in self.waves) for column in range(1, 6)]
+        objects, created, updated, requests_made, seconds = totals
+        print(f"{'Total':<20} {objects:>8} {created:>8} {updated:>8} {requests_made:>9} {seconds:>9.2f} {objects / max(seconds, 1e-9):>10.1f}")
+
+
+THROUGHPUT = Throughput()
+
+
+class Checkpoint:
+    """
+    Completed waves and created object IDs of a run, so that ``--resume`` can skip them.
+
+    The file is replaced atomically, through a temporary file and ``os.replace``,
+    so an interrupted write never leaves a truncated checkpoint behind.
+    """
+
+    def __init__(self, path, run_settings):
+        self.path = path
+        self.run_settings = run_settings
+        self.completed = []
+        self.ids = {}
+        self.last_save = 0.0
+
+    def load(self):
+        if not os.path.exists(self.path):
+            print(f"No checkpoint found at {self.path}, starting from the beginning")
+            return
+        with open(self.path) as checkpoint_file:
+            data = json.load(checkpoint_file)
+        if data["settings"] != self.run_settings:
+            raise SystemExit(f"Checkpoint {self.path} was written with different settings: {data['settings']}")
+        self.completed = data["completed"]
+        self.ids = data["ids"]
+        print(f"Resuming from {self.path}: {len(self.completed)} waves complete")
+
+    def created(self):
+        """Return the recorded objects in the form ``submit_wave`` keeps them."""
+        return {wave: {key: {"id": pk} for key, pk in ids.items()} for wave, ids in self.ids.items()}
+
+    def add(self, wave_name, objects):
+        self.ids.setdefault(wave_name, {}).update((key, obj["id"]) for key, obj in objects.items())
+        self.save()
+
+    def complete(self, wave_name):
+        self.completed.append(wave_name)
+        self.save(force=True)
+
+    def save(self, force=False):
+        if not force and time.monotonic() - self.last_save < CHECKPOINT_INTERVAL:
+            return
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump({"settings": self.run_settings, "completed": self.completed, "ids": self.ids}, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temp_path, self.path)
+        self.last_save = time.monotonic()
+
+
+def api_url(endpoint):
+    return f"{API_URL.rstrip('/')}/{endpoint.lstrip('/')}"
+
+
 def api_post(endpoint, data):
-    url = f"{API_URL.rstrip('/')}/{endpoint.lstrip('/')}"
-    resp = requests.post(url, json=data, headers=HEADERS)
+    url = api_url(endpoint)
+    THROUGHPUT.count_request()
+    resp = SESSION.post(url, json=data)
     if resp.status_code not in (200, 201):
         print(f"Error POST {url}: {resp.status_code} {resp.text}")
     return resp.json() if resp.ok else None
 
+
+def api_patch(url, data):
+    THROUGHPUT.count_request()
+    resp = SESSION.patch(url, json=data)
+    if not resp.ok:
+        print(f"Error PATCH {url}: {resp.status_code} {resp.text}")
+    return resp.json() if resp.ok else None
+
+
 def api_get(endpoint, params=None):
-    url = f"{API_URL.rstrip('/')}/{endpoint.lstrip('/')}"
-    resp = requests.get(url, params=params, headers=HEADERS)
+    url = api_url(endpoint)
+    THROUGHPUT.count_request()
+    resp = SESSION.get(url, params=params)
     return resp.json() if resp.ok else None
 
-def get_or_create(endpoint, unique_fields, data):
-    params = {k: data[k] for k in unique_fields}
-    existing = api_get(endpoint, params)
-    if existing and existing.get('count', 0) > 0:
-        return existing['results'][0]
-    return api_post(endpoint, data)
-
-def ensure_location_types():
-    # Ensure required location types exist, create if missing, with correct parent relationships
-    # 1. Geo Region (no parent, nestable)
-    geo_region = get_or_create(
-        "dcim/location-types/",
-        ["slug"],
-        {"name": "Geo Region", "slug": "geo-region", "description": "Top-level region", "nestable": True}
-    )
-    if not geo_region:
-        print("Failed to create or fetch LocationType: Geo Region")
-        return {}
-    # 2. Country (parent: Geo Region, not nestable)
-    country = get_or_create(
-        "dcim/location-types/",
-        ["slug"],
-        {"name": "Country", "slug": "country", "description": "Country within a region", "nestable": False, "parent": geo_region["id"]}
-    )
-    if not country:
-        print("Failed to create or fetch LocationType: Country")
-        return {}
-    # PATCH if parent or nestable is wrong
-    if (country.get("parent") != geo_region["id"] or country.get("nestable", True)):
-        patch_url = country["url"]
-        requests.patch(patch_url, json={"parent": geo_region["id"], "nestable": False}, headers=HEADERS)
-        country = api_get(f"dcim/location-types/{country['id']}/")
-    # 3. Campus (parent: Country, not nestable, allows devices)
-    campus = get_or_create(
-        "dcim/location-types/",
-        ["slug"],
-        {"name": "Campus", "slug": "campus", "description": "Campus or site within a country", "nestable": False, "parent": country["id"], "content_types": ["dcim.device"]}
-    )
-    if not campus:
-        print("Failed to create or fetch LocationType: Campus")
-        return {}
-    if (campus.get("parent") != country["id"] or campus.get("nestable", True) or "dcim.device" not in campus.get("content_types", [])):
-        patch_url = campus["url"]
-        requests.patch(patch_url, json={"parent": country["id"], "nestable": False, "content_types": ["dcim.device"]}, headers=HEADERS)
-        campus = api_get(f"dcim/location-types/{campus['id']}/")
-    return {"geo-region": geo_region["id"], "country": country["id"], "campus": campus["id"]}
 
-def ensure_dummy_site():
-    # Create a dummy site for top-level locations if it doesn't exist
-    site_data = {
-        "name": "Synthetic Data Root Site",
-        "slug": "synthetic-root-site",
-        "status": "active",
-        "description": "Dummy site for synthetic hierarchical locations"
-    }
-    site = get_or_create("dcim/sites/", ["slug"], site_data)
-    if not site:
-        raise Exception("Could not create or fetch dummy Site for top-level Locations.")
-    return site["id"]
-
-def ensure_device_infrastructure():
-    """Create manufacturers, device types, device roles, and statuses needed for devices."""
-    
-    # Create manufacturers
-    manufacturers = {
-        "cisco": {"name": "Cisco", "slug": "cisco"},
-        "arista": {"name": "Arista Networks", "slug": "arista"},
-    }
-    
-    manufacturer_objs = {}
-    for slug, data in manufacturers.items():
-        obj = get_or_create("dcim/manufacturers/", ["slug"], data)
-        if obj:
-            manufacturer_objs[slug] = obj
-        else:
-            print(f"Failed to create manufacturer: {data['name']}")
-    
-    # Create device roles based on function codes
-    device_roles = {
-        "acc": {"name": "Campus Access Switch", "slug": "acc", "color": "4caf50"},
-        "cor": {"name": "Campus Core Switch", "slug": "cor", "color": "2196f3"},
-        "wan": {"name": "Campus WAN Switch", "slug": "wan", "color": "ff9800"},
-        "lea": {"name": "Data Center Leaf Switch", "slug": "lea", "color": "9c27b0"},
-        "spn": {"name": "Data Center Spine Switch", "slug": "spn", "color": "f44336"},
-        "fw": {"name": "Firewall", "slug": "fw", "color": "e91e63"},
-        "lb": {"name": "Load Balancer", "slug": "lb", "color": "673ab7"},
-    }
-    
-    role_objs = {}
-    for slug, data in device_roles.items():
-        obj = get_or_create("dcim/device-roles/", ["slug"], data)
-        if obj:
-            role_objs[slug] = obj
-        else:
-            print(f"Failed to create device role: {data['name']}")
-    
-    # Create device types with model numbers
-    device_types = {
-        # Cisco Campus (all campus devices)
-        "catalyst-9300": {
-            "manufacturer": manufacturer_objs.get("cisco", {}).get("id"),
-            "model": "Catalyst 9300",
-            "slug": "catalyst-9300",
-            "part_number": "C9300-48UXM",
-            "u_height": 1,
-            "is_full_depth": False,
-        },
-        "catalyst-9500": {
-            "manufacturer": manufacturer_objs.get("cisco", {}).get("id"),
-            "model": "Catalyst 9500",
-            "slug": "catalyst-9500",
-            "part_number": "C9500-48Y4C",
-            "u_height": 1,
-            "is_full_depth": True,
-        },
-        "asr-1000": {
-            "manufacturer": manufacturer_objs.get("cisco", {}).get("id"),
-            "model": "ASR 1000",
-            "slug": "asr-1000",
-            "part_number": "ASR1001-X",
-            "u_height": 1,
-            "is_full_depth": True,
-        },
-        # Data Center - Mix of Cisco and Arista
-        "nexus-9000": {
-            "manufacturer": manufacturer_objs.get("cisco", {}).get("id"),
-            "model": "Nexus 9000",
-            "slug": "nexus-9000",
-            "part_number": "N9K-C93180YC-EX",
-            "u_height": 1,
-            "is_full_depth": True,
-        },
-        "arista-7280": {
-            "manufacturer": manufacturer_objs.get("arista", {}).get("id"),
-            "model": "7280SR",
-            "slug": "arista-7280",
-            "part_number": "DCS-7280SR4K-48C6",
-            "u_height": 1,
-            "is_full_depth": True,
-        },
-        "arista-7508": {
-            "manufacturer": manufacturer_objs.get("arista", {}).get("id"),
-            "model": "7508",
-            "slug": "arista-7508",
-            "part_number": "DCS-7508",
-            "u_height": 8,
-            "is_full_depth": True,
-        },
+# One dependency wave of the object graph. ``objects`` maps a key to the payload of
+# one object; payload values may be ``(wave, key)`` references to objects of earlier
+# waves, or of the same wave, which are replaced by their IDs before submission.
+Wave = namedtuple("Wave", ["name", "endpoint", "unique_fields", "bulk", "objects"])
+
+
+def references(payload):
+    for value in payload.values():
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, tuple):
+                yield item
+
+
+def resolve(payload, created):
+    def resolve_value(value):
+        if isinstance(value, tuple):
+            return created[value[0]][value[1]]["id"]
+        if isinstance(value, list):
+            return [resolve_value(item) for item in value]
+        return value
+
+    return {field: resolve_value(value) for field, value in payload.items()}
+
+
+def build_location_types():
+    return {
+        "geo-region": {"name": "Geo Region", "slug": "geo-region", "description": "Top-level region", "nestable": True},
+        "country": {"name": "Country", "slug": "country", "description": "Country within a region", "nestable": False, "parent": ("location-types", "geo-region")},
+        "campus": {"name": "Campus", "slug": "campus", "description": "Campus or site within a country", "nestable": False, "parent": ("location-types", "country"), "content_types": ["dcim.device"]},
     }
-    
-    device_type_objs = {}
-    for slug, data in device_types.items():
-        if data.get("manufacturer"):  # Only create if manufacturer exists
-            obj = get_or_create("dcim/device-types/", ["slug"], data)
-            if obj:
-                device_type_objs[slug] = obj
-            else:
-                print(f"Failed to create device type: {data['model']}")
-    
-    return manufacturer_objs, role_objs, device_type_objs
-
-def create_hierarchical_locations():
-    # Ensure location types exist and get their IDs
-    type_map = ensure_location_types()
-    region_type = type_map.get("geo-region")
-    country_type = type_map.get("country")
-    site_type = type_map.get("campus")
-    if not (region_type and country_type and site_type):
-        print("Could not find or create required location types: geo-region, country, campus.")
-        return {}, {}, {}
-    # Ensure dummy site exists
-    dummy_site_id = ensure_dummy_site()
-    
+
+
+def build_locations():
+    """Return the location payloads and the ``(country code, code)`` of every campus, keyed by slug."""
     # Define 32 locations with 4-character codes
     locations_data = {
         "NAM": {
@@ -277,67 +265,61 @@ def create_hierarchical_locations():
             ],
         },
     }
-    
+
     country_names = {
         "US": "United States", "CA": "Canada", "MX": "Mexico", "SG": "Singapore", "JP": "Japan", "AU": "Australia", "HK": "Hong Kong", "KR": "South Korea", "IN": "India", "GB": "United Kingdom", "DE": "Germany", "FR": "France", "NL": "Netherlands", "AE": "United Arab Emirates", "CH": "Switzerland"
     }
-    
-    region_objs, country_objs, location_objs = {}, {}, {}
-    
-    # Regions
-    for region in locations_data:
-        region_data = {"name": region, "slug": region.lower(), "description": f"{region} region", "status": "active", "location_type": region_type, "site": dummy_site_id}
-        region_obj = get_or_create("dcim/locations/", ["name"], region_data)
-        if region_obj:
-            region_objs[region] = region_obj
-        else:
-            print(f"Failed to create region: {region}")
-            continue
-    
-    # Countries
-    for region, countries in locations_data.items():
-        if region not in region_objs:
-            continue
-        for country_code in countries:
-            country_name = country_names[country_code]
-            country_data = {"name": country_name, "slug": country_code.lower(), "parent": region_objs[region]["id"], "description": f"{country_name} in {region} region", "status": "active", "location_type": country_type}
-            country_obj = get_or_create("dcim/locations/", ["name", "parent"], country_data)
-            if country_obj:
-                country_objs[country_code] = country_obj
-            else:
-                print(f"Failed to create country: {country_name}")
-                continue
-    
-    # Locations
+
+    locations, sites = {}, {}
     for region, countries in locations_data.items():
+        locations[region.lower()] = {"name": region, "slug": region.lower(), "description": f"{region} region", "status": "active", "location_type": ("location-types", "geo-region"), "site": ("sites", "synthetic-root-site")}
         for country_code, locs in countries.items():
-            if country_code not in country_objs:
-                continue
+            country_name = country_names[country_code]
+            locations[country_code.lower()] = {"name": country_name, "slug": country_code.lower(), "parent": ("locations", region.lower()), "description": f"{country_name} in {region} region", "status": "active", "location_type": ("location-types", "country")}
             for loc in locs:
                 slug = loc["name"].lower().replace(" ", "-")
-                loc_data = {"name": loc["name"], "slug": slug, "parent": country_objs[country_code]["id"], "description": f"{loc['name']} in {country_names[country_code]}", "status": "active", "location_type": site_type}
-                loc_obj = get_or_create("dcim/locations/", ["name", "parent"], loc_data)
-                if loc_obj:
-                    location_objs[loc["code"]] = loc_obj
-                else:
-                    print(f"Failed to create location: {loc['name']}")
-    
-    return region_objs, country_objs, location_objs
-
-def create_devices(location_objs, role_objs, device_type_objs):
-    """Create 1000 devices across locations following the naming standard."""
-    
-    # Get the dummy site ID
-    dummy_site_id = ensure_dummy_site()
-    
-    # Device type mapping (1 character)
+                locations[slug] = {"name": loc["name"], "slug": slug, "parent": ("locations", country_code.lower()), "description": f"{loc['name']} in {country_name}", "status": "active", "location_type": ("location-types", "campus")}
+                sites[slug] = (country_code.lower(), loc["code"])
+    return locations, sites
+
+
+def build_device_infrastructure():
+    """Return the manufacturer, device role and device type payloads needed for devices."""
+    # Create manufacturers
+    manufacturers = {
+        "cisco": {"name": "Cisco", "slug": "cisco"},
+        "arista": {"name": "Arista Networks", "slug": "arista"},
+    }
+
+
+    # Create device roles based on function codes
+    device_roles = {
+        "acc": {"name": "Campus Access Switch", "slug": "acc", "color": "4caf50"},
+        "cor": {"name": "Campus Core Switch", "slug": "cor", "color": "2196f3"},
+        "wan": {"name": "Campus WAN Switch", "slug": "wan", "color": "ff9800"},
+        "lea": {"name": "Data Center Leaf Switch", "slug": "lea", "color": "9c27b0"},
+        "spn": {"name": "Data Center Spine Switch", "slug": "spn", "color": "f44336"},
+        "fw": {"name": "Firewall", "slug": "fw", "color": "e91e63"},
+        "lb": {"name": "Load Balancer", "slug": "lb", "color": "673ab7"},
+    }
+
+    # Create device types with model numbers
     device_types = {
-        "s": "switch",
-        "r": "router", 
-        "f": "firewall",
-        "l": "load-balancer"
+        # Cisco Campus (all campus devices)
+        "catalyst-9300": {"manufacturer": ("manufacturers", "cisco"), "model": "Catalyst 9300", "slug": "catalyst-9300", "part_number": "C9300-48UXM", "u_height": 1, "is_full_depth": False},
+        "catalyst-9500": {"manufacturer": ("manufacturers", "cisco"), "model": "Catalyst 9500", "slug": "catalyst-9500", "part_number": "C9500-48Y4C", "u_height": 1, "is_full_depth": True},
+        "asr-1000": {"manufacturer": ("manufacturers", "cisco"), "model": "ASR 1000", "slug": "asr-1000", "part_number": "ASR1001-X", "u_height": 1, "is_full_depth": True},
+        # Data Center - Mix of Cisco and Arista
+        "nexus-9000": {"manufacturer": ("manufacturers", "cisco"), "model": "Nexus 9000", "slug": "nexus-9000", "part_number": "N9K-C93180YC-EX", "u_height": 1, "is_full_depth": True},
+        "arista-7280": {"manufacturer": ("manufacturers", "arista"), "model": "7280SR", "slug": "arista-7280", "part_number": "DCS-7280SR4K-48C6", "u_height": 1, "is_full_depth": True},
+        "arista-7508": {"manufacturer": ("manufacturers", "arista"), "model": "7508", "slug": "arista-7508", "part_number": "DCS-7508", "u_height": 8, "is_full_depth": True},
     }
-    
+
+    return manufacturers, device_roles, device_types
+
+
+def build_devices(sites, locations, scale=1):
+    """Return the device payloads for every campus, following the naming standard."""
     # Function codes and their device types
     function_configs = {
         "acc": {"type": "s", "role": "acc", "device_type": "catalyst-9300", "model": "9300", "count_per_location": 8},
@@ -348,304 +330,307 @@ def create_devices(location_objs, role_objs, device_type_objs):
         "fw": {"type": "f", "role": "fw", "device_type": "nexus-9000", "model": "9000", "count_per_location": 2},
         "lb": {"type": "l", "role": "lb", "device_type": "nexus-9000", "model": "9000", "count_per_location": 2},
     }
-    
-    # Location to country code mapping
-    location_country_map = {
-        # US locations
-        "SWDC": "us", "NEDC": "us", "CTDC": "us", "WCCP": "us", "ECCP": "us", "MWCP": "us", "TXCP": "us", "FLCP": "us", "CACP": "us", "NYCP": "us",
-        # CA locations  
-        "TRDC": "ca", "VCCP": "ca", "MCCP": "ca",
-        # MX locations
-        "MXDC": "mx", "GJCP": "mx", "MTCP": "mx",
-        # SG locations
-        "SGDC": "sg", "SGCP": "sg",
-        # JP locations
-        "TKDC": "jp", "TKCP": "jp",
-        # AU locations
-        "SYDC": "au", "MLCP": "au",
-        # HK locations
-        "HKDC": "hk", "HKCP": "hk",
-        # KR locations
-        "SLDC": "kr", "SLCP": "kr",
-        # IN locations
-        "MBDC": "in", "BLCP": "in",
-        # GB locations
-        "LNDC": "gb", "LNCP": "gb",
-        # DE locations
-        "FRDC": "de", "BLCP": "de",
-        # FR locations
-        "PRDC": "fr", "PRCP": "fr",
-        # NL locations
-        "AMDC": "nl", "AMCP": "nl",
-        # AE locations
-        "DUDC": "ae", "DUCP": "ae",
-        # CH locations
-        "ZHDC": "ch", "ZHCP": "ch",
-    }
-    
-    devices_created = 0
-    
-    for location_code, location_obj in location_objs.items():
-        country_code = location_country_map.get(location_code, "us")
-        is_datacenter = "Data Center" in location_obj["name"]
-        
+
+    devices = {}
+    for slug, (country_code, location_code) in sites.items():
+        is_datacenter = "Data Center" in locations[slug]["name"]
+
         # Determine which functions to create based on location type
         if is_datacenter:
             functions = ["lea", "spn", "fw", "lb"]  # Data center functions
         else:
             functions = ["acc", "cor", "wan"]  # Campus functions
-        
+
         for function_code in functions:
             config = function_configs[function_code]
-            count = config["count_per_location"]
-            
-            for i in range(1, count + 1):
-                # Generate device number: 1xxx for campus, 1xxx for data center fabric 1
-                device_num = f"1{i:03d}"  # 1001, 1002, etc.
-                
-                # Create device name following the standard
+            for i in range(1, config["count_per_location"] * scale + 1):
+                # Generate device number: 1001, 1002, etc.
+                device_num = f"{1000 + i}"
                 device_name = f"{config['type']}{country_code}{location_code.lower()}-{function_code}{device_num}-{config['model']}"
-                
-                # Determine device type based on function and location
-                if is_datacenter and function_code in ["lea", "spn"]:
-                    # Mix of Cisco and Arista for data center
-                    if function_code == "lea":
-                        device_type_id = device_type_objs.get("nexus-9000", {}).get("id")
-                    else:  # spn
-                        device_type_id = device_type_objs.get("arista-7508", {}).get("id")
-                else:
-                    # All Cisco for campus
-                    device_type_id = device_type_objs.get(config["device_type"], {}).get("id")
-                
-                if not device_type_id:
-                    print(f"Missing device type for {config['device_type']}")
-                    continue
-                
-                device_data = {
+                devices[device_name] = {
                     "name": device_name,
-                    "device_type": device_type_id,
-                    "device_role": role_objs.get(function_code, {}).get("id"),
-                    "location": location_obj["id"],
-                    "site": dummy_site_id,
+                    "device_type": ("device-types", config["device_type"]),
+                    "device_role": ("device-roles", config["role"]),
+                    "location": ("locations", slug),
+                    "site": ("sites", "synthetic-root-site"),
                     "status": "active",
                 }
-                
-                device = api_post("dcim/devices/", device_data)
-                if device:
-                    devices_created += 1
-                    if devices_created % 100 == 0:
-                        print(f"Created {devices_created} devices...")
-                else:
-                    print(f"Failed to create device: {device_name}")
-    
-    print(f"Total devices created: {devices_created}")
-    return devices_created
-
-def create_dynamic_groups():
-    """Create Dynamic Groups based on device roles, locations, and manufacturers."""
-    
-    # Get existing data to reference
-    roles = api_get("dcim/device-roles/")
-    locations = api_get("dcim/locations/")
-    manufacturers = api_get("dcim/manufacturers/")
-    
-    if not all([roles, locations, manufacturers]):
-        print("Failed to fetch existing data for Dynamic Groups")
-        return {}
-    
-    # Create Dynamic Groups based on device roles
-    role_groups = {}
-    for role in roles.get('results', []):
-        group_name = f"All {role['name']} Devices"
-        group_data = {
-            "name": group_name,
+    return devices
+
+
+def build_dynamic_groups(locations, device_roles, manufacturers):
+    """Return Dynamic Group payloads for every device role, top-level region and manufacturer."""
+    dynamic_groups = {}
+    for role in device_roles.values():
+        dynamic_groups[f"all-{role['slug']}-devices"] = {
+            "name": f"All {role['name']} Devices",
             "slug": f"all-{role['slug']}-devices",
             "description": f"All devices with role: {role['name']}",
             "content_type": "dcim.device",
-            "filter": {
-                "role": [role['slug']]  # Use slug instead of ID
-            }
+            "filter": {"role": [role['slug']]},
         }
-        
-        group = get_or_create("extras/dynamic-groups/", ["slug"], group_data)
-        if group:
-            role_groups[role['slug']] = group
-            print(f"Created Dynamic Group: {group_name}")
-        else:
-            print(f"Failed to create Dynamic Group for role: {role['name']}")
-    
-    # Create Dynamic Groups based on locations (top-level regions)
-    location_groups = {}
-    for location in locations.get('results', []):
-        if location.get('location_type') and 'geo-region' in location.get('location_type', {}).get('slug', ''):
-            group_name = f"All Devices in {location['name']}"
-            group_data = {
-                "name": group_name,
+    for location in locations.values():
+        if location["location_type"] == ("location-types", "geo-region"):
+            dynamic_groups[f"all-devices-{location['slug']}"] = {
+                "name": f"All Devices in {location['name']}",
                 "slug": f"all-devices-{location['slug']}",
                 "description": f"All devices in region: {location['name']}",
                 "content_type": "dcim.device",
-                "filter": {
-                    "location": [location['slug']]  # Use slug instead of ID
-                }
+                "filter": {"location": [location['slug']]},
             }
-            
-            group = get_or_create("extras/dynamic-groups/", ["slug"], group_data)
-            if group:
-                location_groups[location['slug']] = group
-                print(f"Created Dynamic Group: {group_name}")
-            else:
-                print(f"Failed to create Dynamic Group for location: {location['name']}")
-    
-    # Create Dynamic Groups based on manufacturers
-    manufacturer_groups = {}
-    for manufacturer in manufacturers.get('results', []):
-        group_name = f"All {manufacturer['name']} Devices"
-        group_data = {
-            "name": group_name,
+    for manufacturer in manufacturers.values():
+        dynamic_groups[f"all-{manufacturer['slug']}-devices"] = {
+            "name": f"All {manufacturer['name']} Devices",
             "slug": f"all-{manufacturer['slug']}-devices",
             "description": f"All devices from manufacturer: {manufacturer['name']}",
             "content_type": "dcim.device",
-            "filter": {
-                "manufacturer": [manufacturer['slug']]  # Use slug instead of ID
-            }
+            "filter": {"manufacturer": [manufacturer['slug']]},
         }
-        
-        group = get_or_create("extras/dynamic-groups/", ["slug"], group_data)
-        if group:
-            manufacturer_groups[manufacturer['slug']] = group
-            print(f"Created Dynamic Group: {group_name}")
-        else:
-            print(f"Failed to create Dynamic Group for manufacturer: {manufacturer['name']}")
-    
-    return {
-        'role_groups': role_groups,
-        'location_groups': location_groups,
-        'manufacturer_groups': manufacturer_groups
-    }
+    return dynamic_groups
 
-def create_servicenow_groups(dynamic_groups):
-    """Create ServiceNow Groups that reference Dynamic Groups."""
-    
-    # Create ServiceNow Groups for different scenarios
-    servicenow_groups = []
-    
-    # 1. Network Operations Team - manages all campus devices
-    campus_roles = ['acc', 'cor', 'wan']
-    campus_dynamic_groups = [dynamic_groups['role_groups'].get(role) for role in campus_roles if dynamic_groups['role_groups'].get(role)]
-    
-    if campus_dynamic_groups:
-        netops_group = {
-            "name": "Network Operations Team",
-            "description": "ServiceNow group for Network Operations team managing campus infrastructure",
-            "dynamic_groups": [group['id'] for group in campus_dynamic_groups if group]
-        }
-        
-        group = api_post("plugins/service_now_groups/groups/", netops_group)
-        if group:
-            servicenow_groups.append(group)
-            print(f"Created ServiceNow Group: {netops_group['name']}")
-        else:
-            print(f"Failed to create ServiceNow Group: {netops_group['name']}")
-    
-    # 2. Data Center Team - manages all data center devices
-    dc_roles = ['lea', 'spn']
-    dc_dynamic_groups = [dynamic_groups['role_groups'].get(role) for role in dc_roles if dynamic_groups['role_groups'].get(role)]
-    
-    if dc_dynamic_groups:
-        dc_group = {
-            "name": "Data Center Operations Team",
-            "description": "ServiceNow group for Data Center Operations team managing DC infrastructure",
-            "dynamic_groups": [group['id'] for group in dc_dynamic_groups if group]
-        }
-        
-        group = api_post("plugins/service_now_groups/groups/", dc_group)
-        if group:
-            servicenow_groups.append(group)
-            print(f"Created ServiceNow Group: {dc_group['name']}")
-        else:
-            print(f"Failed to create ServiceNow Group: {dc_group['name']}")
-    
-    # 3. Security Team - manages all security devices
-    security_roles = ['fw', 'lb']
-    security_dynamic_groups = [dynamic_groups['role_groups'].get(role) for role in security_roles if dynamic_groups['role_groups'].get(role)]
-    
-    if security_dynamic_groups:
-        security_group = {
-            "name": "Security Operations Team",
-            "description": "ServiceNow group for Security Operations team managing security infrastructure",
-            "dynamic_groups": [group['id'] for group in security_dynamic_groups if group]
+
+def build_servicenow_groups(locations, manufacturers):
+    """Return ServiceNow Group payloads that reference the Dynamic Groups."""
+    teams = [
+        # Network Operations Team - manages all campus devices
+        ("Network Operations Team", "Network Operations team managing campus infrastructure", ["acc", "cor", "wan"]),
+        # Data Center Team - manages all data center devices
+        ("Data Center Operations Team", "Data Center Operations team managing DC infrastructure", ["lea", "spn"]),
+        # Security Team - manages all security devices
+        ("Security Operations Team", "Security Operations team managing security infrastructure", ["fw", "lb"]),
+    ]
+    servicenow_groups = {
+        name: {
+            "name": name,
+            "description": f"ServiceNow group for {description}",
+            "dynamic_groups": [("dynamic-groups", f"all-{role}-devices") for role in roles],
         }
-        
-        group = api_post("plugins/service_now_groups/groups/", security_group)
-        if group:
-            servicenow_groups.append(group)
-            print(f"Created ServiceNow Group: {security_group['name']}")
-        else:
-            print(f"Failed to create ServiceNow Group: {security_group['name']}")
-    
-    # 4. Regional Teams - one for each major region
-    for region_slug, region_group in dynamic_groups['location_groups'].items():
-        if region_slug in ['na', 'eu', 'ap']:  # North America, Europe, Asia Pacific
-            region_name = region_group['name'].replace('All Devices in ', '')
-            regional_group = {
-                "name": f"{region_name} Regional Team",
-                "description": f"ServiceNow group for {region_name} regional operations",
-                "dynamic_groups": [region_group['id']]
+        for name, description, roles in teams
+    }
+
+    # Regional Teams - one for each top-level region
+    for location in locations.values():
+        if location["location_type"] == ("location-types", "geo-region"):
+            name = f"{location['name']} Regional Team"
+            servicenow_groups[name] = {
+                "name": name,
+                "description": f"ServiceNow group for {location['name']} regional operations",
+                "dynamic_groups": [("dynamic-groups", f"all-devices-{location['slug']}")],
             }
-            
-            group = api_post("plugins/service_now_groups/groups/", regional_group)
-            if group:
-                servicenow_groups.append(group)
-                print(f"Created ServiceNow Group: {regional_group['name']}")
-            else:
-                print(f"Failed to create ServiceNow Group: {regional_group['name']}")
-    
-    # 5. Vendor-specific teams
-    for vendor_slug, vendor_group in dynamic_groups['manufacturer_groups'].items():
-        vendor_name = vendor_group['name'].replace('All ', '').replace(' Devices', '')
-        vendor_team = {
-            "name": f"{vendor_name} Support Team",
-            "description": f"ServiceNow group for {vendor_name} device support and maintenance",
-            "dynamic_groups": [vendor_group['id']]
+
+    # Vendor-specific teams
+    for manufacturer in manufacturers.values():
+        name = f"{manufacturer['name']} Support Team"
+        servicenow_groups[name] = {
+            "name": name,
+            "description": f"ServiceNow group for {manufacturer['name']} device support and maintenance",
+            "dynamic_groups": [("dynamic-groups", f"all-{manufacturer['slug']}-devices")],
         }
-        
-        group = api_post("plugins/service_now_groups/groups/", vendor_team)
-        if group:
-            servicenow_groups.append(group)
-            print(f"Created ServiceNow Group: {vendor_team['name']}")
-        else:
-            print(f"Failed to create ServiceNow Group: {vendor_team['name']}")
-    
     return servicenow_groups
 
+
+def build_object_graph(scale=1):
+    """Return every object to create as waves in dependency order."""
+    locations, sites = build_locations()
+    manufacturers, device_roles, device_types = build_device_infrastructure()
+    # Create a dummy site for top-level locations if it doesn't exist
+    root_site = {
+        "name": "Synthetic Data Root Site",
+        "slug": "synthetic-root-site",
+        "status": "active",
+        "description": "Dummy site for synthetic hierarchical locations",
+    }
+    return [
+        Wave("location-types", "dcim/location-types/", ["slug"], False, build_location_types()),
+        Wave("sites", "dcim/sites/", ["slug"], False, {"synthetic-root-site": root_site}),
+        Wave("locations", "dcim/locations/", ["name", "parent"], False, locations),
+        Wave("manufacturers", "dcim/manufacturers/", ["slug"], False, manufacturers),
+        Wave("device-roles", "dcim/device-roles/", ["slug"], False, device_roles),
+        Wave("device-types", "dcim/device-types/", ["slug"], False, device_types),
+        Wave("devices", "dcim/devices/", ["name"], True, build_devices(sites, locations, scale)),
+        Wave("dynamic-groups", "extras/dynamic-groups/", ["slug"], False, build_dynamic_groups(locations, device_roles, manufacturers)),
+        Wave("servicenow-groups", SERVICENOW_GROUPS_ENDPOINT, ["name"], False, build_servicenow_groups(locations, manufacturers)),
+    ]
+
+
+def object_value(value):
+    """Return a field value read back from the API in the form it is written, e.g. a nested object as its ID."""
+    if isinstance(value, dict):
+        return value.get("id", value.get("value", value))
+    if isinstance(value, list):
+        return [object_value(item) for item in value]
+    return value
+
+
+def index_key(obj, unique_fields):
+    return tuple(object_value(obj.get(field)) for field in unique_fields)
+
+
+def fetch_index(wave):
+    """Return the existing objects of a wave's endpoint keyed by its unique fields, read in parallel pages."""
+    first = api_get(wave.endpoint, {"limit": PAGE_SIZE})
+    if not first:
+        print(f"Failed to list existing {wave.name}")
+        return {}
+    results = list(first["results"])
+    page_size = len(results)
+    if page_size and first["count"] > page_size:
+        offsets = range(page_size, first["count"], page_size)
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            pages = executor.map(lambda offset: api_get(wave.endpoint, {"limit": page_size, "offset": offset}), offsets)
+            for page in pages:
+                results.extend(page["results"] if page else [])
+    return {index_key(obj, wave.unique_fields): obj for obj in results}
+
+
+def differences(existing, payload):
+    """Return the fields of ``payload`` whose value differs from the ``existing`` object."""
+    changes = {}
+    for field, value in payload.items():
+        if field not in existing:
+            continue
+        current = object_value(existing[field])
+        if isinstance(value, list) and isinstance(current, list):
+            if sorted(map(str, value)) != sorted(map(str, current)):
+                changes[field] = value
+        elif current != value:
+            changes[field] = value
+    return changes
+
+
+def create_objects(wave, keys, payloads, checkpoint):
+    """Create ``keys`` with list POSTs for bulk waves and parallel single POSTs otherwise, checkpointing as they land."""
+    created = {}
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        if wave.bulk:
+            batches = [keys[i:i + BATCH_SIZE] for i in range(0, len(keys), BATCH_SIZE)]
+            results = executor.map(lambda batch: api_post(wave.endpoint, [payloads[key] for key in batch]), batches)
+            for batch, objs in zip(batches, results):
+                if objs:
+                    created.update(zip(batch, objs))
+                    checkpoint.add(wave.name, dict(zip(batch, objs)))
+                else:
+                    print(f"Failed to create {len(batch)} {wave.name} starting at {batch[0]}")
+        else:
+            for key, obj in zip(keys, executor.map(lambda key: api_post(wave.endpoint, payloads[key]), keys)):
+                if obj:
+                    created[key] = obj
+                    checkpoint.add(wave.name, {key: obj})
+                else:
+                    print(f"Failed to create {wave.name}: {key}")
+    return created
+
+
+def update_objects(wave, changes, existing):
+    """PATCH only the differing fields of ``existing`` objects, in lists for bulk waves."""
+    updated = {}
+    keys = list(changes)
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        if wave.bulk:
+            batches = [keys[i:i + BATCH_SIZE] for i in range(0, len(keys), BATCH_SIZE)]
+            results = executor.map(
+                lambda batch: api_patch(api_url(wave.endpoint), [{"id": existing[key]["id"], **changes[key]} for key in batch]),
+                batches,
+            )
+            for batch, objs in zip(batches, results):
+                if objs:
+                    updated.update(zip(batch, objs))
+        else:
+            results = executor.map(lambda key: api_patch(existing[key]["url"], changes[key]), keys)
+            updated.update((key, obj) for key, obj in zip(keys, results) if obj)
+    return updated
+
+
+def submit_tier(wave, keys, payloads, index, checkpoint):
+    """
+    Bring one tier of a wave in line with ``index``, the objects that already exist.
+
+    Missing objects are created and existing ones are patched only where they
+    differ, so a rerun against a populated instance sends no writes at all.
+
+    Returns:
+        tuple: The objects of the tier by key, and the numbers created and updated
+    """
+    existing = {
+        key: index[index_key(payloads[key], wave.unique_fields)]
+        for key in keys
+        if index_key(payloads[key], wave.unique_fields) in index
+    }
+    changes = {key: differences(obj, payloads[key]) for key, obj in existing.items()}
+    changes = {key: fields for key, fields in changes.items() if fields}
+
+    created = create_objects(wave, [key for key in keys if key not in existing], payloads, checkpoint)
+    updated = update_objects(wave, changes, existing)
+    return {**existing, **updated, **created}, len(created), len(updated)
+
+
+def submit_wave(wave, created, checkpoint):
+    """
+    Create or update every object of ``wave``, recording the result in ``created[wave.name]``.
+
+    The endpoint's existing objects are indexed once up front instead of being
+    looked up one by one.
+
+    Objects referencing others of the same wave, such as nested locations, are
+    submitted in tiers once their parents exist. Objects already recorded in
+    ``created``, e.g. from a resumed checkpoint, are not submitted again.
+    """
+    start = time.perf_counter()
+    requests_before = THROUGHPUT.requests
+    created.setdefault(wave.name, {})
+    index = fetch_index(wave)
+    created_count = updated_count = 0
+    pending = {key: payload for key, payload in wave.objects.items() if key not in created[wave.name]}
+    while pending:
+        ready = [
+            key for key, payload in pending.items()
+            if all(ref_key in created.get(ref_wave, {}) for ref_wave, ref_key in references(payload))
+        ]
+        if not ready:
+            print(f"Skipping {len(pending)} {wave.name} whose dependencies could not be created")
+            break
+        payloads = {key: resolve(pending.pop(key), created) for key in ready}
+        objects, tier_created, tier_updated = submit_tier(wave, ready, payloads, index, checkpoint)
+        created[wave.name].update(objects)
+        checkpoint.add(wave.name, objects)
+        created_count += tier_created
+        updated_count += tier_updated
+    seconds = time.perf_counter() - start
+    objects = len(created[wave.name])
+    THROUGHPUT.record(wave.name, objects, created_count, updated_count, THROUGHPUT.requests - requests_before, seconds)
+    print(f"  {wave.name}: {objects} objects ({created_count} created, {updated_count} updated) in {seconds:.2f}s")
+    if all(key in created[wave.name] for key in wave.objects):
+        checkpoint.complete(wave.name)
+
+
 def test_servicenow_groups_functionality():
     """Test the ServiceNow Groups app functionality."""
-    
+
     print("\n=== Testing ServiceNow Groups Functionality ===")
-    
+
     # 1. Test API endpoints
     print("\n1. Testing API endpoints...")
-    
+
     # List all ServiceNow Groups
-    groups = api_get("plugins/service_now_groups/groups/")
+    groups = api_get(SERVICENOW_GROUPS_ENDPOINT)
     if groups:
         print(f"✓ Found {groups.get('count', 0)} ServiceNow Groups")
         for group in groups.get('results', [])[:3]:  # Show first 3
             print(f"  - {group['name']}: {group.get('description', 'No description')}")
     else:
         print("✗ Failed to fetch ServiceNow Groups")
-    
+
     # 2. Test device association
     print("\n2. Testing device association...")
-    
+
     # Get a few devices to test with
     devices = api_get("dcim/devices/", {"limit": 5})
     if devices and devices.get('results'):
         test_device = devices['results'][0]
         print(f"✓ Testing with device: {test_device['name']}")
-        
+
         # Get ServiceNow Groups for this device
-        device_groups = api_get(f"plugins/service_now_groups/groups/", {"device": test_device['id']})
+        device_groups = api_get(SERVICENOW_GROUPS_ENDPOINT, {"device": test_device['id']})
         if device_groups:
             print(f"✓ Device {test_device['name']} is associated with {device_groups.get('count', 0)} ServiceNow Groups")
             for group in device_groups.get('results', [])[:3]:
@@ -654,10 +639,10 @@ def test_servicenow_groups_functionality():
             print(f"✗ Failed to get ServiceNow Groups for device {test_device['name']}")
     else:
         print("✗ No devices found for testing")
-    
+
     # 3. Test Dynamic Group association
     print("\n3. Testing Dynamic Group association...")
-    
+
     dynamic_groups = api_get("extras/dynamic-groups/")
     if dynamic_groups:
         print(f"✓ Found {dynamic_groups.get('count', 0)} Dynamic Groups")
@@ -665,38 +650,50 @@ def test_servicenow_groups_functionality():
             print(f"  - {group['name']}: {group.get('description', 'No description')}")
     else:
         print("✗ Failed to fetch Dynamic Groups")
-    
+
     print("\n=== Testing Complete ===")
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic ServiceNow Groups data through the Nautobot REST API.")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Concurrent requests per wave")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Objects per bulk POST")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplier for the number of devices per location")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help="Checkpoint file recording completed waves and created IDs")
+    parser.add_argument("--resume", action="store_true", help="Skip the waves and objects recorded in the checkpoint")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    WORKERS, BATCH_SIZE = args.workers, args.batch_size
+    configure_session(WORKERS)
+
     print("=== ServiceNow Groups Synthetic Data Generation ===")
-    
-    # Step 1: Create infrastructure (manufacturers, device types, roles)
-    print("\n1. Creating device infrastructure...")
-    manufacturer_objs, role_objs, device_type_objs = ensure_device_infrastructure()
-    
-    # Step 2: Create hierarchical locations
-    print("\n2. Creating hierarchical locations...")
-    regions, countries, sites = create_hierarchical_locations()
-    
-    # Step 3: Create devices
-    print("\n3. Creating devices...")
-    devices = create_devices(sites, role_objs, device_type_objs)
-    
-    # Step 4: Create Dynamic Groups
-    print("\n4. Creating Dynamic Groups...")
-    dynamic_groups = create_dynamic_groups()
-    
-    # Step 5: Create ServiceNow Groups
-    print("\n5. Creating ServiceNow Groups...")
-    servicenow_groups = create_servicenow_groups(dynamic_groups)
-    
-    # Step 6: Test functionality
-    print("\n6. Testing ServiceNow Groups functionality...")
+
+    # Step 1: Build the object graph
+    print("\n1. Building object graph...")
+    waves = build_object_graph(args.scale)
+    print(f"{sum(len(wave.objects) for wave in waves)} objects in {len(waves)} waves")
+
+    # Step 2: Submit it wave by wave in dependency order
+    print("\n2. Submitting waves...")
+    checkpoint = Checkpoint(args.checkpoint, {"api_url": API_URL, "scale": args.scale})
+    if args.resume:
+        checkpoint.load()
+    created = checkpoint.created()
+    try:
+        for wave in waves:
+            if wave.name in checkpoint.completed:
+                print(f"  {wave.name}: complete in checkpoint, skipping")
+                continue
+            submit_wave(wave, created, checkpoint)
+    finally:
+        checkpoint.save(force=True)
+
+    # Step 3: Test functionality
+    print("\n3. Testing ServiceNow Groups functionality...")
     test_servicenow_groups_functionality()
-    
+
     print("\n=== Synthetic Data Generation Complete ===")
-    print(f"Created {len(regions)} regions, {len(countries)} countries, {len(sites)} sites")
-    print(f"Created {devices} devices")
-    print(f"Created {sum(len(groups) for groups in dynamic_groups.values())} Dynamic Groups")
-    print(f"Created {len(servicenow_groups)} ServiceNow Groups") 
\ No newline at end of file
+    THROUGHPUT.print_summary()
@@ -19,11 +19,39 @@ class ServiceNowGroupsConfig(NautobotAppConfig):
     default_settings = {
         "enable_change_logging": True,
         "enable_graphql": True,
+        "enable_membership_cache": True,
+        "membership_cache_timeout": 300,
+        "dynamic_group_cache_size": 128,
+        "dynamic_group_cache_timeout": 300,
+        "servicenow_url": "",
+        "servicenow_username": "",
+        "servicenow_password": "",
+        "servicenow_api": "import_set",
+        "servicenow_table": "u_nautobot_group_membership",
+        "servicenow_field_prefix": "u_",
+        "servicenow_batch_size": 200,
+        "servicenow_max_workers": 4,
+        "servicenow_max_retries": 5,
+        "servicenow_backoff_factor": 0.5,
+        "servicenow_timeout": 30,
+        "snapshot_retention": 5,
+        "statistics_cache_timeout": 60,
     }
 
+    # Prometheus metrics served on Nautobot's /metrics endpoint
+    metrics = "metrics.metrics"
+
+    # GraphQL types, empty when enable_graphql is off
+    graphql_types = "graphql.types.graphql_types"
+
     # Template content injection
     template_extensions = ['service_now_groups.template_content.DeviceServiceNowGroups']
 
+    def ready(self):
+        """Connect the membership maintenance signal handlers."""
+        super().ready()
+        from . import signals  # noqa: F401
+
 
 # This is the config variable that Nautobot expects to find
 config = ServiceNowGroupsConfig 
\ No newline at end of file
@@ -31,7 +31,7 @@ class ServiceNowGroupAdmin(admin.ModelAdmin):
     readonly_fields = [
         "created",
         "last_updated",
-        "device_count",
+        "cached_device_count",
         "assignment_summary",
     ]
     filter_horizontal = [
@@ -54,6 +54,7 @@ class ServiceNowGroupAdmin(admin.ModelAdmin):
             {
                 "fields": (
                     "locations",
+                    "include_descendant_locations",
                     "dynamic_groups",
                     "devices",
                 ),
@@ -65,7 +66,7 @@ class ServiceNowGroupAdmin(admin.ModelAdmin):
             "Statistics",
             {
                 "fields": (
-                    "device_count",
+                    "cached_device_count",
                     "assignment_summary",
                 ),
                 "classes": ("collapse",),
@@ -85,7 +86,7 @@ class ServiceNowGroupAdmin(admin.ModelAdmin):
 
     def device_count_display(self, obj):
         """Display device count with formatting."""
-        count = obj.device_count
+        count = obj.cached_device_count
         return format_html(
             '<span style="color: {};">{}</span>',
             "green" if count > 0 else "red",
@@ -93,6 +94,7 @@ class ServiceNowGroupAdmin(admin.ModelAdmin):
         )
 
     device_count_display.short_description = "Associated Devices"
+    device_count_display.admin_order_field = "cached_device_count"
 
     def assignment_summary_display(self, obj):
         """Display assignment summary with formatting."""
@@ -119,32 +121,50 @@ class ServiceNowGroupAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
     # Custom admin actions
-    actions = ['export_assignment_summary', 'validate_assignments']
+    actions = ['export_assignment_summary', 'export_assignment_summary_with_sources', 'validate_assignments']
 
-    def export_assignment_summary(self, request, queryset):
-        """Export assignment summary for selected ServiceNow groups."""
-        from django.http import HttpResponse
-        import csv
-        
-        response = HttpResponse(content_type='text/csv')
+    def _assignment_summary_response(self, queryset, include_sources=False):
+        """Stream the assignment summary CSV of ``queryset``, reading every group and count in one query."""
+        from django.http import StreamingHttpResponse
+
+        from .choices import MembershipSourceChoices
+        from .export import CHUNK_SIZE, annotate_assignment_counts, render_csv
+
+        sources = MembershipSourceChoices.values() if include_sources else []
+        groups = annotate_assignment_counts(
+            queryset.prefetch_related(None).order_by('name'),
+            include_sources=include_sources,
+        )
+
+        def rows():
+            yield ['Name', 'Description', 'Assignment Summary', 'Device Count', 'Created'] + [
+                f'Devices via {MembershipSourceChoices.as_dict()[source]}' for source in sources
+            ]
+            for group in groups.iterator(chunk_size=CHUNK_SIZE):
+                yield [
+                    group.name,
+                    group.description or '',
+                    group.assignment_summary,
+                    group.cached_device_count,
+                    group.created.strftime('%Y-%m-%d %H:%M:%S'),
+                ] + [getattr(group, f'{source}_device_count') for source in sources]
+
+        response = StreamingHttpResponse(render_csv(rows()), content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="servicenow_groups_assignment_summary.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Name', 'Description', 'Assignment Summary', 'Device Count', 'Created'])
-        
-        for group in queryset:
-            writer.writerow([
-                group.name,
-                group.description or '',
-                group.assignment_summary,
-                group.device_count,
-                group.created.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-        
         return response
+
+    def export_assignment_summary(self, request, queryset):
+        """Export assignment summary for selected ServiceNow groups."""
+        return self._assignment_summary_response(queryset)
     
     export_assignment_summary.short_description = "Export assignment summary to CSV"
 
+    def export_assignment_summary_with_sources(self, request, queryset):
+        """Export assignment summary for selected ServiceNow groups, with devices per assignment source."""
+        return self._assignment_summary_response(queryset, include_sources=True)
+
+    export_assignment_summary_with_sources.short_description = "Export assignment summary with per-source device counts to CSV"
+
     def validate_assignments(self, request, queryset):
         """Validate assignments for selected ServiceNow groups."""
         from django.contrib import messages
@@ -23,7 +23,7 @@ class ServiceNowGroupSerializer(NautobotModelSerializer):
     locations = ServiceNowGroupNestedSerializer(many=True, read_only=True)
     dynamic_groups = ServiceNowGroupNestedSerializer(many=True, read_only=True)
     devices = ServiceNowGroupNestedSerializer(many=True, read_only=True)
-    device_count = serializers.SerializerMethodField()
+    device_count = serializers.IntegerField(source="cached_device_count", read_only=True)
 
     class Meta:
         model = None  # Will be set in __init__
@@ -33,6 +33,7 @@ class ServiceNowGroupSerializer(NautobotModelSerializer):
             "name",
             "description",
             "locations",
+            "include_descendant_locations",
             "dynamic_groups",
             "devices",
             "device_count",
@@ -46,9 +47,33 @@ class ServiceNowGroupSerializer(NautobotModelSerializer):
         self.Meta.model = ServiceNowGroup
         super().__init__(*args, **kwargs)
 
-    def get_device_count(self, obj):
-        """Get the count of associated devices."""
-        return obj.get_associated_devices().count()
+
+class DeviceServiceNowGroupSerializer(serializers.ModelSerializer):
+    """Serializer for a ServiceNow group that applies to a device, with its assignment sources."""
+
+    url = serializers.HyperlinkedIdentityField(view_name="plugins-api:service_now_groups-api:servicenowgroup-detail")
+    sources = serializers.ListField(child=serializers.CharField(), read_only=True)
+
+    class Meta:
+        model = None  # Will be set in __init__
+        fields = ["id", "url", "name", "description", "sources"]
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the serializer with the correct model."""
+        from ..models import ServiceNowGroup
+        self.Meta.model = ServiceNowGroup
+        super().__init__(*args, **kwargs)
+
+
+class DeviceResolutionRequestSerializer(serializers.Serializer):
+    """Serializer for the body of a bulk device to ServiceNow group resolution request."""
+
+    devices = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=10000,
+        help_text="Device IDs or names to resolve",
+    )
 
 
 class ServiceNowGroupCreateSerializer(ValidatedModelSerializer):
@@ -60,6 +85,7 @@ class ServiceNowGroupCreateSerializer(ValidatedModelSerializer):
             "name",
             "description",
             "locations",
+            "include_descendant_locations",
             "dynamic_groups",
             "devices",
         ]
@@ -94,6 +120,7 @@ class ServiceNowGroupUpdateSerializer(ValidatedModelSerializer):
             "name",
             "description",
             "locations",
+            "include_descendant_locations",
             "dynamic_groups",
             "devices",
         ]
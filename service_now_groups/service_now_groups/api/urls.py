@@ -2,11 +2,12 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ServiceNowGroupViewSet
+from .views import DeviceServiceNowGroupsViewSet, ServiceNowGroupViewSet
 
 app_name = "service_now_groups-api"
 
 router = DefaultRouter()
 router.register('servicenowgroups', ServiceNowGroupViewSet)
+router.register('devices', DeviceServiceNowGroupsViewSet, basename='device')
 
 urlpatterns = router.urls 
\ No newline at end of file
@@ -1,15 +1,51 @@
 """REST API views for the ServiceNow Groups app."""
 
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django_filters import rest_framework as filters
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rest_framework.viewsets import GenericViewSet
 
 from nautobot.apps.api import NautobotModelViewSet
 from nautobot.apps.filters import NautobotFilterSet
 from nautobot.dcim.models import Device, Location
-from nautobot.extras.models import DynamicGroup
-from ..models import ServiceNowGroup
+from nautobot.extras.models import DynamicGroup, Job as JobModel
+from ..cache import get_statistics as get_cache_statistics
+from ..export import (
+    EXPORT_CONTENT_TYPES,
+    EXPORT_FORMAT_NDJSON,
+    iter_membership_rows,
+    parse_columns,
+    render_export,
+)
+from ..resolver import ServiceNowGroupResolver
+from ..stats import get_statistics as get_group_statistics
+from ..models import ServiceNowGroup, ServiceNowGroupMembership, ServiceNowGroupSnapshot
+
+# Device relations rendered by the nested Device serializer.
+ASSOCIATED_DEVICE_RELATED_FIELDS = (
+    "device_type__manufacturer",
+    "device_role",
+    "tenant",
+    "platform",
+    "site",
+    "location",
+    "rack",
+    "status",
+    "cluster",
+    "virtual_chassis",
+    "parent_bay",
+    "primary_ip4",
+    "primary_ip6",
+)
 
 
 class ServiceNowGroupFilterSet(NautobotFilterSet):
@@ -33,6 +69,9 @@ class ServiceNowGroupFilterSet(NautobotFilterSet):
         to_field_name="name",
     )
     has_devices = filters.BooleanFilter(method="_has_devices")
+    device_count = filters.NumberFilter(field_name="cached_device_count")
+    device_count__gte = filters.NumberFilter(field_name="cached_device_count", lookup_expr="gte")
+    device_count__lte = filters.NumberFilter(field_name="cached_device_count", lookup_expr="lte")
     created = filters.DateTimeFilter()
     created__gte = filters.DateTimeFilter(field_name="created", lookup_expr="gte")
     created__lte = filters.DateTimeFilter(field_name="created", lookup_expr="lte")
@@ -97,7 +136,12 @@ class ServiceNowGroupViewSet(NautobotModelViewSet):
     def associated_devices(self, request, pk=None):
         """Get all devices associated with this ServiceNow group."""
         service_now_group = self.get_object()
-        devices = service_now_group.get_associated_devices()
+        # Load everything the Device serializer nests with the page itself
+        devices = (
+            service_now_group.get_associated_devices()
+            .select_related(*ASSOCIATED_DEVICE_RELATED_FIELDS)
+            .prefetch_related("tags")
+        )
         
         # Use Nautobot's Device serializer for consistent API response
         from nautobot.dcim.api.serializers import DeviceSerializer
@@ -112,33 +156,219 @@ class ServiceNowGroupViewSet(NautobotModelViewSet):
 
     @action(detail=True, methods=["post"])
     def sync_devices(self, request, pk=None):
-        """Manually trigger device synchronization for this group."""
+        """
+        Enqueue a job pushing this group's devices to ServiceNow.
+
+        Returns the ID of the job result, which can be polled at
+        ``/api/extras/job-results/{id}/``.
+        """
+        from ..jobs import SyncServiceNowGroupDevices, enqueue_sync_job
+
         service_now_group = self.get_object()
-        try:
-            # This would trigger the actual sync logic
-            # For now, just return success
+        job_model = JobModel.objects.filter(
+            module_name=SyncServiceNowGroupDevices.__module__,
+            job_class_name=SyncServiceNowGroupDevices.__name__,
+        ).first()
+        if job_model is None or not job_model.enabled:
             return Response(
-                {"status": "success", "message": "Device synchronization triggered"},
-                status=status.HTTP_200_OK
+                {"status": "error", "message": f'The "{SyncServiceNowGroupDevices.Meta.name}" job is not enabled'},
+                status=status.HTTP_400_BAD_REQUEST,
             )
+
+        try:
+            job_result = enqueue_sync_job(service_now_group, request)
         except Exception as e:
             return Response(
                 {"status": "error", "message": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        return Response(
+            {
+                "status": "queued",
+                "job_result_id": job_result.pk,
+                "url": reverse("extras-api:jobresult-detail", kwargs={"pk": job_result.pk}, request=request),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @staticmethod
+    def _snapshot_data(snapshot):
+        """Return the API representation of a membership snapshot."""
+        if snapshot is None:
+            return None
+        return {"id": snapshot.pk, "created": snapshot.created, "device_count": snapshot.device_count}
+
+    @action(detail=True, methods=["get"], url_path="membership-diff")
+    def membership_diff(self, request, pk=None):
+        """
+        Get the devices added to and removed from this group since a snapshot.
+
+        Compares against the snapshot given by the ``snapshot`` query parameter,
+        or the group's latest snapshot, with a single merge pass over sorted IDs.
+        """
+        from ..snapshots import get_membership_diff
+
+        service_now_group = self.get_object()
+        snapshot = None
+        snapshot_id = request.query_params.get("snapshot")
+        if snapshot_id:
+            try:
+                snapshot = service_now_group.snapshots.get(pk=snapshot_id)
+            except (ValueError, ValidationError, ServiceNowGroupSnapshot.DoesNotExist):
+                return Response({"error": "Snapshot not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        diff = get_membership_diff(service_now_group, snapshot=snapshot)
+        return Response({
+            "snapshot": self._snapshot_data(diff.snapshot),
+            "added_count": len(diff.added),
+            "removed_count": len(diff.removed),
+            "added": diff.added,
+            "removed": diff.removed,
+        })
+
+    @action(detail=True, methods=["post"])
+    def snapshot(self, request, pk=None):
+        """Record the group's current devices as its latest snapshot, e.g. after a downstream sync."""
+        from ..snapshots import take_snapshot
+
+        service_now_group = self.get_object()
+        return Response(self._snapshot_data(take_snapshot(service_now_group)), status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], url_path="resolve-devices", permission_classes=[IsAuthenticated])
+    def resolve_devices(self, request):
+        """
+        Resolve the ServiceNow groups of many devices at once.
+
+        Accepts ``{"devices": [...]}`` where each entry is a device ID or name and
+        returns each matched device with its groups and assignment sources.
+
+        The work is set-based: one query resolves every ID and name to a device and
+        one query reads all of their rows from the membership table, where dynamic
+        group membership is already evaluated. The query count is therefore constant
+        and the response time grows linearly with the number of devices requested.
+        """
+        from .serializers import DeviceResolutionRequestSerializer, DeviceServiceNowGroupSerializer
+
+        request_serializer = DeviceResolutionRequestSerializer(data=request.data)
+        request_serializer.is_valid(raise_exception=True)
+        identifiers = request_serializer.validated_data["devices"]
+
+        device_ids, device_names = {}, set()
+        for identifier in identifiers:
+            try:
+                device_ids[identifier] = uuid.UUID(identifier)
+            except ValueError:
+                device_names.add(identifier)
+
+        devices = list(
+            Device.objects.restrict(request.user, "view")
+            .filter(Q(pk__in=device_ids.values()) | Q(name__in=device_names))
+            .only("pk", "name")
+        )
+        resolver = ServiceNowGroupResolver(groups=ServiceNowGroup.objects.restrict(request.user, "view"))
+        resolver.prefetch(device.pk for device in devices)
+
+        results = []
+        for device in devices:
+            service_now_groups = []
+            for group, sources in resolver.get_group_sources(device).items():
+                group.sources = sources
+                service_now_groups.append(group)
+            serializer = DeviceServiceNowGroupSerializer(service_now_groups, many=True, context={"request": request})
+            results.append({
+                "device": {"id": device.pk, "name": device.name},
+                "groups": serializer.data,
+            })
+
+        found_ids = {device.pk for device in devices}
+        found_names = {device.name for device in devices}
+        not_found = [
+            identifier
+            for identifier in identifiers
+            if device_ids.get(identifier) not in found_ids and identifier not in found_names
+        ]
+        return Response({
+            "count": len(results),
+            "results": results,
+            "not_found": not_found,
+        })
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream every (group, device) pair as NDJSON or CSV.
+
+        Query parameters:
+            export_format: ``ndjson`` (default) or ``csv``
+            columns: Comma-separated columns to emit, see ``export.EXPORT_COLUMNS``
+
+        Rows are read through a server-side cursor and written as they arrive, so
+        memory use does not grow with the number of pairs exported.
+        """
+        export_format = request.query_params.get("export_format", EXPORT_FORMAT_NDJSON)
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return Response(
+                {"error": f"export_format must be one of: {', '.join(EXPORT_CONTENT_TYPES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        columns = request.query_params.get("columns")
+        try:
+            columns = parse_columns(columns.split(",") if columns is not None else None)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        memberships = ServiceNowGroupMembership.objects.filter(
+            group__in=ServiceNowGroup.objects.restrict(request.user, "view"),
+            device__in=Device.objects.restrict(request.user, "view"),
+        )
+        response = StreamingHttpResponse(
+            render_export(iter_membership_rows(columns, memberships), columns, export_format),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="service_now_group_memberships.{export_format}"'
+        return response
 
     @action(detail=False, methods=["get"])
     def statistics(self, request):
-        """Get statistics about ServiceNow groups."""
-        # Defer model import until runtime
-        total_groups = ServiceNowGroup.objects.count()
-        groups_with_devices = ServiceNowGroup.objects.filter(devices__isnull=False).distinct().count()
-        groups_with_locations = ServiceNowGroup.objects.filter(locations__isnull=False).distinct().count()
-        groups_with_dynamic_groups = ServiceNowGroup.objects.filter(dynamic_groups__isnull=False).distinct().count()
-        
+        """
+        Get statistics about ServiceNow groups and device coverage.
+
+        Computed by a single query and cached for ``statistics_cache_timeout``
+        seconds; membership and assignment changes drop the cached copy.
+        """
+        return Response({
+            **get_group_statistics(),
+            "membership_cache": get_cache_statistics(),
+        })
+
+
+class DeviceServiceNowGroupsViewSet(GenericViewSet):
+    """Reverse lookup of the ServiceNow groups that apply to a device."""
+
+    queryset = Device.objects.all()
+    lookup_field = "pk"
+
+    @action(detail=True, methods=["get"])
+    def groups(self, request, pk=None):
+        """
+        Get every ServiceNow group associated with this device and how it is assigned.
+
+        Runs two queries regardless of the number of groups: one to fetch the
+        device and one to read its rows from the membership table.
+        """
+        from .serializers import DeviceServiceNowGroupSerializer
+
+        device = get_object_or_404(Device.objects.restrict(request.user, "view"), pk=pk)
+        resolver = ServiceNowGroupResolver(groups=ServiceNowGroup.objects.restrict(request.user, "view"))
+
+        service_now_groups = []
+        for group, sources in resolver.get_group_sources(device).items():
+            group.sources = sources
+            service_now_groups.append(group)
+
+        serializer = DeviceServiceNowGroupSerializer(service_now_groups, many=True, context={"request": request})
         return Response({
-            "total_groups": total_groups,
-            "groups_with_devices": groups_with_devices,
-            "groups_with_locations": groups_with_locations,
-            "groups_with_dynamic_groups": groups_with_dynamic_groups,
-        }) 
\ No newline at end of file
+            "device": {"id": device.pk, "name": device.name},
+            "count": len(service_now_groups),
+            "results": serializer.data,
+        })
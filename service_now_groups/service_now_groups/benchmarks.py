@@ -0,0 +1,172 @@
+"""Scaling benchmarks of ServiceNow group membership resolution."""
+
+import math
+import statistics
+import time
+import uuid
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.context_processors import PermWrapper
+from django.db import connection, transaction
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from . import ServiceNowGroupsConfig
+from .api.views import ServiceNowGroupViewSet
+from .models import ServiceNowGroup
+from .seeding import seed_topology
+from .template_content import DeviceServiceNowGroups
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Times each scenario is run; the first run is reported separately as the cold one.
+REPEAT = 5
+
+DEVICES_PER_SITE = 100
+SITES_PER_REGION = 10
+DYNAMIC_GROUPS = 10
+
+
+def topology(devices: int) -> Dict[str, int]:
+    """Return ``seed_topology`` arguments for roughly ``devices`` devices, one group per 100 devices."""
+    sites = max(1, math.ceil(devices / DEVICES_PER_SITE))
+    regions = max(1, sites // SITES_PER_REGION)
+    sites_per_region = math.ceil(sites / regions)
+    return {
+        "regions": regions,
+        "sites_per_region": sites_per_region,
+        "devices_per_site": math.ceil(devices / (regions * sites_per_region)),
+        "groups": max(10, devices // 100),
+        "dynamic_groups": DYNAMIC_GROUPS,
+    }
+
+
+def measure(scenario: Callable[[], object], repeat: int = REPEAT) -> Dict:
+    """
+    Run ``scenario`` ``repeat`` times, recording wall time and query count.
+
+    Returns:
+        dict: Cold (first run) and median wall time in milliseconds and query counts
+    """
+    times, queries = [], []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            scenario()
+            times.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured))
+    return {
+        "cold_ms": round(times[0], 3),
+        "median_ms": round(statistics.median(times), 3),
+        "max_ms": round(max(times), 3),
+        "cold_queries": queries[0],
+        "median_queries": statistics.median(queries),
+    }
+
+
+def _api_host() -> str:
+    """Return a host name accepted by ``ALLOWED_HOSTS`` for API requests."""
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != "*" and not host.startswith(".")]
+    return hosts[0] if hosts else "localhost"
+
+
+def _scenarios(user) -> Tuple[Dict[str, Callable[[], object]], Dict[str, str]]:
+    """
+    Return the benchmarked operations against the largest ServiceNow group with members and one of its devices.
+
+    Scenarios that need a group or a device are skipped when the seeded topology
+    has none, e.g. when no group matched any device.
+
+    Returns:
+        tuple: Scenarios by name, and the reason each skipped scenario was skipped by name
+    """
+    groups = ServiceNowGroup.objects.order_by("-cached_device_count")
+    group = groups.filter(cached_device_count__gt=0).first() or groups.first()
+    device = group.get_associated_devices().first() if group is not None else None
+    list_view = ServiceNowGroupViewSet.as_view({"get": "list"})
+
+    def render_panel():
+        request = RequestFactory().get("/")
+        request.user = user
+        extension = DeviceServiceNowGroups(
+            {"object": device, "request": request, "settings": settings, "perms": PermWrapper(user)}
+        )
+        return extension.left_page(request, device)
+
+    def list_api():
+        request = APIRequestFactory().get("/", {"limit": 50}, HTTP_HOST=_api_host())
+        force_authenticate(request, user=user)
+        return list_view(request).render()
+
+    scenarios = {
+        "get_associated_devices": (group, lambda: list(group.get_associated_devices())),
+        "is_device_associated": (device, lambda: group.is_device_associated(device)),
+        "device_count": (group, lambda: group.device_count),
+        "device_panel_render": (device, render_panel),
+        "list_api": (user, list_api),
+    }
+    skipped = {
+        name: "No ServiceNow group exists" if group is None else "No ServiceNow group has any devices"
+        for name, (subject, _) in scenarios.items()
+        if subject is None
+    }
+    return {name: scenario for name, (subject, scenario) in scenarios.items() if subject is not None}, skipped
+
+
+def run_benchmarks(
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    repeat: int = REPEAT,
+    seed: int = 0,
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict:
+    """
+    Benchmark membership resolution against seeded topologies of each size.
+
+    Each topology is seeded with ``seed_topology`` inside a transaction that is
+    rolled back once measured, so the database is left as it was.
+
+    Args:
+        sizes: Numbers of devices to seed, one topology each
+        repeat: Times each scenario is run
+        seed: Random seed for the group assignments
+        log: Optional callable receiving progress messages
+
+    Returns:
+        dict: JSON-serializable report with one result per size
+    """
+    log = log or (lambda message: None)
+    report = {
+        "created": timezone.now().isoformat(),
+        "version": ServiceNowGroupsConfig.version,
+        "database": connection.vendor,
+        "repeat": repeat,
+        "results": [],
+    }
+    for size in sizes:
+        with transaction.atomic():
+            log(f"Seeding {size} devices...")
+            start = time.perf_counter()
+            counts = seed_topology(**topology(size), seed=seed, prefix=f"benchmark-{size}")
+            seed_seconds = time.perf_counter() - start
+
+            user = get_user_model().objects.create(username=f"benchmark-{uuid.uuid4().hex}", is_superuser=True)
+            log(f"Measuring {size} devices...")
+            scenarios, skipped = _scenarios(user)
+            for name, reason in skipped.items():
+                log(f"Skipping {name}: {reason}")
+            report["results"].append(
+                {
+                    "devices": counts["devices"],
+                    "groups": counts["groups"],
+                    "memberships": counts["memberships"],
+                    "seed_seconds": round(seed_seconds, 3),
+                    "scenarios": {name: measure(scenario, repeat) for name, scenario in scenarios.items()},
+                    "skipped": skipped,
+                }
+            )
+            transaction.set_rollback(True)
+    return report
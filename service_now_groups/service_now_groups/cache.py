@@ -0,0 +1,137 @@
+"""Redis-backed cache of resolved ServiceNow group membership."""
+
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Union
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .device_sets import DeviceSet, device_set
+from .metrics import FORWARD, REVERSE, time_resolution
+from .models import ServiceNowGroupMembership
+from .transactions import OnCommitBatch
+
+CACHE_KEY_PREFIX = "service_now_groups:membership:v1"
+
+GROUP = "group"
+DEVICE = "device"
+
+# Devices of a group, or groups of a device
+IDSet = Union[DeviceSet, FrozenSet]
+
+
+def _app_settings() -> Dict:
+    """Return the PLUGINS_CONFIG settings of this app."""
+    return settings.PLUGINS_CONFIG.get("service_now_groups", {})
+
+
+def is_enabled() -> bool:
+    """Return whether the membership cache is enabled."""
+    return bool(_app_settings().get("enable_membership_cache", True))
+
+
+def _version_key(kind: str, pk) -> str:
+    return f"{CACHE_KEY_PREFIX}:{kind}:{pk}:version"
+
+
+def _version(kind: str, pk) -> int:
+    """
+    Return the current version of an object's cached entry.
+
+    A missing version is seeded from the clock rather than 1 so that an evicted
+    version key can never make an older entry reachable again.
+    """
+    return cache.get_or_set(_version_key(kind, pk), time.time_ns(), timeout=None)
+
+
+def _record(outcome: str) -> None:
+    """Increment the hit or miss counter."""
+    key = f"{CACHE_KEY_PREFIX}:stats:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def _load(kind: str, loader: Callable[[], Optional[IDSet]]) -> Optional[IDSet]:
+    """Load an ID set from the membership table, timing it as a forward or reverse resolution."""
+    with time_resolution(FORWARD if kind == GROUP else REVERSE):
+        return loader()
+
+
+def _get(kind: str, pk, loader: Callable[[], Optional[IDSet]]) -> Optional[IDSet]:
+    """Return the cached ID set of an object, loading and storing it on a miss; None is not stored."""
+    if not is_enabled() or _version_key(kind, pk) in _pending_invalidations.pending:
+        # Entries of objects changed by this thread's uncommitted transaction are stale for it
+        return _load(kind, loader)
+
+    key = f"{CACHE_KEY_PREFIX}:{kind}:{pk}:{_version(kind, pk)}"
+    ids = cache.get(key)
+    if ids is not None:
+        _record("hits")
+        return ids
+
+    _record("misses")
+    ids = _load(kind, loader)
+    if ids is not None:
+        cache.set(key, ids, _app_settings().get("membership_cache_timeout", 300))
+    return ids
+
+
+def get_group_device_ids(group_pk) -> Optional[DeviceSet]:
+    """Return the devices associated with a ServiceNow group as a compact DeviceSet, or None if any is not indexed."""
+    return _get(
+        GROUP,
+        group_pk,
+        lambda: device_set(
+            ServiceNowGroupMembership.objects.filter(group_id=group_pk),
+            lookup="device__service_now_groups_index__index",
+        ),
+    )
+
+
+def get_device_group_ids(device_pk) -> FrozenSet:
+    """Return the IDs of the ServiceNow groups associated with a device; devices have few, so a frozenset."""
+    return _get(
+        DEVICE,
+        device_pk,
+        lambda: frozenset(
+            ServiceNowGroupMembership.objects.filter(device_id=device_pk).values_list("group_id", flat=True)
+        ),
+    )
+
+
+def _delete_versions(version_keys) -> None:
+    """Delete version keys in one call; the versions are seeded afresh, so the old entries become unreachable."""
+    cache.delete_many(list(version_keys))
+
+
+# Version keys of the objects changed by the current thread's transaction
+_pending_invalidations = OnCommitBatch(_delete_versions)
+
+
+def invalidate(group_ids: Iterable = (), device_ids: Iterable = ()) -> None:
+    """
+    Invalidate the cached entries of the given groups and devices once the current transaction commits.
+
+    Entries are never deleted; the version keys of every object changed in the
+    transaction are deleted together, in one call, which makes the current
+    entries unreachable and lets them expire on their own. Until then lookups of
+    those objects bypass the cache in the changing thread.
+    """
+    _pending_invalidations.add(
+        [_version_key(GROUP, pk) for pk in group_ids] + [_version_key(DEVICE, pk) for pk in device_ids]
+    )
+
+
+def get_statistics() -> Dict:
+    """Return the membership cache hit and miss counters."""
+    hits = cache.get(f"{CACHE_KEY_PREFIX}:stats:hits", 0)
+    misses = cache.get(f"{CACHE_KEY_PREFIX}:stats:misses", 0)
+    lookups = hits + misses
+    return {
+        "enabled": is_enabled(),
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+    }
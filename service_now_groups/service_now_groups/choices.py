@@ -0,0 +1,17 @@
+"""Choice sets for the ServiceNow Groups app."""
+
+from nautobot.apps.choices import ChoiceSet
+
+
+class MembershipSourceChoices(ChoiceSet):
+    """How a device came to be associated with a ServiceNow group."""
+
+    SOURCE_LOCATION = "location"
+    SOURCE_DYNAMIC_GROUP = "dynamic_group"
+    SOURCE_DEVICE = "device"
+
+    CHOICES = (
+        (SOURCE_LOCATION, "Location"),
+        (SOURCE_DYNAMIC_GROUP, "Dynamic Group"),
+        (SOURCE_DEVICE, "Explicit Device"),
+    )
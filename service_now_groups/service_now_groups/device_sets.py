@@ -0,0 +1,185 @@
+"""
+Compact sets of devices for membership set algebra.
+
+Device primary keys are UUIDs, which as Python objects in a set cost around 100
+bytes each. Every device is instead given a dense integer index
+(``DeviceIndex``), and a set of devices is held as a bitmap of those indexes in
+a single Python integer: one bit per index in memory, zlib-compressed in the
+cache and on the wire so that sparse sets stay small. Unions, intersections,
+differences and counts are single integer operations (``|``, ``&``, ``& ~`` and
+a popcount) that run over machine words in C.
+"""
+
+import zlib
+from typing import Iterable, Optional
+
+from django.db import models
+
+from nautobot.dcim.models import Device
+
+from .models import DeviceIndex
+
+# Lookup from Device to its dense index.
+INDEX_LOOKUP = "service_now_groups_index__index"
+
+# Number of index rows written per INSERT statement.
+BATCH_SIZE = 1000
+
+BYTE_ORDER = "little"
+
+
+try:
+    # Number of set bits of a non-negative integer, Python 3.10+
+    _popcount = int.bit_count
+except AttributeError:
+
+    def _popcount(bits: int) -> int:
+        """Return the number of set bits of a non-negative integer."""
+        return bin(bits).count("1")
+
+
+class DeviceSet:
+    """Immutable set of device indexes stored as the bits of an integer."""
+
+    __slots__ = ("_bits",)
+
+    def __init__(self, indexes: Iterable[int] = ()):
+        """Initialize the set from device indexes in any order, ignoring duplicates."""
+        bitmap = bytearray()
+        for index in indexes:
+            if index < 0:
+                raise ValueError(f"Device indexes can't be negative: {index}")
+            position = index >> 3
+            if position >= len(bitmap):
+                bitmap.extend(bytes(position + 1 - len(bitmap)))
+            bitmap[position] |= 1 << (index & 7)
+        self._bits = int.from_bytes(bitmap, BYTE_ORDER)
+
+    @classmethod
+    def _from_bits(cls, bits: int) -> "DeviceSet":
+        """Wrap a bitmap integer."""
+        device_set = cls.__new__(cls)
+        device_set._bits = bits
+        return device_set
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DeviceSet":
+        """Return the set packed by ``to_bytes``."""
+        return cls._from_bits(int.from_bytes(data, BYTE_ORDER))
+
+    def to_bytes(self) -> bytes:
+        """Pack the set into a bitmap of one bit per index up to the highest one."""
+        return self._bits.to_bytes((self._bits.bit_length() + 7) // 8, BYTE_ORDER)
+
+    @classmethod
+    def _from_compressed(cls, data: bytes) -> "DeviceSet":
+        """Return the set pickled by ``__reduce__``."""
+        return cls.from_bytes(zlib.decompress(data))
+
+    def __reduce__(self):
+        """Pickle as the compressed bitmap, so cached sets stay compact however sparse they are."""
+        return (DeviceSet._from_compressed, (zlib.compress(self.to_bytes()),))
+
+    def __len__(self) -> int:
+        """Return the number of devices."""
+        return _popcount(self._bits)
+
+    def __bool__(self) -> bool:
+        """Return whether the set holds any device."""
+        return self._bits != 0
+
+    def __iter__(self):
+        """Iterate over the device indexes in ascending order."""
+        for position, byte in enumerate(self.to_bytes()):
+            if byte:
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield (position << 3) + bit
+
+    def __contains__(self, index) -> bool:
+        """Return whether ``index`` is in the set."""
+        return isinstance(index, int) and index >= 0 and bool(self._bits >> index & 1)
+
+    def __eq__(self, other) -> bool:
+        """Return whether both sets hold the same devices."""
+        if not isinstance(other, DeviceSet):
+            return NotImplemented
+        return self._bits == other._bits
+
+    def __hash__(self) -> int:
+        """Return a hash of the bitmap."""
+        return hash(self._bits)
+
+    def __repr__(self) -> str:
+        """Return a readable representation of the set."""
+        return f"<DeviceSet: {len(self)} devices>"
+
+    def union(self, *others: "DeviceSet") -> "DeviceSet":
+        """Return the devices in this set or in any of ``others``."""
+        bits = self._bits
+        for other in others:
+            bits |= other._bits
+        return DeviceSet._from_bits(bits)
+
+    def intersection(self, *others: "DeviceSet") -> "DeviceSet":
+        """Return the devices in this set and in all of ``others``."""
+        bits = self._bits
+        for other in others:
+            bits &= other._bits
+        return DeviceSet._from_bits(bits)
+
+    def difference(self, *others: "DeviceSet") -> "DeviceSet":
+        """Return the devices in this set but in none of ``others``."""
+        bits = self._bits
+        for other in others:
+            bits &= ~other._bits
+        return DeviceSet._from_bits(bits)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def intersection_count(self, other: "DeviceSet") -> int:
+        """Return the number of devices in both sets without building a DeviceSet of them."""
+        return _popcount(self._bits & other._bits)
+
+
+def index_devices() -> int:
+    """
+    Give every device without a dense index one.
+
+    Indexes are created when devices are saved; this covers devices created
+    without signals, e.g. by ``bulk_create``, and runs after migrations and
+    with every full membership rebuild.
+
+    Returns:
+        int: Number of devices indexed
+    """
+    missing = Device.objects.filter(service_now_groups_index__isnull=True).values_list("pk", flat=True)
+    return len(
+        DeviceIndex.objects.bulk_create(
+            [DeviceIndex(device_id=pk) for pk in missing], batch_size=BATCH_SIZE, ignore_conflicts=True
+        )
+    )
+
+
+def device_set(queryset: models.QuerySet, lookup: str = INDEX_LOOKUP) -> Optional[DeviceSet]:
+    """
+    Return the devices selected by ``queryset`` as a DeviceSet.
+
+    Only the indexes are read from the database; no UUIDs are loaded. Nothing is
+    written: devices missing an index, e.g. created by ``bulk_create`` since the
+    last ``index_devices``, make the set unavailable and callers fall back to SQL.
+
+    Args:
+        queryset: Queryset of devices, or of rows relating to devices
+        lookup: Lookup from the queryset's model to the device index, e.g.
+            ``"device__service_now_groups_index__index"`` for membership rows
+
+    Returns:
+        DeviceSet: Devices selected by ``queryset``, or None if any is not indexed
+    """
+    indexes = list(queryset.values_list(lookup, flat=True))
+    if None in indexes:
+        return None
+    return DeviceSet(indexes)
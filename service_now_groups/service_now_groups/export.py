@@ -0,0 +1,202 @@
+"""Streaming exports of ServiceNow group membership and assignments."""
+
+import csv
+import json
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.db import models
+from django.db.models.functions import Coalesce
+
+from .choices import MembershipSourceChoices
+from .models import ServiceNowGroup, ServiceNowGroupMembership
+
+# Number of rows fetched per round trip from the server-side cursor.
+CHUNK_SIZE = 2000
+
+# Exportable columns, mapped to the ServiceNowGroupMembership field they are read from.
+EXPORT_COLUMNS = {
+    "group_id": "group_id",
+    "group_name": "group__name",
+    "device_id": "device_id",
+    "device_name": "device__name",
+    "device_serial": "device__serial",
+    "location": "device__location__name",
+    "sources": "source",
+}
+DEFAULT_COLUMNS = ["group_id", "group_name", "device_id", "device_name"]
+
+# Assignment relations counted by ``annotate_assignment_counts``.
+ASSIGNMENT_FIELDS = ["locations", "dynamic_groups", "devices"]
+
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_CONTENT_TYPES = {
+    EXPORT_FORMAT_NDJSON: "application/x-ndjson",
+    EXPORT_FORMAT_CSV: "text/csv",
+}
+
+
+def parse_columns(columns: Optional[Iterable[str]]) -> List[str]:
+    """
+    Validate a list of requested export columns.
+
+    Args:
+        columns: Column names, or None for ``DEFAULT_COLUMNS``
+
+    Returns:
+        list: The requested columns in order, without duplicates
+
+    Raises:
+        ValueError: If a column is unknown or no column is requested
+    """
+    if columns is None:
+        return list(DEFAULT_COLUMNS)
+    columns = list(dict.fromkeys(column.strip() for column in columns if column.strip()))
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}. Choose from: {', '.join(EXPORT_COLUMNS)}")
+    if not columns:
+        raise ValueError("At least one column must be requested")
+    return columns
+
+
+def iter_membership_rows(
+    columns: Iterable[str],
+    memberships: Optional[models.QuerySet] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Dict]:
+    """
+    Yield one dict per (group, device) pair, reading rows through a server-side cursor.
+
+    A device associated with a group by several assignment methods is emitted
+    once, with all of its sources joined by ``|`` in the ``sources`` column. Rows
+    arrive ordered by group and device, so only the current pair is held in memory.
+
+    Args:
+        columns: Export columns to include, see ``EXPORT_COLUMNS``
+        memberships: Membership rows to export, e.g. restricted to what a user
+            may view; every row when omitted
+        chunk_size: Rows fetched per round trip
+
+    Yields:
+        dict: ``{column: value}`` for each pair
+    """
+    columns = list(columns)
+    if memberships is None:
+        memberships = ServiceNowGroupMembership.objects.all()
+    fields = ["group_id", "device_id"] + [EXPORT_COLUMNS[column] for column in columns if column != "sources"]
+    fields = list(dict.fromkeys(fields)) + ["source"]
+    rows = memberships.order_by("group_id", "device_id", "source").values_list(*fields).iterator(chunk_size=chunk_size)
+
+    def _emit(values, sources):
+        row = dict(zip(fields, values))
+        return {
+            column: "|".join(sources) if column == "sources" else row[EXPORT_COLUMNS[column]]
+            for column in columns
+        }
+
+    current_pair, current_values, sources = None, None, []
+    for values in rows:
+        pair = values[:2]
+        if pair != current_pair:
+            if current_pair is not None:
+                yield _emit(current_values, sources)
+            current_pair, current_values, sources = pair, values, []
+        sources.append(values[-1])
+    if current_pair is not None:
+        yield _emit(current_values, sources)
+
+
+def _count_subquery(queryset: models.QuerySet, group_field: str, counted_field: str) -> Coalesce:
+    """Return a correlated subquery counting the distinct ``counted_field`` values per group, 0 when none."""
+    counts = (
+        queryset.filter(**{group_field: models.OuterRef("pk")})
+        .order_by()
+        .values(group_field)
+        .annotate(count=models.Count(counted_field, distinct=True))
+        .values("count")
+    )
+    return Coalesce(models.Subquery(counts), 0)
+
+
+def annotate_assignment_counts(queryset: models.QuerySet, include_sources: bool = False) -> models.QuerySet:
+    """
+    Annotate ServiceNow groups with their assignment counts.
+
+    Every count is a correlated subquery of the same SELECT, so rows never fan
+    out across the assignment relations and the groups are read in one query.
+    ``ServiceNowGroup.assignment_summary`` uses the ``<field>_assignment_count``
+    annotations instead of querying.
+
+    Args:
+        queryset: ServiceNow groups to annotate
+        include_sources: Also annotate ``<source>_device_count`` with the number
+            of devices associated through each assignment source
+
+    Returns:
+        QuerySet: The annotated groups
+    """
+    annotations = {
+        f"{field_name}_assignment_count": _count_subquery(
+            getattr(ServiceNowGroup, field_name).through.objects.all(),
+            "servicenowgroup_id",
+            "pk",
+        )
+        for field_name in ASSIGNMENT_FIELDS
+    }
+    if include_sources:
+        annotations.update(
+            (
+                f"{source}_device_count",
+                _count_subquery(ServiceNowGroupMembership.objects.filter(source=source), "group_id", "device_id"),
+            )
+            for source in MembershipSourceChoices.values()
+        )
+    return queryset.annotate(**annotations)
+
+
+class _Echo:
+    """File-like object whose ``write`` returns what it is given, for streaming ``csv.writer`` output."""
+
+    def write(self, value):
+        """Return ``value`` instead of buffering it."""
+        return value
+
+
+def _json_default(value):
+    """Serialize UUIDs and other non-JSON values as strings."""
+    return str(value)
+
+
+def render_export(rows: Iterable[Dict], columns: List[str], export_format: str) -> Iterator[str]:
+    """
+    Render export rows as NDJSON or CSV lines.
+
+    Args:
+        rows: Rows from ``iter_membership_rows``
+        columns: Export columns, in output order
+        export_format: ``EXPORT_FORMAT_NDJSON`` or ``EXPORT_FORMAT_CSV``
+
+    Yields:
+        str: One line of output at a time, starting with the CSV header if any
+
+    Raises:
+        ValueError: If ``export_format`` is not supported
+    """
+    if export_format == EXPORT_FORMAT_NDJSON:
+        for row in rows:
+            yield json.dumps(row, default=_json_default) + "\n"
+    elif export_format == EXPORT_FORMAT_CSV:
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([row[column] if row[column] is not None else "" for column in columns])
+    else:
+        raise ValueError(f"Unsupported format {export_format!r}. Choose from: {', '.join(EXPORT_CONTENT_TYPES)}")
+
+
+def render_csv(rows: Iterable[Iterable]) -> Iterator[str]:
+    """Render rows, header included, as CSV lines one at a time."""
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow(row)
@@ -1,12 +1,34 @@
 """Filtering for ServiceNow Groups."""
 
-from nautobot.apps.filters import NautobotFilterSet
-from .models import ServiceNowGroup
+from django_filters import rest_framework as filters
+
+from nautobot.apps.filters import BaseFilterSet, NaturalKeyOrPKMultipleChoiceFilter, NautobotFilterSet
+from nautobot.dcim.models import Device
+from .models import DeviceIndex, ServiceNowGroup
 
 class ServiceNowGroupFilterSet(NautobotFilterSet):
     """Filter for ServiceNowGroup."""
 
+    device_count = filters.NumberFilter(field_name="cached_device_count")
+    device_count__gte = filters.NumberFilter(field_name="cached_device_count", lookup_expr="gte")
+    device_count__lte = filters.NumberFilter(field_name="cached_device_count", lookup_expr="lte")
+
     class Meta:
         """Meta attributes for filter."""
         model = ServiceNowGroup
-        fields = ["name", "description"] 
\ No newline at end of file
+        fields = ["name", "description"] 
+
+
+class DeviceIndexFilterSet(BaseFilterSet):
+    """Filter for the effective ServiceNow groups of devices, by device."""
+
+    device = NaturalKeyOrPKMultipleChoiceFilter(
+        queryset=Device.objects.all(),
+        to_field_name="name",
+        label="Device (name or ID)",
+    )
+
+    class Meta:
+        """Meta attributes for filter."""
+        model = DeviceIndex
+        fields = ["device"]
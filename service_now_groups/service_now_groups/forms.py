@@ -12,4 +12,4 @@ class ServiceNowGroupForm(NautobotModelForm):
     class Meta:
         """Meta attributes."""
         model = ServiceNowGroup
-        fields = ["name", "description", "locations", "dynamic_groups", "devices"] 
\ No newline at end of file
+        fields = ["name", "description", "locations", "include_descendant_locations", "dynamic_groups", "devices"] 
\ No newline at end of file
@@ -0,0 +1 @@
+"""GraphQL extensions of the ServiceNow Groups app."""
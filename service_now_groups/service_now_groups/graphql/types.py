@@ -0,0 +1,82 @@
+"""
+GraphQL types resolving the effective ServiceNow groups of devices.
+
+``DeviceServiceNowGroupsType`` is registered through the app's ``graphql_types``
+for the plugin-owned ``DeviceIndex`` model, one row per device, so Nautobot
+generates a ``service_now_groups_for_devices`` query filterable by device. Its
+``service_now_groups`` field reads through one ``DeviceServiceNowGroupsLoader``
+per request, which collects every device the query touches and resolves them
+together with a single membership query.
+"""
+
+import graphene
+import graphene_django_optimizer as gql_optimizer
+from django.conf import settings
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from nautobot.extras.registry import registry
+
+from ..filters import DeviceIndexFilterSet
+from ..models import DeviceIndex, ServiceNowGroup
+from ..resolver import ServiceNowGroupResolver
+
+LOADER_ATTRIBUTE = "_service_now_groups_graphql_loader"
+
+
+def _service_now_group_type():
+    """Return the schema type Nautobot generated for ServiceNowGroup."""
+    return registry["graphql_types"]["service_now_groups.servicenowgroup"]
+
+
+class DeviceServiceNowGroupsLoader(DataLoader):
+    """
+    Batch the ServiceNow groups of every device resolved by one GraphQL request.
+
+    Devices requested while the query is being executed are queued and resolved
+    together by ``ServiceNowGroupResolver.prefetch``, so a query over any number
+    of devices costs a single membership query. Groups are restricted to those
+    the requesting user may view.
+    """
+
+    def __init__(self, user):
+        """Initialize the loader for ``user``."""
+        super().__init__()
+        self.resolver = ServiceNowGroupResolver(groups=ServiceNowGroup.objects.restrict(user, "view"))
+
+    @classmethod
+    def for_request(cls, request) -> "DeviceServiceNowGroupsLoader":
+        """Return the loader attached to ``request``, creating it on first use."""
+        loader = getattr(request, LOADER_ATTRIBUTE, None)
+        if loader is None:
+            loader = cls(request.user)
+            setattr(request, LOADER_ATTRIBUTE, loader)
+        return loader
+
+    def batch_load_fn(self, device_ids):
+        """Resolve the ServiceNow groups of all queued devices at once, in the order of ``device_ids``."""
+        self.resolver.prefetch(device_ids)
+        groups_by_device = {pk: self.resolver.get_groups_for_device_id(pk) for pk in set(device_ids)}
+        return Promise.resolve([groups_by_device.get(pk) for pk in device_ids])
+
+
+class DeviceServiceNowGroupsType(gql_optimizer.OptimizedDjangoObjectType):
+    """The effective ServiceNow groups of one device."""
+
+    service_now_groups = graphene.List(_service_now_group_type)
+
+    class Meta:
+        model = DeviceIndex
+        filterset_class = DeviceIndexFilterSet
+        fields = ["device"]
+
+    def resolve_service_now_groups(self, info):
+        """Resolve the effective ServiceNow groups of the device through the request's loader."""
+        return DeviceServiceNowGroupsLoader.for_request(info.context).load(self.device_id)
+
+
+graphql_types = (
+    [DeviceServiceNowGroupsType]
+    if settings.PLUGINS_CONFIG.get("service_now_groups", {}).get("enable_graphql", True)
+    else []
+)
@@ -0,0 +1,69 @@
+"""Jobs for the ServiceNow Groups app."""
+
+from nautobot.extras.jobs import Job, ObjectVar, run_job
+from nautobot.extras.models import JobResult
+from nautobot.extras.utils import get_job_content_type
+from nautobot.utilities.utils import copy_safe_request
+
+from .models import ServiceNowGroup
+from .servicenow import ServiceNowError, push_group_membership
+from .snapshots import take_snapshot
+
+name = "ServiceNow Groups"
+
+
+class SyncServiceNowGroupDevices(Job):
+    """Push the devices of a ServiceNow group to the configured ServiceNow instance."""
+
+    group = ObjectVar(
+        model=ServiceNowGroup,
+        description="ServiceNow group whose devices are pushed",
+    )
+
+    class Meta:
+        name = "Sync ServiceNow Group Devices"
+        description = "Push the devices of a ServiceNow group to ServiceNow in concurrent batches"
+        has_sensitive_variables = False
+
+    def run(self, data, commit):
+        """Push the group's membership, or only count it when not committing."""
+        group = data["group"]
+        if not commit:
+            self.log_info(obj=group, message=f"Dry run: {group.cached_device_count} device(s) would be pushed")
+            return
+
+        try:
+            result = push_group_membership(group)
+        except ServiceNowError as e:
+            self.log_failure(obj=group, message=f"ServiceNow push failed: {e}")
+            return
+
+        # Later membership diffs are relative to what ServiceNow now holds
+        take_snapshot(group)
+        message = (
+            f"Pushed {result.records} record(s) in {result.batches} batch(es) "
+            f"using {result.requests} request(s) and {result.retries} retry(ies)"
+        )
+        self.log_success(obj=group, message=message)
+        return message
+
+
+def enqueue_sync_job(group: ServiceNowGroup, request) -> JobResult:
+    """
+    Enqueue ``SyncServiceNowGroupDevices`` for a group on behalf of the requesting user.
+
+    Returns:
+        JobResult: The queued job's result, for polling
+    """
+    return JobResult.enqueue_job(
+        run_job,
+        SyncServiceNowGroupDevices.class_path,
+        get_job_content_type(),
+        request.user,
+        data=SyncServiceNowGroupDevices.serialize_data({"group": group}),
+        request=copy_safe_request(request),
+        commit=True,
+    )
+
+
+jobs = [SyncServiceNowGroupDevices]
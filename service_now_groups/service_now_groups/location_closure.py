@@ -0,0 +1,102 @@
+"""Maintenance of the precomputed ``dcim.Location`` closure table."""
+
+from typing import Set
+
+from django.db import models, transaction
+
+from nautobot.dcim.models import Location
+
+from .models import LocationClosure
+
+# Number of closure rows written per INSERT statement.
+BATCH_SIZE = 1000
+
+
+def descendant_locations(locations) -> models.QuerySet:
+    """
+    Return a lazy subquery of every location at or below any of ``locations``.
+
+    Args:
+        locations: Location queryset or primary keys
+
+    Returns:
+        QuerySet: ``values("descendant")`` usable in ``location__in`` lookups
+    """
+    return LocationClosure.objects.filter(ancestor__in=locations).values("descendant")
+
+
+def ancestor_locations(location_id) -> models.QuerySet:
+    """
+    Return a lazy subquery of every location at or above ``location_id``.
+
+    Returns:
+        QuerySet: ``values("ancestor")`` usable in ``location__in`` lookups
+    """
+    return LocationClosure.objects.filter(descendant_id=location_id).values("ancestor")
+
+
+def rebuild_location_closure() -> int:
+    """
+    Rebuild the closure table in full from the parent of every location.
+
+    Returns:
+        int: Number of closure rows written
+    """
+    parents = dict(Location.objects.values_list("pk", "parent_id"))
+    rows = []
+    for location_id in parents:
+        ancestor_id, depth = location_id, 0
+        while ancestor_id is not None:
+            rows.append(LocationClosure(ancestor_id=ancestor_id, descendant_id=location_id, depth=depth))
+            ancestor_id, depth = parents.get(ancestor_id), depth + 1
+
+    with transaction.atomic():
+        LocationClosure.objects.all().delete()
+        LocationClosure.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def refresh_location_closure(location: Location) -> Set:
+    """
+    Bring the closure rows of a location and its subtree in line with its parent.
+
+    Creating a location adds its rows; moving one replaces the ancestors of every
+    location in its subtree. The number of queries does not depend on the depth
+    of the tree or the size of the subtree.
+
+    Args:
+        location: Location that was created or edited
+
+    Returns:
+        set: IDs of the locations above ``location`` before and after the change;
+            empty when its position in the tree did not change
+    """
+    current = dict(LocationClosure.objects.filter(descendant_id=location.pk).values_list("ancestor_id", "depth"))
+    expected = {location.pk: 0}
+    if location.parent_id:
+        expected.update(
+            (ancestor_id, depth + 1)
+            for ancestor_id, depth in LocationClosure.objects.filter(descendant_id=location.parent_id).values_list(
+                "ancestor_id", "depth"
+            )
+        )
+    if current == expected:
+        return set()
+
+    subtree = dict(LocationClosure.objects.filter(ancestor_id=location.pk).values_list("descendant_id", "depth"))
+    subtree[location.pk] = 0
+    old_ancestors = set(current) - {location.pk}
+    new_ancestors = set(expected) - {location.pk}
+
+    with transaction.atomic():
+        LocationClosure.objects.filter(descendant_id__in=list(subtree), ancestor_id__in=old_ancestors).delete()
+        rows = [
+            LocationClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=expected[ancestor_id] + depth)
+            for ancestor_id in new_ancestors
+            for descendant_id, depth in subtree.items()
+        ]
+        if location.pk not in current:
+            rows.append(LocationClosure(ancestor_id=location.pk, descendant_id=location.pk, depth=0))
+        LocationClosure.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+    return old_ancestors | new_ancestors
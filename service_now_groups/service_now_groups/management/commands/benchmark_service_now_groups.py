@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from service_now_groups.benchmarks import DEFAULT_SIZES, REPEAT, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = "Benchmark ServiceNow group membership resolution at several device counts and emit a JSON report."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default=",".join(str(size) for size in DEFAULT_SIZES),
+            help="Comma-separated device counts to seed (default: 1000,10000,100000)",
+        )
+        parser.add_argument("--repeat", type=int, default=REPEAT, help=f"Runs per scenario (default: {REPEAT})")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the group assignments (default: 0)")
+        parser.add_argument("--output", help="File to write the report to (default: standard output)")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError(f"Invalid --sizes: {options['sizes']}")
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1")
+
+        report = run_benchmarks(sizes, repeat=options["repeat"], seed=options["seed"], log=self.stderr.write)
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Wrote benchmark report to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from service_now_groups.export import (
+    CHUNK_SIZE,
+    EXPORT_CONTENT_TYPES,
+    EXPORT_FORMAT_NDJSON,
+    iter_membership_rows,
+    parse_columns,
+    render_export,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream every ServiceNow group to device pair as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=list(EXPORT_CONTENT_TYPES),
+            default=EXPORT_FORMAT_NDJSON,
+            help="Output format (default: ndjson)",
+        )
+        parser.add_argument(
+            "--columns",
+            help="Comma-separated columns to emit (default: group_id,group_name,device_id,device_name)",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to (default: standard output)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help=f"Rows fetched per database round trip (default: {CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            columns = parse_columns(options["columns"].split(",") if options["columns"] else None)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        lines = render_export(
+            iter_membership_rows(columns, chunk_size=options["chunk_size"]),
+            columns,
+            options["export_format"],
+        )
+        if options["output"]:
+            with open(options["output"], "w", newline="") as output:
+                output.writelines(lines)
+            self.stderr.write(self.style.SUCCESS(f"Exported ServiceNow group memberships to {options['output']}"))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
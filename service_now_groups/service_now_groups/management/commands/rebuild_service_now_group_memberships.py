@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from service_now_groups.location_closure import rebuild_location_closure
+from service_now_groups.membership import rebuild_all_memberships
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized ServiceNow group membership table in full."
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding the location closure...")
+        written = rebuild_location_closure()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} location closure row(s)"))
+
+        self.stdout.write("Rebuilding ServiceNow group memberships...")
+        written = rebuild_all_memberships()
+        self.stdout.write(self.style.SUCCESS(f"Updated {written} ServiceNow group membership row(s)"))
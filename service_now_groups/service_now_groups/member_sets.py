@@ -0,0 +1,178 @@
+"""
+Versioned cache of evaluated DynamicGroup member sets.
+
+Evaluating a dynamic group runs its filterset, which for broad filters is the
+most expensive part of resolving ServiceNow group membership. Each evaluated
+member set is kept as a compact ``DeviceSet`` in a process-local LRU under the
+dynamic group's ID, a hash of its filter and the current data version, so
+membership rebuilds, which diff member sets against the stored rows in Python,
+evaluate a dynamic group shared by many ServiceNow groups once. Anything that
+builds SQL uses the dynamic group's filter as a subquery instead, and never
+these sets.
+
+Editing the filter changes the hash. Changes to devices, to the objects device
+filters commonly reference (locations, device types, manufacturers, platforms,
+tenants, statuses, roles and tags) and to device tags bump the data version
+once their transaction commits. The version is kept in the shared cache so that
+every process stops using its older entries.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from nautobot.dcim.models import Device
+
+from .device_sets import DeviceSet, device_set
+from .metrics import DYNAMIC_GROUP_EVALUATION_FAILURES
+from .transactions import OnCommitBatch
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSION_KEY = "service_now_groups:dynamic_group_members:v1:data_version"
+
+
+def _app_settings() -> Dict:
+    """Return the PLUGINS_CONFIG settings of this app."""
+    return settings.PLUGINS_CONFIG.get("service_now_groups", {})
+
+
+class MemberSetCache:
+    """Thread-safe LRU of member sets whose entries also expire after a fixed time."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[DeviceSet]:
+        """Return the unexpired entry for ``key``, marking it most recently used, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, ids = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return ids
+
+    def set(self, key: Hashable, ids: DeviceSet, max_entries: int, timeout: float) -> None:
+        """Store ``ids`` under ``key``, evicting the least recently used entries beyond ``max_entries``."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, ids)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of entries, expired ones included."""
+        return len(self._entries)
+
+
+member_set_cache = MemberSetCache()
+
+
+def filter_hash(dynamic_group) -> str:
+    """Return a stable hash of a dynamic group's filter."""
+    serialized = json.dumps(dynamic_group.filter, sort_keys=True, default=str)
+    return hashlib.sha1(serialized.encode()).hexdigest()
+
+
+def data_version() -> int:
+    """
+    Return the current data version.
+
+    A missing version is seeded from the clock rather than 1 so that an evicted
+    version key can never make an older entry reachable again.
+    """
+    return cache.get_or_set(DATA_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def _increment_data_version(keys) -> None:
+    """Increment the shared data version."""
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        cache.set(DATA_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+# Set while the current thread's transaction has changes that are not reflected in the data version yet
+_pending_bump = OnCommitBatch(_increment_data_version)
+
+
+def bump_data_version() -> None:
+    """
+    Make every cached member set unreachable once the current transaction commits.
+
+    However many changes a transaction makes, the shared version is bumped once,
+    after they are visible to other processes. Until then ``get_member_ids``
+    bypasses the cache in the changing thread.
+    """
+    _pending_bump.add([DATA_VERSION_KEY])
+
+
+def _evaluate(dynamic_group, members: Callable) -> Optional[DeviceSet]:
+    """Load the member set of a dynamic group from its member query; None if it can't be evaluated."""
+    queryset = members(dynamic_group)
+    if queryset is None:
+        return None
+    start = time.perf_counter()
+    try:
+        # Dynamic groups of other content types have no device members
+        ids = device_set(queryset) if queryset.model is Device else DeviceSet()
+    except Exception:
+        logger.warning("Unable to load the members of dynamic group %s", dynamic_group)
+        DYNAMIC_GROUP_EVALUATION_FAILURES.inc()
+        return None
+    if ids is None:
+        logger.debug("Dynamic group %s has members without a device index", dynamic_group)
+        return None
+    logger.debug(
+        "Loaded dynamic group %s: %d members in %.3fs", dynamic_group, len(ids), time.perf_counter() - start
+    )
+    return ids
+
+
+def get_member_ids(dynamic_group, members: Callable) -> Optional[DeviceSet]:
+    """
+    Return the device members of a dynamic group, evaluating it only on a cache miss.
+
+    The cache is bypassed while the current thread has uncommitted changes that
+    affect member sets.
+
+    Args:
+        dynamic_group: Dynamic group to look up
+        members: Called with ``dynamic_group`` on a miss to evaluate its member
+            query, e.g. ``DynamicGroupEvaluator.members``; None if it fails
+
+    Returns:
+        DeviceSet: Member devices, or None if the dynamic group can't be
+            evaluated or has members without a device index; None is not cached
+    """
+    max_entries = _app_settings().get("dynamic_group_cache_size", 128)
+    if max_entries <= 0 or _pending_bump.pending:
+        # Cached sets predate this thread's uncommitted changes, and sets evaluated
+        # from those changes must not be shared before they are committed
+        return _evaluate(dynamic_group, members)
+
+    key = (dynamic_group.pk, filter_hash(dynamic_group), data_version())
+    ids = member_set_cache.get(key)
+    if ids is None:
+        ids = _evaluate(dynamic_group, members)
+        if ids is not None:
+            member_set_cache.set(key, ids, max_entries, _app_settings().get("dynamic_group_cache_timeout", 300))
+    return ids
@@ -0,0 +1,322 @@
+"""Maintenance of the materialized ServiceNow group membership table."""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import models, transaction
+from django.dispatch import Signal
+
+from nautobot.dcim.models import Device
+
+from .choices import MembershipSourceChoices
+from .location_closure import ancestor_locations, descendant_locations
+from .device_sets import INDEX_LOOKUP, DeviceSet, device_set, index_devices
+from .models import DeviceIndex, ServiceNowGroup, ServiceNowGroupMembership
+from .resolver import DynamicGroupEvaluator
+
+# Number of membership rows written per INSERT statement.
+BATCH_SIZE = 1000
+
+# Sent after membership rows change, with ``group_ids`` and ``device_ids`` of the affected objects.
+membership_changed = Signal()
+
+
+def _location_devices_filter(group: ServiceNowGroup, evaluator: DynamicGroupEvaluator) -> models.Q:
+    """Return a filter matching devices located in any of the group's locations, or below them if enabled."""
+    locations = group.locations.all()
+    if group.include_descendant_locations:
+        locations = descendant_locations(locations)
+    return models.Q(location__in=locations)
+
+
+def _dynamic_group_devices_filter(group: ServiceNowGroup, evaluator: DynamicGroupEvaluator) -> models.Q:
+    """Return a filter matching devices that are members of any of the group's dynamic groups."""
+    device_filter = models.Q(pk__in=[])
+    for dynamic_group in group.dynamic_groups.all():
+        members = evaluator.members(dynamic_group)
+        if members is not None:
+            # Subqueries over Device only, so dynamic groups of other content types match nothing
+            device_filter |= models.Q(pk__in=members)
+    return device_filter
+
+
+def _explicit_devices_filter(group: ServiceNowGroup, evaluator: DynamicGroupEvaluator) -> models.Q:
+    """Return a filter matching devices explicitly assigned to the group."""
+    return models.Q(
+        pk__in=ServiceNowGroup.devices.through.objects.filter(servicenowgroup_id=group.pk).values("device_id")
+    )
+
+
+SOURCE_DEVICE_FILTERS = {
+    MembershipSourceChoices.SOURCE_LOCATION: _location_devices_filter,
+    MembershipSourceChoices.SOURCE_DYNAMIC_GROUP: _dynamic_group_devices_filter,
+    MembershipSourceChoices.SOURCE_DEVICE: _explicit_devices_filter,
+}
+
+
+def resolve_devices(
+    group: ServiceNowGroup,
+    sources: Optional[Iterable[str]] = None,
+    evaluator: Optional[DynamicGroupEvaluator] = None,
+) -> models.QuerySet:
+    """
+    Resolve the devices of a ServiceNow group directly from its assignments.
+
+    The result is a lazy queryset whose WHERE clause ORs one subquery per source:
+    the group's locations, its explicit devices and each dynamic group's filter.
+    No device IDs are loaded into Python, so ``count()``, ``exists()`` and slicing
+    run entirely in the database.
+
+    Args:
+        group: ServiceNow group to resolve
+        sources: Assignment sources to include; all sources when omitted
+        evaluator: Dynamic group evaluator to share across several groups
+
+    Returns:
+        QuerySet: Devices associated with the group through ``sources``
+    """
+    sources = list(sources) if sources is not None else MembershipSourceChoices.values()
+    evaluator = evaluator or DynamicGroupEvaluator()
+    device_filter = models.Q(pk__in=[])
+    for source in sources:
+        device_filter |= SOURCE_DEVICE_FILTERS[source](group, evaluator)
+    return Device.objects.filter(device_filter)
+
+
+def _apply_changes(removed: List[Tuple], added: List[Tuple]) -> int:
+    """
+    Delete the ``removed`` membership rows and insert the ``added`` ones.
+
+    ``membership_changed`` is sent with the groups and devices whose membership
+    actually changed.
+
+    Args:
+        removed: ``(pk, group_id, device_id)`` tuples of rows that no longer apply
+        added: ``(group_id, device_id, source)`` tuples of rows to insert
+
+    Returns:
+        int: Number of membership rows deleted or inserted
+    """
+    removed_pks = [pk for pk, _, _ in removed]
+
+    with transaction.atomic():
+        for start in range(0, len(removed_pks), BATCH_SIZE):
+            ServiceNowGroupMembership.objects.filter(pk__in=removed_pks[start:start + BATCH_SIZE]).delete()
+        ServiceNowGroupMembership.objects.bulk_create(
+            [
+                ServiceNowGroupMembership(group_id=group_id, device_id=device_id, source=source)
+                for group_id, device_id, source in added
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    changed = [(group_id, device_id) for _, group_id, device_id in removed]
+    changed += [(group_id, device_id) for group_id, device_id, _ in added]
+    if changed:
+        membership_changed.send(
+            sender=ServiceNowGroupMembership,
+            group_ids={group_id for group_id, _ in changed},
+            device_ids={device_id for _, device_id in changed},
+        )
+    return len(changed)
+
+
+def _diff_source(group: ServiceNowGroup, source: str, evaluator: DynamicGroupEvaluator) -> Tuple[List, List]:
+    """
+    Return the stored rows of ``source`` to remove and the devices to add, diffed in SQL.
+
+    Returns:
+        tuple: ``(pk, group_id, device_id)`` rows to remove and device IDs to add
+    """
+    live = resolve_devices(group, sources=[source], evaluator=evaluator)
+    stored = ServiceNowGroupMembership.objects.filter(group_id=group.pk, source=source)
+    removed = list(stored.exclude(device_id__in=live.values("pk")).values_list("pk", "group_id", "device_id"))
+    added = list(live.exclude(pk__in=stored.values("device_id")).values_list("pk", flat=True))
+    return removed, added
+
+
+def _diff_dynamic_groups(group: ServiceNowGroup, evaluator: DynamicGroupEvaluator) -> Optional[Tuple[List, List]]:
+    """
+    Return the dynamic-group-sourced rows to remove and the devices to add, diffed in Python.
+
+    The union of the cached member sets of the group's dynamic groups is compared
+    with the set of stored rows, so a dynamic group shared by many ServiceNow
+    groups is evaluated once across rebuilds. Only the devices that change are
+    then looked up, in batches.
+
+    Returns:
+        tuple: ``(pk, group_id, device_id)`` rows to remove and device IDs to add,
+            or None if a member set is unavailable, e.g. because some devices are
+            not indexed yet, and the diff must be done in SQL
+    """
+    live = DeviceSet()
+    for dynamic_group in group.dynamic_groups.all():
+        members = evaluator.member_ids(dynamic_group)
+        if members is None:
+            return None
+        live |= members
+
+    stored_rows = ServiceNowGroupMembership.objects.filter(
+        group_id=group.pk, source=MembershipSourceChoices.SOURCE_DYNAMIC_GROUP
+    )
+    stored = device_set(stored_rows, lookup=f"device__{INDEX_LOOKUP}")
+    if stored is None:
+        return None
+
+    removed_indexes = list(stored - live)
+    removed: List[Tuple] = []
+    for start in range(0, len(removed_indexes), BATCH_SIZE):
+        removed.extend(
+            stored_rows.filter(
+                **{f"device__{INDEX_LOOKUP}__in": removed_indexes[start:start + BATCH_SIZE]}
+            ).values_list("pk", "group_id", "device_id")
+        )
+
+    added_indexes = list(live - stored)
+    added: List = []
+    for start in range(0, len(added_indexes), BATCH_SIZE):
+        added.extend(
+            DeviceIndex.objects.filter(index__in=added_indexes[start:start + BATCH_SIZE]).values_list(
+                "device_id", flat=True
+            )
+        )
+    return removed, added
+
+
+def rebuild_group_membership(
+    group: ServiceNowGroup,
+    sources: Optional[Iterable[str]] = None,
+    evaluator: Optional[DynamicGroupEvaluator] = None,
+) -> int:
+    """
+    Recompute the membership rows of a single ServiceNow group.
+
+    The difference between the stored rows and the live assignments is computed
+    in SQL, or for dynamic groups from their cached member sets, so only the rows
+    that change are ever loaded into Python.
+
+    Args:
+        group: ServiceNow group to rebuild
+        sources: Assignment sources to rebuild; all sources when omitted
+        evaluator: Dynamic group evaluator to share across several groups
+
+    Returns:
+        int: Number of membership rows deleted or inserted
+    """
+    sources = list(sources) if sources is not None else MembershipSourceChoices.values()
+    evaluator = evaluator or DynamicGroupEvaluator()
+    removed: List[Tuple] = []
+    added: List[Tuple] = []
+    for source in sources:
+        diff = None
+        if source == MembershipSourceChoices.SOURCE_DYNAMIC_GROUP:
+            diff = _diff_dynamic_groups(group, evaluator)
+        removed_rows, added_device_ids = diff or _diff_source(group, source, evaluator)
+        removed.extend(removed_rows)
+        added.extend((group.pk, device_id, source) for device_id in added_device_ids)
+    return _apply_changes(removed, added)
+
+
+def rebuild_groups_membership(group_ids: Iterable, sources: Optional[Iterable[str]] = None) -> int:
+    """Recompute the membership rows of every ServiceNow group in ``group_ids``, evaluating each dynamic group once."""
+    evaluator = DynamicGroupEvaluator()
+    written = 0
+    for group in ServiceNowGroup.objects.filter(pk__in=list(group_ids)):
+        written += rebuild_group_membership(group, sources=sources, evaluator=evaluator)
+    return written
+
+
+def rebuild_all_memberships() -> int:
+    """
+    Rebuild the membership table in full.
+
+    Devices created without signals are indexed first, so that the rebuild can
+    use cached dynamic group member sets.
+
+    Returns:
+        int: Number of membership rows deleted or inserted
+    """
+    index_devices()
+    with transaction.atomic():
+        return rebuild_groups_membership(ServiceNowGroup.objects.values_list("pk", flat=True))
+
+
+def _dynamic_group_assignments() -> Dict:
+    """Return a mapping of dynamic group ID to the IDs of the ServiceNow groups that use it."""
+    assignments: Dict = {}
+    through = ServiceNowGroup.dynamic_groups.through.objects.values_list("dynamicgroup_id", "servicenowgroup_id")
+    for dynamic_group_id, group_id in through:
+        assignments.setdefault(dynamic_group_id, []).append(group_id)
+    return assignments
+
+
+def refresh_device_membership(device: Device) -> int:
+    """
+    Recompute every membership row of a single device.
+
+    Used when a device is created, edited or retagged, since a change to its
+    location or to any attribute referenced by a dynamic group filter can change
+    its groups. The device is matched against the dynamic groups' filters rather
+    than their cached member sets, which predate the change.
+
+    Args:
+        device: Device to refresh
+
+    Returns:
+        int: Number of membership rows deleted or inserted
+    """
+    from nautobot.extras.models import DynamicGroup
+
+    desired = set()
+
+    explicit_group_ids = ServiceNowGroup.devices.through.objects.filter(device_id=device.pk).values_list(
+        "servicenowgroup_id", flat=True
+    )
+    desired.update(
+        (group_id, device.pk, MembershipSourceChoices.SOURCE_DEVICE) for group_id in explicit_group_ids
+    )
+
+    if device.location_id:
+        location_group_ids = ServiceNowGroup.locations.through.objects.filter(
+            models.Q(location_id=device.location_id)
+            | models.Q(
+                servicenowgroup__include_descendant_locations=True,
+                location_id__in=ancestor_locations(device.location_id),
+            )
+        ).values_list("servicenowgroup_id", flat=True)
+        desired.update(
+            (group_id, device.pk, MembershipSourceChoices.SOURCE_LOCATION) for group_id in location_group_ids
+        )
+
+    # Check the device against every assigned dynamic group's filter in one query
+    evaluator = DynamicGroupEvaluator()
+    assignments = _dynamic_group_assignments()
+    checks = {}
+    for dynamic_group in DynamicGroup.objects.filter(pk__in=assignments.keys()):
+        members = evaluator.members(dynamic_group)
+        if members is not None:
+            checks[f"member_of_{dynamic_group.pk.hex}"] = (
+                dynamic_group.pk,
+                models.Exists(members.filter(pk=models.OuterRef("pk"))),
+            )
+    if checks:
+        matches = Device.objects.filter(pk=device.pk).values(
+            **{alias: exists for alias, (_, exists) in checks.items()}
+        ).first() or {}
+        for alias, (dynamic_group_id, _) in checks.items():
+            if matches.get(alias):
+                desired.update(
+                    (group_id, device.pk, MembershipSourceChoices.SOURCE_DYNAMIC_GROUP)
+                    for group_id in assignments[dynamic_group_id]
+                )
+
+    stored = ServiceNowGroupMembership.objects.filter(device_id=device.pk)
+    existing = {
+        (group_id, device_id, source): pk
+        for pk, group_id, device_id, source in stored.values_list("pk", "group_id", "device_id", "source")
+    }
+    removed = [
+        (pk, group_id, device_id)
+        for (group_id, device_id, source), pk in existing.items()
+        if (group_id, device_id, source) not in desired
+    ]
+    return _apply_changes(removed, [key for key in desired if key not in existing])
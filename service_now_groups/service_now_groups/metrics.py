@@ -0,0 +1,111 @@
+"""
+Prometheus metrics of ServiceNow group membership resolution.
+
+Nautobot imports ``metrics`` from this module through ``ServiceNowGroupsConfig``
+and serves every family it yields on its ``/metrics`` endpoint. The instruments
+below are not registered with the default ``prometheus_client`` registry, so they
+are exported only through the app and never twice.
+"""
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+METRIC_PREFIX = "nautobot_service_now_groups"
+
+# Resolution directions
+FORWARD = "forward"  # ServiceNow group -> devices
+REVERSE = "reverse"  # device -> ServiceNow groups
+
+RESOLUTION_SECONDS = Histogram(
+    f"{METRIC_PREFIX}_resolution_seconds",
+    "Time spent resolving ServiceNow group membership from the database.",
+    ["direction"],
+    registry=None,
+)
+
+DYNAMIC_GROUP_EVALUATIONS = Counter(
+    f"{METRIC_PREFIX}_dynamic_group_evaluations",
+    "Dynamic groups evaluated into member queries, failures included.",
+    registry=None,
+)
+
+DYNAMIC_GROUP_EVALUATION_SECONDS = Histogram(
+    f"{METRIC_PREFIX}_dynamic_group_evaluation_seconds",
+    "Time spent evaluating a dynamic group into its member query.",
+    registry=None,
+)
+
+DYNAMIC_GROUP_EVALUATION_FAILURES = Counter(
+    f"{METRIC_PREFIX}_dynamic_group_evaluation_failures",
+    "Dynamic groups skipped because they could not be evaluated.",
+    registry=None,
+)
+
+
+def time_resolution(direction: str):
+    """Return a context manager observing the duration of one resolution in ``direction``."""
+    return RESOLUTION_SECONDS.labels(direction=direction).time()
+
+
+def metric_resolution():
+    """Yield the resolution time histogram and the dynamic group evaluation counters and times."""
+    yield from RESOLUTION_SECONDS.collect()
+    yield from DYNAMIC_GROUP_EVALUATIONS.collect()
+    yield from DYNAMIC_GROUP_EVALUATION_SECONDS.collect()
+    yield from DYNAMIC_GROUP_EVALUATION_FAILURES.collect()
+
+
+def metric_group_sizes():
+    """Yield gauges of the number of ServiceNow groups and of their sizes in devices."""
+    from .stats import get_statistics
+
+    statistics = get_statistics()
+
+    groups = GaugeMetricFamily(f"{METRIC_PREFIX}_groups", "Number of ServiceNow groups.")
+    groups.add_metric([], statistics["total_groups"])
+    yield groups
+
+    covered = GaugeMetricFamily(
+        f"{METRIC_PREFIX}_covered_devices",
+        "Number of devices associated with at least one ServiceNow group.",
+    )
+    covered.add_metric([], statistics["covered_devices"])
+    yield covered
+
+    sizes = GaugeMetricFamily(
+        f"{METRIC_PREFIX}_group_size_devices",
+        "Number of devices per ServiceNow group.",
+        labels=["statistic"],
+    )
+    for statistic, value in statistics["group_size"].items():
+        if value is not None:
+            sizes.add_metric([statistic], value)
+    yield sizes
+
+
+def metric_membership_cache():
+    """Yield gauges of the membership cache hits, misses and hit ratio."""
+    from .cache import get_statistics
+
+    statistics = get_statistics()
+
+    lookups = GaugeMetricFamily(
+        f"{METRIC_PREFIX}_membership_cache_lookups",
+        "Membership cache lookups since the counters were last reset.",
+        labels=["outcome"],
+    )
+    lookups.add_metric(["hit"], statistics["hits"])
+    lookups.add_metric(["miss"], statistics["misses"])
+    yield lookups
+
+    if statistics["hit_ratio"] is not None:
+        hit_ratio = GaugeMetricFamily(
+            f"{METRIC_PREFIX}_membership_cache_hit_ratio",
+            "Fraction of membership cache lookups answered from the cache.",
+        )
+        hit_ratio.add_metric([], statistics["hit_ratio"])
+        yield hit_ratio
+
+
+# Collected by Nautobot through ServiceNowGroupsConfig.metrics
+metrics = [metric_resolution, metric_group_sizes, metric_membership_cache]
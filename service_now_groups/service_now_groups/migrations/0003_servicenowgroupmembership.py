@@ -0,0 +1,71 @@
+"""Add the materialized ServiceNowGroupMembership table."""
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Create the ServiceNowGroupMembership model."""
+
+    dependencies = [
+        ("dcim", "__first__"),
+        ("service_now_groups", "0002_auto_20250713_1117"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServiceNowGroupMembership",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("location", "Location"),
+                            ("dynamic_group", "Dynamic Group"),
+                            ("device", "Explicit Device"),
+                        ],
+                        help_text="Assignment method that associates the device with the group",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "device",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="service_now_group_memberships",
+                        to="dcim.device",
+                    ),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to="service_now_groups.servicenowgroup",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ServiceNow Group Membership",
+                "verbose_name_plural": "ServiceNow Group Memberships",
+                "ordering": ["group", "device", "source"],
+                "unique_together": {("group", "device", "source")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="servicenowgroupmembership",
+            index=models.Index(fields=["device", "group"], name="sng_membership_device_idx"),
+        ),
+    ]
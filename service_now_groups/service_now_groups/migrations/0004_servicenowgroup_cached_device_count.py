@@ -0,0 +1,41 @@
+"""Add the denormalized ServiceNowGroup.cached_device_count column."""
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_cached_device_count(apps, schema_editor):
+    """Compute the initial device count of every group from the membership table."""
+    ServiceNowGroup = apps.get_model("service_now_groups", "ServiceNowGroup")
+    ServiceNowGroupMembership = apps.get_model("service_now_groups", "ServiceNowGroupMembership")
+
+    device_counts = (
+        ServiceNowGroupMembership.objects.filter(group=OuterRef("pk"))
+        .order_by()
+        .values("group")
+        .annotate(count=Count("device", distinct=True))
+        .values("count")
+    )
+    ServiceNowGroup.objects.update(cached_device_count=Coalesce(Subquery(device_counts), 0))
+
+
+class Migration(migrations.Migration):
+    """Add ServiceNowGroup.cached_device_count."""
+
+    dependencies = [
+        ("service_now_groups", "0003_servicenowgroupmembership"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicenowgroup",
+            name="cached_device_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Number of associated devices, refreshed asynchronously when membership changes",
+            ),
+        ),
+        migrations.RunPython(populate_cached_device_count, migrations.RunPython.noop),
+    ]
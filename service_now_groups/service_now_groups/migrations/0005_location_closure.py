@@ -0,0 +1,89 @@
+"""Add hierarchical location assignment backed by a location closure table."""
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_location_closure(apps, schema_editor):
+    """Build the closure of the existing location tree."""
+    Location = apps.get_model("dcim", "Location")
+    LocationClosure = apps.get_model("service_now_groups", "LocationClosure")
+
+    parents = dict(Location.objects.values_list("pk", "parent_id"))
+    rows = []
+    for location_id in parents:
+        ancestor_id, depth = location_id, 0
+        while ancestor_id is not None:
+            rows.append(LocationClosure(ancestor_id=ancestor_id, descendant_id=location_id, depth=depth))
+            ancestor_id, depth = parents.get(ancestor_id), depth + 1
+    LocationClosure.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    """Create the LocationClosure model and ServiceNowGroup.include_descendant_locations."""
+
+    dependencies = [
+        ("dcim", "__first__"),
+        ("service_now_groups", "0004_servicenowgroup_cached_device_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicenowgroup",
+            name="include_descendant_locations",
+            field=models.BooleanField(
+                default=False,
+                help_text="Also match devices in any location below the assigned locations",
+            ),
+        ),
+        migrations.CreateModel(
+            name="LocationClosure",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "depth",
+                    models.PositiveSmallIntegerField(
+                        help_text="Number of levels between the ancestor and the descendant",
+                    ),
+                ),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="dcim.location",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="dcim.location",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Location Closure",
+                "verbose_name_plural": "Location Closures",
+                "ordering": ["ancestor", "depth"],
+                "unique_together": {("ancestor", "descendant")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="locationclosure",
+            index=models.Index(fields=["descendant", "ancestor"], name="sng_closure_descendant_idx"),
+        ),
+        migrations.RunPython(populate_location_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+"""Add compact ServiceNow group membership snapshots."""
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Create the ServiceNowGroupSnapshot model."""
+
+    dependencies = [
+        ("service_now_groups", "0005_location_closure"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServiceNowGroupSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("device_count", models.PositiveIntegerField()),
+                (
+                    "digest",
+                    models.CharField(
+                        help_text="SHA-256 of device_ids, to detect unchanged membership without unpacking it",
+                        max_length=64,
+                    ),
+                ),
+                ("device_ids", models.BinaryField()),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshots",
+                        to="service_now_groups.servicenowgroup",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ServiceNow Group Snapshot",
+                "verbose_name_plural": "ServiceNow Group Snapshots",
+                "ordering": ["group", "-created"],
+                "get_latest_by": "created",
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+"""Add dense integer device indexes for compact membership sets."""
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_device_indexes(apps, schema_editor):
+    """Index the existing devices."""
+    Device = apps.get_model("dcim", "Device")
+    DeviceIndex = apps.get_model("service_now_groups", "DeviceIndex")
+
+    DeviceIndex.objects.bulk_create(
+        [DeviceIndex(device_id=pk) for pk in Device.objects.order_by("name").values_list("pk", flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    """Create the DeviceIndex model."""
+
+    dependencies = [
+        ("dcim", "__first__"),
+        ("service_now_groups", "0006_servicenowgroupsnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeviceIndex",
+            fields=[
+                ("index", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "device",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="service_now_groups_index",
+                        to="dcim.device",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Device Index",
+                "verbose_name_plural": "Device Indexes",
+                "ordering": ["index"],
+            },
+        ),
+        migrations.RunPython(populate_device_indexes, migrations.RunPython.noop),
+    ]
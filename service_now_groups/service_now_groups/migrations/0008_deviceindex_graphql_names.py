@@ -0,0 +1,22 @@
+"""Name DeviceIndex after the GraphQL query it backs."""
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Update the DeviceIndex verbose names."""
+
+    dependencies = [
+        ("service_now_groups", "0007_deviceindex"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="deviceindex",
+            options={
+                "ordering": ["index"],
+                "verbose_name": "device service now groups",
+                "verbose_name_plural": "service now groups for devices",
+            },
+        ),
+    ]
@@ -8,6 +8,8 @@ from nautobot.core.models import BaseModel
 from nautobot.extras.models import ChangeLoggedModel, CustomFieldModel
 from nautobot.extras.utils import extras_features
 
+from .choices import MembershipSourceChoices
+
 
 @extras_features(
     "custom_fields",
@@ -55,6 +57,15 @@ class ServiceNowGroup(BaseModel, ChangeLoggedModel, CustomFieldModel):
         related_name="service_now_groups",
         help_text="Specific devices associated with this ServiceNow group",
     )
+    include_descendant_locations = models.BooleanField(
+        default=False,
+        help_text="Also match devices in any location below the assigned locations",
+    )
+    cached_device_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of associated devices, refreshed asynchronously when membership changes",
+    )
 
     class Meta:
         ordering = ["name"]
@@ -79,7 +90,7 @@ class ServiceNowGroup(BaseModel, ChangeLoggedModel, CustomFieldModel):
                 "At least one assignment method must be specified: locations, dynamic groups, or devices."
             )
 
-    def get_associated_devices(self) -> models.QuerySet:
+    def get_associated_devices(self, live: bool = False) -> models.QuerySet:
         """
         Get all devices associated with this ServiceNow group.
 
@@ -88,36 +99,24 @@ class ServiceNowGroup(BaseModel, ChangeLoggedModel, CustomFieldModel):
         2. Devices in associated dynamic groups
         3. Explicitly assigned devices
 
+        Membership is read from the materialized ``ServiceNowGroupMembership``
+        table, which is kept current by the handlers in ``signals.py``. Either way
+        the result is a lazy queryset resolved by a single SQL statement.
+
+        Args:
+            live: Resolve directly from the group's assignments instead of the
+                membership table
+
         Returns:
             QuerySet: All associated devices
         """
         from nautobot.dcim.models import Device
 
-        device_ids = set()
-
-        # Add devices from associated locations
-        if self.locations.exists():
-            location_device_ids = Device.objects.filter(
-                location__in=self.locations.all()
-            ).values_list('id', flat=True)
-            device_ids.update(location_device_ids)
-
-        # Add devices from associated dynamic groups
-        if self.dynamic_groups.exists():
-            for dynamic_group in self.dynamic_groups.all():
-                try:
-                    dynamic_group_device_ids = dynamic_group.members.values_list('id', flat=True)
-                    device_ids.update(dynamic_group_device_ids)
-                except Exception:
-                    # Skip dynamic groups that can't be evaluated
-                    continue
+        if live:
+            from .membership import resolve_devices
 
-        # Add explicitly assigned devices
-        if self.devices.exists():
-            explicit_device_ids = self.devices.values_list('id', flat=True)
-            device_ids.update(explicit_device_ids)
-
-        return Device.objects.filter(id__in=device_ids)
+            return resolve_devices(self)
+        return Device.objects.filter(pk__in=self.memberships.values("device_id"))
 
     def is_device_associated(self, device) -> bool:
         """
@@ -129,42 +128,200 @@ class ServiceNowGroup(BaseModel, ChangeLoggedModel, CustomFieldModel):
         Returns:
             bool: True if device is associated, False otherwise
         """
-        # Check explicit device assignment
-        if self.devices.filter(pk=device.pk).exists():
-            return True
-
-        # Check location assignment
-        if self.locations.filter(pk=device.location.pk).exists():
-            return True
+        from .cache import get_device_group_ids, is_enabled
 
-        # Check dynamic group assignment
-        for dynamic_group in self.dynamic_groups.all():
-            try:
-                if device in dynamic_group.members:
-                    return True
-            except Exception:
-                # Skip dynamic groups that can't be evaluated
-                continue
-
-        return False
+        if is_enabled():
+            return self.pk in get_device_group_ids(device.pk)
+        return self.memberships.filter(device_id=device.pk).exists()
 
     @property
     def device_count(self) -> int:
-        """Return the number of devices associated with this group."""
-        return self.get_associated_devices().count()
+        """Return the number of devices associated with this group, counted in SQL."""
+        return self.memberships.values("device_id").distinct().count()
+
+    def _assignment_count(self, field_name: str) -> int:
+        """
+        Return the number of objects assigned through ``field_name``.
+
+        Uses an ``<field_name>_assignment_count`` annotation (see
+        ``export.annotate_assignment_counts``) or prefetched objects when present.
+        """
+        annotated = getattr(self, f"{field_name}_assignment_count", None)
+        if annotated is not None:
+            return annotated
+        if field_name in getattr(self, "_prefetched_objects_cache", {}):
+            return len(getattr(self, field_name).all())
+        return getattr(self, field_name).count()
 
     @property
     def assignment_summary(self) -> str:
         """Return a summary of how this group is assigned."""
         summary: List[str] = []
         
-        if self.locations.exists():
-            summary.append(f"{self.locations.count()} location(s)")
+        location_count = self._assignment_count("locations")
+        if location_count:
+            summary.append(f"{location_count} location(s)")
         
-        if self.dynamic_groups.exists():
-            summary.append(f"{self.dynamic_groups.count()} dynamic group(s)")
+        dynamic_group_count = self._assignment_count("dynamic_groups")
+        if dynamic_group_count:
+            summary.append(f"{dynamic_group_count} dynamic group(s)")
         
-        if self.devices.exists():
-            summary.append(f"{self.devices.count()} explicit device(s)")
+        device_count = self._assignment_count("devices")
+        if device_count:
+            summary.append(f"{device_count} explicit device(s)")
         
-        return ", ".join(summary) if summary else "No assignments" 
\ No newline at end of file
+        return ", ".join(summary) if summary else "No assignments"
+
+
+class ServiceNowGroupMembership(BaseModel):
+    """
+    Materialized association between a ServiceNow group and a device.
+
+    One row exists per (group, device, source) so that a device matched both by
+    location and explicitly is recorded twice, once for each source. Rows are
+    rebuilt in full by ``membership.rebuild_all_memberships`` and maintained
+    incrementally by the signal handlers in ``signals.py``.
+    """
+
+    group = models.ForeignKey(
+        to=ServiceNowGroup,
+        on_delete=models.CASCADE,
+        related_name="memberships",
+    )
+    device = models.ForeignKey(
+        to="dcim.Device",
+        on_delete=models.CASCADE,
+        related_name="service_now_group_memberships",
+    )
+    source = models.CharField(
+        max_length=20,
+        choices=MembershipSourceChoices,
+        help_text="Assignment method that associates the device with the group",
+    )
+
+    class Meta:
+        ordering = ["group", "device", "source"]
+        unique_together = [["group", "device", "source"]]
+        indexes = [models.Index(fields=["device", "group"], name="sng_membership_device_idx")]
+        verbose_name = "ServiceNow Group Membership"
+        verbose_name_plural = "ServiceNow Group Memberships"
+
+    def __str__(self):
+        """Return a readable representation of the membership."""
+        return f"{self.group} - {self.device} ({self.source})"
+
+
+class LocationClosure(BaseModel):
+    """
+    Precomputed ancestor/descendant pair of the ``dcim.Location`` tree.
+
+    Every location has one row per ancestor, including a row pairing it with
+    itself at depth 0, so that all locations below any set of locations (or all
+    locations above one) are found with a single indexed lookup regardless of how
+    deep the tree is. Rows are rebuilt in full by
+    ``location_closure.rebuild_location_closure`` and maintained by the signal
+    handlers in ``signals.py``.
+    """
+
+    ancestor = models.ForeignKey(
+        to="dcim.Location",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    descendant = models.ForeignKey(
+        to="dcim.Location",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    depth = models.PositiveSmallIntegerField(
+        help_text="Number of levels between the ancestor and the descendant",
+    )
+
+    class Meta:
+        ordering = ["ancestor", "depth"]
+        unique_together = [["ancestor", "descendant"]]
+        indexes = [models.Index(fields=["descendant", "ancestor"], name="sng_closure_descendant_idx")]
+        verbose_name = "Location Closure"
+        verbose_name_plural = "Location Closures"
+
+    def __str__(self):
+        """Return a readable representation of the pair."""
+        return f"{self.ancestor} > {self.descendant} ({self.depth})"
+
+
+class ServiceNowGroupSnapshot(BaseModel):
+    """
+    Compact point-in-time copy of the devices of a ServiceNow group.
+
+    ``device_ids`` holds the 16-byte device UUIDs sorted and concatenated, so a
+    100k-device group takes 1.6 MB and two snapshots can be diffed with a single
+    merge pass. Snapshots are taken by ``snapshots.take_snapshot``, typically
+    after a successful push to ServiceNow.
+    """
+
+    group = models.ForeignKey(
+        to=ServiceNowGroup,
+        on_delete=models.CASCADE,
+        related_name="snapshots",
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    device_count = models.PositiveIntegerField()
+    digest = models.CharField(
+        max_length=64,
+        help_text="SHA-256 of device_ids, to detect unchanged membership without unpacking it",
+    )
+    device_ids = models.BinaryField()
+
+    class Meta:
+        ordering = ["group", "-created"]
+        get_latest_by = "created"
+        verbose_name = "ServiceNow Group Snapshot"
+        verbose_name_plural = "ServiceNow Group Snapshots"
+
+    def __str__(self):
+        """Return a readable representation of the snapshot."""
+        return f"{self.group} @ {self.created:%Y-%m-%d %H:%M:%S} ({self.device_count} devices)"
+
+
+class DeviceIndexQuerySet(models.QuerySet):
+    """QuerySet of device indexes, restricted through the permissions on their devices."""
+
+    def restrict(self, user, action: str = "view") -> models.QuerySet:
+        """Return the indexes of the devices ``user`` may perform ``action`` on."""
+        from nautobot.dcim.models import Device
+
+        return self.filter(device__in=Device.objects.restrict(user, action))
+
+
+class DeviceIndex(models.Model):
+    """
+    Dense integer index of a device.
+
+    Device primary keys are UUIDs; compact device sets (see ``device_sets``) hold
+    each device as the bit at its ``index`` instead. Rows are created by the signal
+    handlers in ``signals.py`` when devices are saved and by
+    ``device_sets.index_devices``, after migrations and on full membership
+    rebuilds, for devices created without signals. Indexes of deleted devices are
+    not reused.
+
+    Also the model of the ``service_now_groups_for_devices`` GraphQL query, one
+    row per device, hence its verbose names.
+    """
+
+    index = models.AutoField(primary_key=True)
+    device = models.OneToOneField(
+        to="dcim.Device",
+        on_delete=models.CASCADE,
+        related_name="service_now_groups_index",
+    )
+
+    objects = DeviceIndexQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["index"]
+        verbose_name = "device service now groups"
+        verbose_name_plural = "service now groups for devices"
+
+    def __str__(self):
+        """Return a readable representation of the index."""
+        return f"{self.device} ({self.index})"
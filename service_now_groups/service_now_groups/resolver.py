@@ -0,0 +1,210 @@
+"""Per-request resolution of ServiceNow group membership."""
+
+import logging
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from django.db import models
+
+from .device_sets import DeviceSet
+from .member_sets import get_member_ids
+from .metrics import (
+    DYNAMIC_GROUP_EVALUATIONS,
+    DYNAMIC_GROUP_EVALUATION_FAILURES,
+    DYNAMIC_GROUP_EVALUATION_SECONDS,
+    REVERSE,
+    time_resolution,
+)
+from .models import ServiceNowGroup, ServiceNowGroupMembership
+
+logger = logging.getLogger(__name__)
+
+RESOLVER_ATTRIBUTE = "_service_now_groups_resolver"
+
+# Dynamic groups taking longer than this to evaluate are logged by name
+SLOW_EVALUATION_SECONDS = 1.0
+
+
+def get_device_group_sources(device_ids: Iterable, groups: Optional[models.QuerySet] = None) -> Dict:
+    """
+    Return the ServiceNow groups of many devices, with the sources that assign them.
+
+    All membership rows for ``device_ids`` are read with a single query, so the
+    cost does not depend on the number of groups or dynamic groups involved.
+
+    Args:
+        device_ids: Primary keys of the devices to look up
+        groups: Optional ServiceNow group queryset to restrict the result to,
+            e.g. one restricted to the groups a user may view
+
+    Returns:
+        dict: ``{device_id: {group: [source, ...]}}`` with groups ordered by name;
+            devices without any group are omitted
+    """
+    rows = ServiceNowGroupMembership.objects.filter(device_id__in=device_ids)
+    if groups is not None:
+        rows = rows.filter(group__in=groups)
+    rows = rows.select_related("group").order_by("group__name", "source")
+
+    result: Dict = {}
+    for row in rows:
+        result.setdefault(row.device_id, {}).setdefault(row.group, []).append(row.source)
+    return result
+
+
+class DynamicGroupEvaluator:
+    """
+    Evaluate each distinct DynamicGroup at most once.
+
+    Several ServiceNow groups commonly reference the same dynamic group; sharing an
+    evaluator across them builds each dynamic group's filterset a single time.
+    ``members`` returns the lazy subquery used to build SQL; ``member_ids``
+    returns compact member sets, shared across evaluators through
+    ``member_sets``, which membership rebuilds diff in Python.
+    """
+
+    def __init__(self):
+        """Initialize an empty evaluation memo."""
+        self._members: Dict = {}
+        self._member_ids: Dict = {}
+
+    def members(self, dynamic_group) -> Optional[models.QuerySet]:
+        """
+        Return the lazy member primary keys of a dynamic group.
+
+        Every evaluation is counted and timed, and counted as a failure when the
+        dynamic group can't be evaluated.
+
+        Returns:
+            QuerySet: ``values("pk")`` of the members, or None if the dynamic group
+                can't be evaluated
+        """
+        if dynamic_group.pk not in self._members:
+            DYNAMIC_GROUP_EVALUATIONS.inc()
+            start = time.perf_counter()
+            try:
+                members = dynamic_group.members.values("pk")
+            except Exception:
+                # Skip dynamic groups that can't be evaluated
+                logger.warning("Unable to evaluate dynamic group %s", dynamic_group)
+                DYNAMIC_GROUP_EVALUATION_FAILURES.inc()
+                members = None
+            seconds = time.perf_counter() - start
+            DYNAMIC_GROUP_EVALUATION_SECONDS.observe(seconds)
+            if seconds >= SLOW_EVALUATION_SECONDS:
+                logger.warning("Evaluating dynamic group %s took %.3fs", dynamic_group, seconds)
+            self._members[dynamic_group.pk] = members
+        return self._members[dynamic_group.pk]
+
+    def member_ids(self, dynamic_group) -> Optional[DeviceSet]:
+        """
+        Return the device members of a dynamic group from the member set cache.
+
+        Meant for combining member sets in Python; never turn the result into a
+        literal ``IN`` list, use ``members`` as a subquery instead.
+
+        Returns:
+            DeviceSet: Compact set of the members, or None if the dynamic group
+                can't be evaluated
+        """
+        if dynamic_group.pk not in self._member_ids:
+            self._member_ids[dynamic_group.pk] = get_member_ids(dynamic_group, self.members)
+        return self._member_ids[dynamic_group.pk]
+
+
+class ServiceNowGroupResolver:
+    """
+    Memoized device to ServiceNow group resolution shared by one request.
+
+    Each device's groups are read from the membership table once, in a single
+    query that can cover a whole batch of devices, and every later check for that
+    device is answered from memory. The REST API, the device template extension and
+    the template tags all go through this class.
+    """
+
+    def __init__(self, groups: Optional[models.QuerySet] = None):
+        """
+        Initialize the resolver.
+
+        Args:
+            groups: Optional ServiceNow group queryset to restrict results to,
+                e.g. one restricted to the groups a user may view
+        """
+        self._groups = groups
+        self._device_groups: Dict = {}
+        self._detailed_groups: Dict = {}
+
+    @classmethod
+    def for_request(cls, request) -> "ServiceNowGroupResolver":
+        """Return the resolver attached to ``request``, creating it on first use."""
+        if request is None:
+            return cls()
+        resolver = getattr(request, RESOLVER_ATTRIBUTE, None)
+        if resolver is None:
+            resolver = cls()
+            setattr(request, RESOLVER_ATTRIBUTE, resolver)
+        return resolver
+
+    @classmethod
+    def for_context(cls, context, device) -> "ServiceNowGroupResolver":
+        """
+        Return the resolver for a template render.
+
+        The request's resolver is used when the context has a request; otherwise
+        the resolver that last resolved ``device`` is reused, so that tags and
+        filters applied to the same device during one render share its result.
+        """
+        request = context.get("request")
+        if request is not None:
+            return cls.for_request(request)
+        return getattr(device, RESOLVER_ATTRIBUTE, None) or cls()
+
+    def prefetch(self, device_ids: Iterable) -> None:
+        """Resolve every device in ``device_ids`` that has not been resolved yet, in one query."""
+        missing = [pk for pk in device_ids if pk not in self._device_groups]
+        if not missing:
+            return
+        with time_resolution(REVERSE):
+            group_sources = get_device_group_sources(missing, groups=self._groups)
+        for pk in missing:
+            self._device_groups[pk] = group_sources.get(pk, {})
+
+    def get_group_sources(self, device) -> Dict:
+        """Return ``{group: [source, ...]}`` for a device, ordered by group name."""
+        self.prefetch([device.pk])
+        # Remember the resolver on the device for filters, which have no template context
+        setattr(device, RESOLVER_ATTRIBUTE, self)
+        return self._device_groups[device.pk]
+
+    def get_groups_for_device_id(self, device_id) -> List[ServiceNowGroup]:
+        """Return the ServiceNow groups of the device with primary key ``device_id``, ordered by name."""
+        self.prefetch([device_id])
+        return list(self._device_groups[device_id])
+
+    def get_groups(self, device) -> List[ServiceNowGroup]:
+        """Return the ServiceNow groups of a device, ordered by name."""
+        return list(self.get_group_sources(device))
+
+    def get_detailed_groups(self, device) -> List[ServiceNowGroup]:
+        """
+        Return the ServiceNow groups of a device ready for display.
+
+        Each group is annotated with ``associated_device_count`` and has its
+        locations, dynamic groups and devices prefetched, so rendering any number
+        of groups costs a fixed number of queries.
+        """
+        if device.pk not in self._detailed_groups:
+            self._detailed_groups[device.pk] = list(
+                ServiceNowGroup.objects.filter(pk__in=self.get_group_ids(device))
+                .annotate(associated_device_count=models.Count("memberships__device", distinct=True))
+                .prefetch_related("locations", "dynamic_groups", "devices")
+            )
+        return self._detailed_groups[device.pk]
+
+    def get_group_ids(self, device) -> FrozenSet:
+        """Return the IDs of the ServiceNow groups of a device."""
+        return frozenset(group.pk for group in self.get_group_sources(device))
+
+    def is_device_associated(self, group: ServiceNowGroup, device) -> bool:
+        """Return whether ``device`` is associated with ``group``."""
+        return group.pk in self.get_group_ids(device)
@@ -0,0 +1,219 @@
+"""Bulk seeding of a synthetic topology for reproducing production-scale performance locally."""
+
+import itertools
+import random
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from nautobot.dcim.models import Device, DeviceRole, DeviceType, Location, LocationType, Manufacturer, Site
+from nautobot.extras.models import DynamicGroup, Status
+
+from .device_sets import index_devices
+from .location_closure import rebuild_location_closure
+from .member_sets import bump_data_version
+from .membership import rebuild_all_memberships
+from .models import ServiceNowGroup
+from .tasks import device_count_refresh_suspended, refresh_device_counts
+
+# Objects inserted per transaction.
+BATCH_SIZE = 1000
+
+DEVICE_ROLES = ("access", "core", "edge", "firewall")
+
+
+def bulk_insert(model, objects: Iterable, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Insert ``objects`` with ``bulk_create``, committing one batch per transaction.
+
+    ``objects`` may be a generator, so that no more than one batch of instances is
+    held in memory at a time. Signals are not sent, so derived tables must be
+    rebuilt afterwards.
+
+    Returns:
+        int: Number of objects inserted
+    """
+    iterator = iter(objects)
+    inserted = 0
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return inserted
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=batch_size)
+        inserted += len(batch)
+
+
+def _reference_data(prefix: str) -> Dict:
+    """Get or create the location types, site, status, device type and roles shared by seeded objects."""
+    title = prefix.title()
+    status = Status.objects.get(slug="active")
+    region_type, _ = LocationType.objects.get_or_create(slug=f"{prefix}-region", defaults={"name": f"{title} Region"})
+    site_type, _ = LocationType.objects.get_or_create(
+        slug=f"{prefix}-site", defaults={"name": f"{title} Site", "parent": region_type}
+    )
+    site_type.content_types.add(ContentType.objects.get_for_model(Device))
+    site, _ = Site.objects.get_or_create(slug=f"{prefix}-site", defaults={"name": f"{title} Site", "status": status})
+    manufacturer, _ = Manufacturer.objects.get_or_create(
+        slug=f"{prefix}-manufacturer", defaults={"name": f"{title} Manufacturer"}
+    )
+    device_type, _ = DeviceType.objects.get_or_create(
+        slug=f"{prefix}-device", manufacturer=manufacturer, defaults={"model": f"{title} Device"}
+    )
+    roles = [
+        DeviceRole.objects.get_or_create(slug=f"{prefix}-{role}", defaults={"name": f"{title} {role.title()}"})[0]
+        for role in DEVICE_ROLES
+    ]
+    return {
+        "status": status,
+        "region_type": region_type,
+        "site_type": site_type,
+        "site": site,
+        "device_type": device_type,
+        "roles": roles,
+    }
+
+
+def seed_topology(
+    regions: int,
+    sites_per_region: int,
+    devices_per_site: int,
+    groups: int,
+    dynamic_groups: int,
+    seed: int = 0,
+    prefix: str = "seed",
+    batch_size: int = BATCH_SIZE,
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict[str, int]:
+    """
+    Create a synthetic topology of locations, devices, dynamic groups and ServiceNow groups.
+
+    Every object, including the rows of the ServiceNow group M2M through tables,
+    is inserted with ``bulk_create`` in batched transactions. The location closure,
+    membership table and device counts are rebuilt once at the end. The same
+    ``seed`` always produces the same names and assignments.
+
+    Args:
+        regions: Number of top-level region locations
+        sites_per_region: Number of site locations below each region
+        devices_per_site: Number of devices at each site
+        groups: Number of ServiceNow groups
+        dynamic_groups: Number of device dynamic groups
+        seed: Random seed for the group assignments
+        prefix: Name and slug prefix of every seeded object
+        batch_size: Objects inserted per transaction
+        log: Optional callable receiving progress messages
+
+    Returns:
+        dict: Number of objects created per kind
+
+    Raises:
+        ValueError: If objects with ``prefix`` were already seeded
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    if Location.objects.filter(slug=f"{prefix}-region-000").exists():
+        raise ValueError(f"Objects with the prefix '{prefix}' already exist; use another prefix")
+
+    reference = _reference_data(prefix)
+    status = reference["status"]
+    counts: Dict[str, int] = {}
+
+    log("Creating locations...")
+    region_locations = [
+        Location(
+            name=f"{prefix}-region-{r:03d}",
+            slug=f"{prefix}-region-{r:03d}",
+            location_type=reference["region_type"],
+            site=reference["site"],
+            status=status,
+        )
+        for r in range(regions)
+    ]
+    site_locations = [
+        Location(
+            name=f"{region.name}-site-{s:04d}",
+            slug=f"{region.slug}-site-{s:04d}",
+            location_type=reference["site_type"],
+            parent=region,
+            status=status,
+        )
+        for region in region_locations
+        for s in range(sites_per_region)
+    ]
+    counts["locations"] = bulk_insert(Location, region_locations + site_locations, batch_size)
+
+    log("Creating devices...")
+    device_ids: List = []
+
+    def devices():
+        roles = reference["roles"]
+        for location in site_locations:
+            for d in range(devices_per_site):
+                device = Device(
+                    name=f"{location.slug}-device-{d:05d}",
+                    device_type=reference["device_type"],
+                    device_role=roles[d % len(roles)],
+                    site=reference["site"],
+                    location=location,
+                    status=status,
+                )
+                device_ids.append(device.pk)
+                yield device
+
+    counts["devices"] = bulk_insert(Device, devices(), batch_size)
+    index_devices()
+
+    log("Creating dynamic groups...")
+    device_content_type = ContentType.objects.get_for_model(Device)
+    filters = [{"role": [role.slug]} for role in reference["roles"]]
+    filters += [{"location": [region.slug]} for region in region_locations]
+    seeded_dynamic_groups = [
+        DynamicGroup(
+            name=f"{prefix}-dynamic-group-{i:04d}",
+            slug=f"{prefix}-dynamic-group-{i:04d}",
+            content_type=device_content_type,
+            filter=rng.choice(filters),
+        )
+        for i in range(dynamic_groups)
+    ]
+    counts["dynamic_groups"] = bulk_insert(DynamicGroup, seeded_dynamic_groups, batch_size)
+
+    log("Creating ServiceNow groups...")
+    seeded_groups = [
+        ServiceNowGroup(
+            name=f"{prefix}-group-{i:05d}",
+            description=f"Seeded ServiceNow group {i}",
+            include_descendant_locations=rng.random() < 0.1,
+        )
+        for i in range(groups)
+    ]
+    counts["groups"] = bulk_insert(ServiceNowGroup, seeded_groups, batch_size)
+
+    location_rows, dynamic_group_rows, device_rows = [], [], []
+    for group in seeded_groups:
+        # Groups matching descendants are assigned regions, the others individual sites
+        candidates = region_locations if group.include_descendant_locations else site_locations
+        for location in rng.sample(candidates, min(rng.randint(0, 3), len(candidates))):
+            location_rows.append(ServiceNowGroup.locations.through(servicenowgroup_id=group.pk, location_id=location.pk))
+        for dynamic_group in rng.sample(seeded_dynamic_groups, min(rng.randint(0, 2), len(seeded_dynamic_groups))):
+            dynamic_group_rows.append(
+                ServiceNowGroup.dynamic_groups.through(servicenowgroup_id=group.pk, dynamicgroup_id=dynamic_group.pk)
+            )
+        for device_id in rng.sample(device_ids, min(rng.randint(0, 5), len(device_ids))):
+            device_rows.append(ServiceNowGroup.devices.through(servicenowgroup_id=group.pk, device_id=device_id))
+    counts["location_assignments"] = bulk_insert(ServiceNowGroup.locations.through, location_rows, batch_size)
+    counts["dynamic_group_assignments"] = bulk_insert(
+        ServiceNowGroup.dynamic_groups.through, dynamic_group_rows, batch_size
+    )
+    counts["device_assignments"] = bulk_insert(ServiceNowGroup.devices.through, device_rows, batch_size)
+
+    log("Rebuilding the location closure and memberships...")
+    rebuild_location_closure()
+    # Bulk inserts send no signals, so drop dynamic group member sets evaluated before them
+    bump_data_version()
+    with device_count_refresh_suspended():
+        counts["memberships"] = rebuild_all_memberships()
+    refresh_device_counts()
+    return counts
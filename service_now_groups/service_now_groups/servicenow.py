@@ -0,0 +1,243 @@
+"""Batched, concurrent push of ServiceNow group membership to a ServiceNow instance."""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from .export import DEFAULT_COLUMNS, iter_membership_rows
+from .models import ServiceNowGroup, ServiceNowGroupMembership
+
+logger = logging.getLogger(__name__)
+
+API_IMPORT_SET = "import_set"
+API_TABLE = "table"
+
+# Longest delay between two attempts of the same request, in seconds.
+MAX_BACKOFF = 60
+
+
+class ServiceNowError(Exception):
+    """Raised when ServiceNow rejects a request or keeps failing after every retry."""
+
+
+@dataclass
+class PushResult:
+    """Outcome of a push to ServiceNow."""
+
+    records: int = 0
+    batches: int = 0
+    requests: int = 0
+    retries: int = 0
+
+
+def _batches(records: Iterable[Dict], batch_size: int) -> Iterator[List[Dict]]:
+    """Split ``records`` into lists of at most ``batch_size`` records without materializing them all."""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class ServiceNowClient:
+    """
+    Client for the ServiceNow import set and table APIs.
+
+    Requests share one pooled ``requests.Session`` with a connection per worker.
+    Connection errors and 5xx responses are retried with exponential backoff, and
+    429 responses wait for the ``Retry-After`` delay ServiceNow asks for.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        username: str = "",
+        password: str = "",
+        api: str = API_IMPORT_SET,
+        table: str = "u_nautobot_group_membership",
+        batch_size: int = 200,
+        max_workers: int = 4,
+        max_retries: int = 5,
+        backoff_factor: float = 0.5,
+        timeout: float = 30,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            url: Base URL of the ServiceNow instance, e.g. ``https://example.service-now.com``
+            username: ServiceNow user name for basic authentication
+            password: ServiceNow password for basic authentication
+            api: ``API_IMPORT_SET`` to POST batches to ``insertMultiple`` of an
+                import set staging table, or ``API_TABLE`` to POST each record to
+                the table API
+            table: Import set staging table or target table name
+            batch_size: Records per batch
+            max_workers: Batches sent concurrently, and size of the connection pool
+            max_retries: Retries of a failing request before giving up
+            backoff_factor: First retry delay in seconds, doubled on each retry
+            timeout: Timeout of each request in seconds
+            sleep: Function used to wait between retries
+        """
+        if api not in (API_IMPORT_SET, API_TABLE):
+            raise ValueError(f"Unsupported ServiceNow API {api!r}")
+        self.url = url.rstrip("/")
+        self.api = api
+        self.table = table
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.sleep = sleep
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept": "application/json", "Content-Type": "application/json"})
+        if username:
+            self.session.auth = (username, password)
+
+    @classmethod
+    def from_settings(cls, **kwargs) -> "ServiceNowClient":
+        """Return a client configured from the ``servicenow_*`` settings in PLUGINS_CONFIG."""
+        app_settings = settings.PLUGINS_CONFIG.get("service_now_groups", {})
+        if not app_settings.get("servicenow_url"):
+            raise ServiceNowError("The servicenow_url setting is not configured")
+        options = {
+            "url": app_settings["servicenow_url"],
+            "username": app_settings.get("servicenow_username", ""),
+            "password": app_settings.get("servicenow_password", ""),
+            "api": app_settings.get("servicenow_api", API_IMPORT_SET),
+            "table": app_settings.get("servicenow_table", "u_nautobot_group_membership"),
+            "batch_size": app_settings.get("servicenow_batch_size", 200),
+            "max_workers": app_settings.get("servicenow_max_workers", 4),
+            "max_retries": app_settings.get("servicenow_max_retries", 5),
+            "backoff_factor": app_settings.get("servicenow_backoff_factor", 0.5),
+            "timeout": app_settings.get("servicenow_timeout", 30),
+        }
+        options.update(kwargs)
+        return cls(**options)
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Return how long to wait before retrying, honoring a numeric ``Retry-After`` header."""
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return min(float(response.headers["Retry-After"]), MAX_BACKOFF)
+        return min(self.backoff_factor * 2**attempt, MAX_BACKOFF)
+
+    def _post(self, path: str, payload, result: PushResult) -> requests.Response:
+        """POST ``payload`` to ``path``, retrying rate-limited, failed and unreachable requests, counting them in ``result``."""
+        url = f"{self.url}{path}"
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+                result.requests += 1
+            except (requests.ConnectionError, requests.Timeout) as e:
+                result.requests += 1
+                error = str(e)
+            else:
+                if response.status_code < 400:
+                    return response
+                if response.status_code != 429 and response.status_code < 500:
+                    raise ServiceNowError(f"POST {path} failed with HTTP {response.status_code}: {response.text[:500]}")
+                error = f"HTTP {response.status_code}"
+
+            if attempt == self.max_retries:
+                raise ServiceNowError(f"POST {path} failed after {attempt + 1} attempt(s): {error}")
+            delay = self._retry_delay(attempt, response)
+            logger.warning("POST %s failed (%s), retrying in %.1fs", path, error, delay)
+            result.retries += 1
+            self.sleep(delay)
+
+    def push_batch(self, batch: List[Dict]) -> PushResult:
+        """
+        Send one batch of records.
+
+        Returns:
+            PushResult: Number of requests and retries the batch took
+        """
+        result = PushResult(records=len(batch), batches=1)
+        if self.api == API_IMPORT_SET:
+            self._post(f"/api/now/import/{self.table}/insertMultiple", {"records": batch}, result)
+        else:
+            for record in batch:
+                self._post(f"/api/now/table/{self.table}", record, result)
+        return result
+
+    def push(self, records: Iterable[Dict]) -> PushResult:
+        """
+        Send ``records`` in batches, ``max_workers`` batches at a time.
+
+        Records are consumed lazily and at most ``2 * max_workers`` batches are in
+        flight or queued at once, so memory use does not grow with the number of
+        records.
+
+        Returns:
+            PushResult: Number of records, batches, requests and retries
+
+        Raises:
+            ServiceNowError: If any batch could not be delivered
+        """
+        result = PushResult()
+
+        def collect(futures):
+            for future in futures:
+                batch_result = future.result()
+                result.records += batch_result.records
+                result.batches += batch_result.batches
+                result.requests += batch_result.requests
+                result.retries += batch_result.retries
+
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                for batch in _batches(records, self.batch_size):
+                    if len(pending) >= 2 * self.max_workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    pending.add(executor.submit(self.push_batch, batch))
+                collect(pending)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        return result
+
+
+def iter_group_records(group: ServiceNowGroup, field_prefix: str = "u_") -> Iterator[Dict]:
+    """
+    Yield the ServiceNow records describing the devices of a group.
+
+    Each record holds the ``DEFAULT_COLUMNS`` of ``export.iter_membership_rows``
+    as strings, keyed by column name prefixed with ``field_prefix``.
+    """
+    memberships = ServiceNowGroupMembership.objects.filter(group=group)
+    for row in iter_membership_rows(DEFAULT_COLUMNS, memberships):
+        yield {f"{field_prefix}{column}": str(value) if value is not None else "" for column, value in row.items()}
+
+
+def push_group_membership(group: ServiceNowGroup, client: Optional[ServiceNowClient] = None) -> PushResult:
+    """
+    Push the membership of a ServiceNow group to ServiceNow.
+
+    Args:
+        group: ServiceNow group to push
+        client: Client to push with; configured from PLUGINS_CONFIG when omitted
+
+    Returns:
+        PushResult: Number of records, batches, requests and retries
+    """
+    client = client or ServiceNowClient.from_settings()
+    field_prefix = settings.PLUGINS_CONFIG.get("service_now_groups", {}).get("servicenow_field_prefix", "u_")
+    return client.push(iter_group_records(group, field_prefix=field_prefix))
@@ -1,11 +1,18 @@
 """Signals for the ServiceNow Groups app."""
 
-from django.db.models.signals import post_migrate
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
 from django.dispatch import receiver
 
 from nautobot.core.signals import nautobot_database_ready
+from nautobot.dcim.models import Device, DeviceRole, DeviceType, Location, Manufacturer, Platform
 from nautobot.extras.choices import CustomFieldTypeChoices
-from nautobot.extras.models import CustomField
+from nautobot.extras.models import CustomField, DynamicGroup, Status, Tag
+from nautobot.tenancy.models import Tenant
+
+from . import cache, device_sets, location_closure, member_sets, membership, stats
+from .choices import MembershipSourceChoices
+from .models import DeviceIndex, LocationClosure, ServiceNowGroup, ServiceNowGroupMembership
 
 
 @receiver(nautobot_database_ready)
@@ -19,6 +26,234 @@ def create_custom_fields(sender, **kwargs):
 @receiver(post_migrate)
 def create_required_objects(sender, **kwargs):
     """Create any required objects after migration."""
-    # This is a placeholder for creating any required objects
-    # after the database is migrated
-    pass 
\ No newline at end of file
+    if getattr(sender, "name", None) != "service_now_groups":
+        return
+
+    # Index devices created without signals, e.g. by bulk imports
+    device_sets.index_devices()
+    # Populate the location closure and the membership table once after they are first created
+    if Location.objects.exists() and not LocationClosure.objects.exists():
+        location_closure.rebuild_location_closure()
+    if ServiceNowGroup.objects.exists() and not ServiceNowGroupMembership.objects.exists():
+        from .tasks import device_count_refresh_suspended, refresh_device_counts
+
+        # Refresh every count once here rather than enqueueing tasks while migrating
+        with device_count_refresh_suspended():
+            membership.rebuild_all_memberships()
+        refresh_device_counts()
+
+
+@receiver(post_save, sender=Device)
+def device_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Index a new device and recompute a device's memberships when it is created or edited."""
+    if raw:
+        return
+
+    if created:
+        DeviceIndex.objects.get_or_create(device=instance)
+    membership.refresh_device_membership(instance)
+
+
+@receiver(post_save, sender=DynamicGroup)
+def dynamic_group_saved(sender, instance, raw=False, **kwargs):
+    """Recompute the memberships contributed by a dynamic group when its filter is edited."""
+    if raw:
+        return
+
+    membership.rebuild_groups_membership(
+        instance.service_now_groups.values_list("pk", flat=True),
+        sources=[MembershipSourceChoices.SOURCE_DYNAMIC_GROUP],
+    )
+
+
+@receiver(pre_delete, sender=DynamicGroup)
+def dynamic_group_deleting(sender, instance, **kwargs):
+    """Remember the groups using a dynamic group whose assignments are about to be cascade-deleted."""
+    instance._service_now_group_pks = list(instance.service_now_groups.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=DynamicGroup)
+def dynamic_group_deleted(sender, instance, **kwargs):
+    """Drop the memberships contributed by a deleted dynamic group."""
+    membership.rebuild_groups_membership(
+        getattr(instance, "_service_now_group_pks", []),
+        sources=[MembershipSourceChoices.SOURCE_DYNAMIC_GROUP],
+    )
+
+
+@receiver(post_save, sender=Location)
+def location_saved(sender, instance, raw=False, **kwargs):
+    """Maintain the location closure and the memberships of groups that include a moved subtree."""
+    if raw:
+        return
+
+    affected_location_ids = location_closure.refresh_location_closure(instance)
+    if affected_location_ids:
+        membership.rebuild_groups_membership(
+            ServiceNowGroup.objects.filter(
+                include_descendant_locations=True,
+                locations__in=affected_location_ids,
+            )
+            .values_list("pk", flat=True)
+            .distinct(),
+            sources=[MembershipSourceChoices.SOURCE_LOCATION],
+        )
+
+
+@receiver(post_save, sender=ServiceNowGroup)
+def service_now_group_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Recompute location-sourced memberships, which depend on ``include_descendant_locations``."""
+    if raw or created:
+        return
+
+    membership.rebuild_group_membership(instance, sources=[MembershipSourceChoices.SOURCE_LOCATION])
+
+
+def _handle_assignment_change(source, instance, action, reverse, pk_set, **kwargs):
+    """
+    Recompute the memberships of the groups affected by an assignment M2M change.
+
+    When the relation is edited from the ServiceNow group side ``instance`` is the
+    group; when edited from the other side (e.g. ``device.service_now_groups.add()``)
+    ``instance`` is the related object and ``pk_set`` holds group primary keys.
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            membership.rebuild_group_membership(instance, sources=[source])
+        return
+
+    if action == "pre_clear":
+        # pk_set is not provided for clear(), so remember the affected groups first
+        instance._service_now_group_pks = list(instance.service_now_groups.values_list("pk", flat=True))
+    elif action == "post_clear":
+        membership.rebuild_groups_membership(getattr(instance, "_service_now_group_pks", []), sources=[source])
+    elif action in ("post_add", "post_remove"):
+        membership.rebuild_groups_membership(pk_set or [], sources=[source])
+
+
+@receiver(m2m_changed, sender=ServiceNowGroup.locations.through)
+def locations_changed(sender, **kwargs):
+    """Keep location-sourced memberships current."""
+    _handle_assignment_change(MembershipSourceChoices.SOURCE_LOCATION, **kwargs)
+
+
+@receiver(m2m_changed, sender=ServiceNowGroup.dynamic_groups.through)
+def dynamic_groups_changed(sender, **kwargs):
+    """Keep dynamic-group-sourced memberships current."""
+    _handle_assignment_change(MembershipSourceChoices.SOURCE_DYNAMIC_GROUP, **kwargs)
+
+
+@receiver(m2m_changed, sender=ServiceNowGroup.devices.through)
+def devices_changed(sender, **kwargs):
+    """Keep explicitly assigned memberships current."""
+    _handle_assignment_change(MembershipSourceChoices.SOURCE_DEVICE, **kwargs)
+
+
+@receiver(membership.membership_changed)
+def invalidate_membership_cache(sender, group_ids=(), device_ids=(), **kwargs):
+    """Invalidate the cached membership of exactly the groups and devices that changed, once committed."""
+    cache.invalidate(group_ids=group_ids, device_ids=device_ids)
+
+
+@receiver(membership.membership_changed)
+def schedule_device_count_refresh(sender, group_ids=(), **kwargs):
+    """Refresh the stored device count of the changed groups in the background once committed."""
+    from .tasks import enqueue_device_count_refresh
+
+    enqueue_device_count_refresh(group_ids)
+
+
+@receiver(membership.membership_changed)
+@receiver(post_save, sender=ServiceNowGroup)
+@receiver(post_delete, sender=ServiceNowGroup)
+@receiver(m2m_changed, sender=ServiceNowGroup.locations.through)
+@receiver(m2m_changed, sender=ServiceNowGroup.dynamic_groups.through)
+@receiver(m2m_changed, sender=ServiceNowGroup.devices.through)
+def invalidate_statistics(sender, **kwargs):
+    """Drop the cached statistics when groups, their assignments or their members change."""
+    stats.invalidate()
+    transaction.on_commit(stats.invalidate)
+
+
+@receiver(post_save, sender=Device)
+@receiver(post_delete, sender=Device)
+@receiver(m2m_changed, sender=Device.tags.through)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=DeviceType)
+@receiver(post_delete, sender=DeviceType)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Manufacturer)
+@receiver(post_save, sender=Platform)
+@receiver(post_delete, sender=Platform)
+@receiver(post_save, sender=DeviceRole)
+@receiver(post_delete, sender=DeviceRole)
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_dynamic_group_members(sender, **kwargs):
+    """Make cached dynamic group member sets stale once changes to devices or the objects their filters reference commit."""
+    member_sets.bump_data_version()
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=DeviceType)
+@receiver(post_delete, sender=DeviceType)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Manufacturer)
+@receiver(post_save, sender=Platform)
+@receiver(post_delete, sender=Platform)
+@receiver(post_save, sender=DeviceRole)
+@receiver(post_delete, sender=DeviceRole)
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def schedule_dynamic_group_rebuild(sender, created=False, raw=False, **kwargs):
+    """Rebuild dynamic-group-sourced memberships in the background once edits to objects device filters reference commit."""
+    if raw or created:
+        # Nothing references a new object yet
+        return
+
+    from .tasks import enqueue_dynamic_group_rebuild
+
+    enqueue_dynamic_group_rebuild()
+
+
+@receiver(m2m_changed, sender=Device.tags.through)
+def device_tags_changed(sender, instance, action, reverse, model, pk_set=None, **kwargs):
+    """Recompute the memberships of retagged devices, since dynamic group filters can match on tags."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if isinstance(instance, Device):
+        membership.refresh_device_membership(instance)
+    elif model is Device and pk_set:
+        for device in Device.objects.filter(pk__in=pk_set):
+            membership.refresh_device_membership(device)
+
+
+@receiver(pre_delete, sender=Device)
+def device_deleted(sender, instance, **kwargs):
+    """Invalidate cached membership of a device whose rows are about to be cascade-deleted."""
+    membership.membership_changed.send(
+        sender=ServiceNowGroupMembership,
+        group_ids=set(instance.service_now_group_memberships.values_list("group_id", flat=True)),
+        device_ids=[instance.pk],
+    )
+
+
+@receiver(pre_delete, sender=ServiceNowGroup)
+def service_now_group_deleted(sender, instance, **kwargs):
+    """Invalidate cached membership of a group whose rows are about to be cascade-deleted."""
+    membership.membership_changed.send(
+        sender=ServiceNowGroupMembership,
+        group_ids=[instance.pk],
+        device_ids=set(instance.memberships.values_list("device_id", flat=True)),
+    )
@@ -0,0 +1,124 @@
+"""Compact membership snapshots and merge-based diffs for delta-only syncs."""
+
+import hashlib
+import uuid
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+from .models import ServiceNowGroup, ServiceNowGroupSnapshot
+
+# Size in bytes of one packed device ID.
+ID_SIZE = 16
+
+
+def pack(device_ids: List[bytes]) -> bytes:
+    """Concatenate sorted 16-byte device IDs into a snapshot blob."""
+    return b"".join(device_ids)
+
+
+def unpack(blob: bytes) -> List[bytes]:
+    """Split a snapshot blob back into its sorted 16-byte device IDs."""
+    blob = bytes(blob)
+    return [blob[i:i + ID_SIZE] for i in range(0, len(blob), ID_SIZE)]
+
+
+def current_device_ids(group: ServiceNowGroup) -> List[bytes]:
+    """Return the sorted 16-byte IDs of the devices currently associated with a group."""
+    return sorted(
+        device_id.bytes for device_id in group.memberships.values_list("device_id", flat=True).distinct()
+    )
+
+
+def diff_sorted(old: List[bytes], new: List[bytes]) -> Tuple[List[bytes], List[bytes]]:
+    """
+    Compare two sorted, duplicate-free ID lists in a single merge pass.
+
+    Runs in O(len(old) + len(new)) time without building sets.
+
+    Returns:
+        tuple: ``(added, removed)`` IDs, each sorted
+    """
+    added, removed = [], []
+    i = j = 0
+    len_old, len_new = len(old), len(new)
+    while i < len_old and j < len_new:
+        old_id, new_id = old[i], new[j]
+        if old_id == new_id:
+            i += 1
+            j += 1
+        elif old_id < new_id:
+            removed.append(old_id)
+            i += 1
+        else:
+            added.append(new_id)
+            j += 1
+    removed.extend(old[i:])
+    added.extend(new[j:])
+    return added, removed
+
+
+@dataclass
+class MembershipDiff:
+    """Devices added to and removed from a group since a snapshot."""
+
+    snapshot: Optional[ServiceNowGroupSnapshot]
+    added: List[uuid.UUID] = field(default_factory=list)
+    removed: List[uuid.UUID] = field(default_factory=list)
+
+
+def _digest(blob: bytes) -> str:
+    return hashlib.sha256(blob).hexdigest()
+
+
+def take_snapshot(group: ServiceNowGroup) -> ServiceNowGroupSnapshot:
+    """
+    Record the current devices of a group as its latest snapshot.
+
+    Snapshots beyond the ``snapshot_retention`` newest of the group are deleted.
+    """
+    blob = pack(current_device_ids(group))
+    snapshot = ServiceNowGroupSnapshot.objects.create(
+        group=group,
+        device_count=len(blob) // ID_SIZE,
+        digest=_digest(blob),
+        device_ids=blob,
+    )
+    retention = settings.PLUGINS_CONFIG.get("service_now_groups", {}).get("snapshot_retention", 5)
+    expired = group.snapshots.order_by("-created").values_list("pk", flat=True)[retention:]
+    ServiceNowGroupSnapshot.objects.filter(pk__in=list(expired)).delete()
+    return snapshot
+
+
+def get_membership_diff(
+    group: ServiceNowGroup,
+    snapshot: Optional[ServiceNowGroupSnapshot] = None,
+) -> MembershipDiff:
+    """
+    Return the devices added to and removed from a group since a snapshot.
+
+    Args:
+        group: ServiceNow group to diff
+        snapshot: Snapshot to compare against; the group's latest when omitted.
+            Without any snapshot every current device is reported as added.
+
+    Returns:
+        MembershipDiff: The snapshot used and the sorted added and removed device IDs
+    """
+    if snapshot is None:
+        snapshot = group.snapshots.order_by("-created").first()
+    new = current_device_ids(group)
+    if snapshot is None:
+        old = []
+    elif snapshot.digest == _digest(pack(new)):
+        return MembershipDiff(snapshot=snapshot)
+    else:
+        old = unpack(snapshot.device_ids)
+
+    added, removed = diff_sorted(old, new)
+    return MembershipDiff(
+        snapshot=snapshot,
+        added=[uuid.UUID(bytes=device_id) for device_id in added],
+        removed=[uuid.UUID(bytes=device_id) for device_id in removed],
+    )
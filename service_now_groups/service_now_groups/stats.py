@@ -0,0 +1,90 @@
+"""Cached aggregate statistics about ServiceNow groups and device coverage."""
+
+import math
+import statistics
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+from nautobot.dcim.models import Device
+
+from .models import ServiceNowGroup, ServiceNowGroupMembership
+
+CACHE_KEY = "service_now_groups:statistics:v1"
+
+
+def _percentile(sorted_values: List[int], percent: float) -> Optional[int]:
+    """Return the nearest-rank percentile of an ascending list, or None if it is empty."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)]
+
+
+def compute_statistics() -> Dict:
+    """
+    Compute the statistics with a single query.
+
+    One row is read per group, holding its stored device count and whether it has
+    locations, dynamic groups and explicit devices assigned. The device totals are
+    uncorrelated scalar subqueries of the same statement, which the database
+    evaluates once.
+    """
+    total_devices = Device.objects.order_by().values(total=models.Func(models.F("pk"), function="COUNT"))
+    covered_devices = (
+        ServiceNowGroupMembership.objects.order_by()
+        .values(total=models.Func(models.F("device_id"), function="COUNT", template="COUNT(DISTINCT %(expressions)s)"))
+    )
+    rows = list(
+        ServiceNowGroup.objects.order_by("cached_device_count")
+        .annotate(
+            has_locations=models.Exists(
+                ServiceNowGroup.locations.through.objects.filter(servicenowgroup_id=models.OuterRef("pk"))
+            ),
+            has_dynamic_groups=models.Exists(
+                ServiceNowGroup.dynamic_groups.through.objects.filter(servicenowgroup_id=models.OuterRef("pk"))
+            ),
+            has_devices=models.Exists(
+                ServiceNowGroup.devices.through.objects.filter(servicenowgroup_id=models.OuterRef("pk"))
+            ),
+            total_devices=models.Subquery(total_devices),
+            covered_devices=models.Subquery(covered_devices),
+        )
+        .values_list(
+            "cached_device_count", "has_locations", "has_dynamic_groups", "has_devices", "total_devices", "covered_devices"
+        )
+    )
+    if rows:
+        total, covered = rows[0][4], rows[0][5]
+    else:
+        total, covered = Device.objects.count(), 0
+
+    sizes = [row[0] for row in rows]
+    return {
+        "total_groups": len(rows),
+        "groups_with_devices": sum(1 for row in rows if row[3]),
+        "groups_with_locations": sum(1 for row in rows if row[1]),
+        "groups_with_dynamic_groups": sum(1 for row in rows if row[2]),
+        "total_devices": total,
+        "covered_devices": covered,
+        "uncovered_devices": total - covered,
+        "group_size": {
+            "min": sizes[0] if sizes else None,
+            "median": statistics.median(sizes) if sizes else None,
+            "p95": _percentile(sizes, 95),
+            "max": sizes[-1] if sizes else None,
+        },
+        "average_groups_per_device": round(sum(sizes) / covered, 2) if covered else 0,
+    }
+
+
+def get_statistics() -> Dict:
+    """Return the statistics, computing them at most once per ``statistics_cache_timeout`` seconds."""
+    timeout = settings.PLUGINS_CONFIG.get("service_now_groups", {}).get("statistics_cache_timeout", 60)
+    return cache.get_or_set(CACHE_KEY, compute_statistics, timeout)
+
+
+def invalidate() -> None:
+    """Drop the cached statistics."""
+    cache.delete(CACHE_KEY)
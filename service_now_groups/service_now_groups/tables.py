@@ -25,7 +25,11 @@ class ServiceNowGroupTable(BaseTable):
         template_code="{% for device in value.all %}<span class='badge bg-warning'>{{ device.name }}</span>{% endfor %}",
         orderable=False,
     )
-    device_count = tables.Column(accessor="device_count", verbose_name="Associated Devices")
+    device_count = tables.Column(
+        accessor="cached_device_count",
+        order_by=("cached_device_count",),
+        verbose_name="Associated Devices",
+    )
     created = tables.DateColumn()
     last_updated = tables.DateTimeColumn()
     actions = ButtonsColumn(ServiceNowGroup, pk_field="pk")
@@ -0,0 +1,118 @@
+"""Background tasks for the ServiceNow Groups app."""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Optional, Set
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from nautobot.core.celery import nautobot_task
+
+from . import stats
+from .choices import MembershipSourceChoices
+from .membership import rebuild_groups_membership
+from .models import ServiceNowGroup, ServiceNowGroupMembership
+from .transactions import OnCommitBatch
+
+# Per-thread flag set by ``device_count_refresh_suspended``
+_refresh_state = threading.local()
+
+
+@nautobot_task
+def refresh_device_counts(group_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Recompute the stored ``cached_device_count`` of ServiceNow groups.
+
+    The counts are computed and written by a single UPDATE statement.
+
+    Args:
+        group_ids: IDs of the groups to refresh; every group when omitted
+
+    Returns:
+        int: Number of groups refreshed
+    """
+    groups = ServiceNowGroup.objects.all()
+    if group_ids is not None:
+        groups = groups.filter(pk__in=list(group_ids))
+
+    device_counts = (
+        ServiceNowGroupMembership.objects.filter(group=OuterRef("pk"))
+        .order_by()
+        .values("group")
+        .annotate(count=Count("device", distinct=True))
+        .values("count")
+    )
+    refreshed = groups.update(cached_device_count=Coalesce(Subquery(device_counts), 0))
+    # Group sizes feed the statistics
+    stats.invalidate()
+    return refreshed
+
+
+def _enqueue_refresh(group_ids: Set[str]) -> None:
+    """Enqueue one ``refresh_device_counts`` task for ``group_ids``."""
+    refresh_device_counts.delay(sorted(group_ids))
+
+
+# Groups changed by the current thread's transaction, refreshed by one task once it commits
+_pending_refreshes = OnCommitBatch(_enqueue_refresh)
+
+
+def enqueue_device_count_refresh(group_ids: Iterable) -> None:
+    """
+    Refresh the stored device count of ``group_ids`` in the background once committed.
+
+    Groups changed anywhere in the same transaction are collected in a per-thread
+    batch, so a transaction enqueues one task however many memberships it
+    changes. Nothing is scheduled while refreshes are suspended.
+    """
+    if getattr(_refresh_state, "suspended", False):
+        return
+
+    _pending_refreshes.add(str(pk) for pk in group_ids)
+
+
+@nautobot_task
+def rebuild_dynamic_group_memberships() -> int:
+    """
+    Recompute the dynamic-group-sourced memberships of every group with dynamic groups.
+
+    Enqueued when an object that dynamic group filters reference, such as a
+    location, role or tag, is edited, which can change the members of any
+    dynamic group.
+
+    Returns:
+        int: Number of membership rows deleted or inserted
+    """
+    group_ids = ServiceNowGroup.objects.filter(dynamic_groups__isnull=False).values_list("pk", flat=True).distinct()
+    return rebuild_groups_membership(group_ids, sources=[MembershipSourceChoices.SOURCE_DYNAMIC_GROUP])
+
+
+def _enqueue_rebuild(keys: Set[str]) -> None:
+    """Enqueue one ``rebuild_dynamic_group_memberships`` task."""
+    rebuild_dynamic_group_memberships.delay()
+
+
+# Set while the current thread's transaction has edits that call for a dynamic group rebuild
+_pending_rebuild = OnCommitBatch(_enqueue_rebuild)
+
+
+def enqueue_dynamic_group_rebuild() -> None:
+    """Rebuild dynamic-group-sourced memberships in the background, once per transaction, once committed."""
+    _pending_rebuild.add([MembershipSourceChoices.SOURCE_DYNAMIC_GROUP])
+
+
+@contextmanager
+def device_count_refresh_suspended():
+    """
+    Schedule no background device count refreshes within the block.
+
+    For bulk operations, such as migrations and seeding, that refresh every
+    group's count themselves once they are done.
+    """
+    previous = getattr(_refresh_state, "suspended", False)
+    _refresh_state.suspended = True
+    try:
+        yield
+    finally:
+        _refresh_state.suspended = previous
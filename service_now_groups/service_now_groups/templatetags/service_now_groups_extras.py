@@ -1,9 +1,8 @@
 """Template tags for the ServiceNow Groups app."""
 
 from django.template import Library
-from django.template.loader import render_to_string
 
-from ..models import ServiceNowGroup
+from ..resolver import ServiceNowGroupResolver
 
 register = Library()
 
@@ -12,41 +11,17 @@ register = Library()
 def device_service_now_groups_panel(context):
     """
     Template tag to render ServiceNow groups panel for device detail pages.
-    
+
     Usage: {% device_service_now_groups_panel %}
     """
     device = context.get('object')
     if not device:
         return {'servicenow_groups': []}
-    
-    # Get all ServiceNow groups associated with this device
-    servicenow_groups = ServiceNowGroup.objects.filter(
-        devices=device
-    ).distinct()
-    
-    # Add groups from device's location
-    if hasattr(device, 'location') and device.location:
-        location_groups = ServiceNowGroup.objects.filter(
-            locations=device.location
-        ).distinct()
-        servicenow_groups = servicenow_groups.union(location_groups)
-    
-    # Add groups from dynamic groups that include this device
-    dynamic_groups = ServiceNowGroup.objects.filter(
-        dynamic_groups__isnull=False
-    ).distinct()
-    
-    for group in dynamic_groups:
-        if group.is_device_associated(device):
-            servicenow_groups = servicenow_groups.union([group])
-    
-    # Prefetch related objects for performance
-    servicenow_groups = servicenow_groups.prefetch_related(
-        'locations',
-        'dynamic_groups',
-        'devices'
-    )
-    
+
+    # Groups come with device counts and assignments prefetched for rendering
+    resolver = ServiceNowGroupResolver.for_context(context, device)
+    servicenow_groups = resolver.get_detailed_groups(device)
+
     return {
         'servicenow_groups': servicenow_groups,
         'object': device,
@@ -57,52 +32,30 @@ def device_service_now_groups_panel(context):
 def device_service_now_groups_count(context):
     """
     Template tag to get the count of ServiceNow groups associated with a device.
-    
+
+    A group that matches the device by several assignment methods is counted once.
+
     Usage: {% device_service_now_groups_count as count %}
     """
     device = context.get('object')
     if not device:
         return 0
-    
-    # Count ServiceNow groups associated with this device
-    count = ServiceNowGroup.objects.filter(devices=device).count()
-    
-    # Add location-based groups
-    if hasattr(device, 'location') and device.location:
-        count += ServiceNowGroup.objects.filter(locations=device.location).count()
-    
-    # Add dynamic group-based associations
-    dynamic_groups = ServiceNowGroup.objects.filter(dynamic_groups__isnull=False)
-    for group in dynamic_groups:
-        if group.is_device_associated(device):
-            count += 1
-    
-    return count
+
+    resolver = ServiceNowGroupResolver.for_context(context, device)
+    return len(resolver.get_group_ids(device))
 
 
 @register.filter
 def has_servicenow_groups(device):
     """
     Template filter to check if a device has associated ServiceNow groups.
-    
+
+    Reuses the result of any tag already rendered for the same device.
+
     Usage: {{ device|has_servicenow_groups }}
     """
     if not device:
         return False
-    
-    # Check explicit device assignment
-    if ServiceNowGroup.objects.filter(devices=device).exists():
-        return True
-    
-    # Check location assignment
-    if hasattr(device, 'location') and device.location:
-        if ServiceNowGroup.objects.filter(locations=device.location).exists():
-            return True
-    
-    # Check dynamic group assignment
-    dynamic_groups = ServiceNowGroup.objects.filter(dynamic_groups__isnull=False)
-    for group in dynamic_groups:
-        if group.is_device_associated(device):
-            return True
-    
-    return False 
\ No newline at end of file
+
+    resolver = ServiceNowGroupResolver.for_context({}, device)
+    return bool(resolver.get_group_ids(device))
@@ -0,0 +1,74 @@
+"""Tests for the ServiceNow Groups Django admin."""
+
+import csv
+import io
+
+from django.contrib.admin.sites import AdminSite
+from django.test import TestCase, RequestFactory
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+
+from service_now_groups.admin import ServiceNowGroupAdmin
+from service_now_groups.models import ServiceNowGroup
+
+
+class ServiceNowGroupAdminExportTestCase(TestCase):
+    """Test cases for the assignment summary CSV admin actions."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test locations
+        self.location1 = Location.objects.create(name="Test Location 1", slug="test-location-1")
+        self.location2 = Location.objects.create(name="Test Location 2", slug="test-location-2")
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create test device
+        self.device = Device.objects.create(
+            name="Test Device",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location1,
+            status=self.status
+        )
+
+        # Create groups with several assignments each
+        for i in range(10):
+            group = ServiceNowGroup.objects.create(name=f"Test Group {i}")
+            group.locations.add(self.location1, self.location2)
+            group.devices.add(self.device)
+
+        self.admin = ServiceNowGroupAdmin(ServiceNowGroup, AdminSite())
+        self.request = RequestFactory().get("/admin/")
+
+    def _export(self, action):
+        """Run an export action over every group and return the parsed CSV rows."""
+        queryset = self.admin.get_queryset(self.request)
+        with self.assertNumQueries(1):
+            response = getattr(self.admin, action)(self.request, queryset)
+            content = b"".join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_export_assignment_summary(self):
+        """Test that the summary is streamed from a single query."""
+        rows = self._export("export_assignment_summary")
+
+        self.assertEqual(rows[0], ["Name", "Description", "Assignment Summary", "Device Count", "Created"])
+        self.assertEqual(len(rows), 11)
+        self.assertEqual(rows[1][0], "Test Group 0")
+        self.assertEqual(rows[1][2], "2 location(s), 1 explicit device(s)")
+
+    def test_export_assignment_summary_with_sources(self):
+        """Test that the per-source device breakdown adds no queries."""
+        rows = self._export("export_assignment_summary_with_sources")
+
+        self.assertEqual(rows[0][-3:], ["Devices via Location", "Devices via Dynamic Group", "Devices via Explicit Device"])
+        self.assertEqual(rows[1][-3:], ["1", "0", "1"])
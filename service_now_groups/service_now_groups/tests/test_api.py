@@ -1,6 +1,9 @@
 """Tests for the ServiceNow Groups API."""
 
 import json
+import uuid
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
@@ -8,9 +11,10 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
-from nautobot.extras.models import DynamicGroup
+from nautobot.extras.models import DynamicGroup, Job as JobModel, JobResult
 
 from service_now_groups.models import ServiceNowGroup
+from service_now_groups.tasks import refresh_device_counts
 
 User = get_user_model()
 
@@ -71,6 +75,9 @@ class ServiceNowGroupAPITestCase(TestCase):
         )
         self.service_now_group.locations.add(self.location1)
         self.service_now_group.devices.add(self.device2)
+
+        # Stored device counts are refreshed in the background after commit
+        refresh_device_counts()
         
         # Set up API client
         self.client = APIClient()
@@ -147,6 +154,29 @@ class ServiceNowGroupAPITestCase(TestCase):
         self.assertEqual(self.service_now_group.locations.count(), 1)
         self.assertEqual(self.service_now_group.locations.first(), self.location2)
 
+    def test_update_include_descendant_locations(self):
+        """Test that updates can switch on matching devices below the assigned locations."""
+        child_location = Location.objects.create(name="Test Child Location", slug="test-child-location", parent=self.location2)
+        child_device = Device.objects.create(
+            name="Test Child Device",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=child_location,
+            status=self.status
+        )
+        url = reverse("plugins-api:service_now_groups-api:servicenowgroup-detail", kwargs={"pk": self.service_now_group.pk})
+        data = {
+            "locations": [self.location2.pk],
+            "include_descendant_locations": True
+        }
+        
+        response = self.client.patch(url, data, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.service_now_group.refresh_from_db()
+        self.assertTrue(self.service_now_group.include_descendant_locations)
+        self.assertTrue(self.service_now_group.is_device_associated(child_device))
+
     def test_partial_update_service_now_group(self):
         """Test partial update of a ServiceNow group."""
         url = reverse("plugins-api:service_now_groups-api:servicenowgroup-detail", kwargs={"pk": self.service_now_group.pk})
@@ -203,6 +233,18 @@ class ServiceNowGroupAPITestCase(TestCase):
         response = self.client.get(url, {"devices": [self.device1.name]})
         self.assertEqual(len(response.data["results"]), 0)
 
+    def test_filter_service_now_groups_by_device_count(self):
+        """Test filtering ServiceNow groups by their stored device count."""
+        ServiceNowGroup.objects.create(name="Empty ServiceNow Group")
+        url = reverse("plugins-api:service_now_groups-api:servicenowgroup-list")
+
+        response = self.client.get(url, {"device_count__gte": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([group["name"] for group in response.data["results"]], ["Test ServiceNow Group"])
+
+        response = self.client.get(url, {"device_count__lte": 0})
+        self.assertEqual([group["name"] for group in response.data["results"]], ["Empty ServiceNow Group"])
+
     def test_associated_devices_action(self):
         """Test the associated_devices custom action."""
         url = reverse("plugins-api:service_now_groups-api:servicenowgroup-associated-devices", kwargs={"pk": self.service_now_group.pk})
@@ -259,6 +301,73 @@ class ServiceNowGroupAPITestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("device_id is required", response.data["error"])
 
+    def test_export_action(self):
+        """Test streaming the group to device pairs as NDJSON."""
+        url = reverse("plugins-api:service_now_groups-api:servicenowgroup-export")
+        response = self.client.get(url, {"columns": "group_name,device_name"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(
+            sorted(row["device_name"] for row in rows),
+            ["Test Device 1", "Test Device 2"],
+        )
+
+    def test_export_action_invalid_column(self):
+        """Test exporting with an unknown column."""
+        url = reverse("plugins-api:service_now_groups-api:servicenowgroup-export")
+        response = self.client.get(url, {"columns": "group_name,secret"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_devices_action(self):
+        """Test that syncing a group enqueues the sync job and returns its result ID."""
+        JobModel.objects.filter(job_class_name="SyncServiceNowGroupDevices").update(enabled=True)
+        job_result = JobResult(pk=uuid.uuid4())
+        url = reverse("plugins-api:service_now_groups-api:servicenowgroup-sync-devices", kwargs={"pk": self.service_now_group.pk})
+
+        with mock.patch("service_now_groups.jobs.enqueue_sync_job", return_value=job_result) as enqueue_sync_job:
+            response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["job_result_id"], job_result.pk)
+        self.assertEqual(enqueue_sync_job.call_args[0][0], self.service_now_group)
+
+    def test_sync_devices_action_job_disabled(self):
+        """Test that syncing fails cleanly while the sync job is disabled."""
+        JobModel.objects.filter(job_class_name="SyncServiceNowGroupDevices").update(enabled=False)
+        url = reverse("plugins-api:service_now_groups-api:servicenowgroup-sync-devices", kwargs={"pk": self.service_now_group.pk})
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_snapshot_and_membership_diff_actions(self):
+        """Test taking a snapshot and diffing the group's membership against it."""
+        snapshot_url = reverse("plugins-api:service_now_groups-api:servicenowgroup-snapshot", kwargs={"pk": self.service_now_group.pk})
+        diff_url = reverse("plugins-api:service_now_groups-api:servicenowgroup-membership-diff", kwargs={"pk": self.service_now_group.pk})
+
+        response = self.client.get(diff_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["snapshot"])
+        self.assertEqual(response.data["added_count"], 2)
+
+        response = self.client.post(snapshot_url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["device_count"], 2)
+
+        self.service_now_group.devices.remove(self.device2)
+        response = self.client.get(diff_url)
+        self.assertEqual(response.data["added"], [])
+        self.assertEqual(response.data["removed"], [self.device2.pk])
+
+    def test_membership_diff_action_unknown_snapshot(self):
+        """Test diffing against a snapshot that does not exist."""
+        url = reverse("plugins-api:service_now_groups-api:servicenowgroup-membership-diff", kwargs={"pk": self.service_now_group.pk})
+        response = self.client.get(url, {"snapshot": str(uuid.uuid4())})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_statistics_action(self):
         """Test the statistics custom action."""
         # Create additional groups for testing
@@ -273,6 +382,49 @@ class ServiceNowGroupAPITestCase(TestCase):
         self.assertEqual(response.data["groups_with_locations"], 1)
         self.assertEqual(response.data["groups_with_devices"], 1)
 
+    def test_device_groups_action(self):
+        """Test the reverse device groups lookup."""
+        url = reverse("plugins-api:service_now_groups-api:device-groups", kwargs={"pk": self.device1.pk})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["name"], "Test ServiceNow Group")
+        self.assertEqual(response.data["results"][0]["sources"], ["location"])
+
+    def test_device_groups_action_invalid_device(self):
+        """Test the reverse device groups lookup with a nonexistent device."""
+        url = reverse(
+            "plugins-api:service_now_groups-api:device-groups",
+            kwargs={"pk": "00000000-0000-0000-0000-000000000000"},
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_resolve_devices_action(self):
+        """Test bulk resolution of devices by ID and name."""
+        url = reverse("plugins-api:service_now_groups-api:servicenowgroup-resolve-devices")
+        data = {"devices": [str(self.device1.pk), "Test Device 2", "Nonexistent Device"]}
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(response.data["not_found"], ["Nonexistent Device"])
+        groups_by_device = {
+            result["device"]["name"]: [group["sources"] for group in result["groups"]]
+            for result in response.data["results"]
+        }
+        self.assertEqual(groups_by_device["Test Device 1"], [["location"]])
+        self.assertEqual(groups_by_device["Test Device 2"], [["device"]])
+
+    def test_resolve_devices_action_missing_devices(self):
+        """Test bulk resolution without a device list."""
+        url = reverse("plugins-api:service_now_groups-api:servicenowgroup-resolve-devices")
+        response = self.client.post(url, {}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_unauthorized_access(self):
         """Test unauthorized access to API endpoints."""
         # Create unauthenticated client
@@ -0,0 +1,55 @@
+"""Tests for the membership resolution benchmark suite."""
+
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from nautobot.dcim.models import Device
+
+from service_now_groups.benchmarks import _scenarios, run_benchmarks, topology
+from service_now_groups.models import ServiceNowGroup
+
+
+class BenchmarkTestCase(TestCase):
+    """Test cases for run_benchmarks and the benchmark_service_now_groups command."""
+
+    def test_topology_matches_requested_size(self):
+        """Test that the seeded topology has exactly the requested number of devices."""
+        for size in (1000, 10000, 100000):
+            shape = topology(size)
+            self.assertEqual(shape["regions"] * shape["sites_per_region"] * shape["devices_per_site"], size)
+
+    def test_report_covers_every_scenario(self):
+        """Test that a small run reports every scenario and leaves no data behind."""
+        report = run_benchmarks(sizes=[200], repeat=2)
+
+        result = report["results"][0]
+        self.assertEqual(result["devices"], 200)
+        self.assertEqual(
+            set(result["scenarios"]),
+            {"get_associated_devices", "is_device_associated", "device_count", "device_panel_render", "list_api"},
+        )
+        self.assertEqual(result["skipped"], {})
+        self.assertGreater(result["scenarios"]["get_associated_devices"]["cold_queries"], 0)
+        self.assertFalse(Device.objects.filter(name__startswith="benchmark-").exists())
+
+    def test_device_scenarios_are_skipped_without_members(self):
+        """Test that scenarios needing a device are skipped when no group has any devices."""
+        ServiceNowGroup.objects.create(name="Test Group")
+        user = get_user_model().objects.create(username="testuser", is_superuser=True)
+
+        scenarios, skipped = _scenarios(user)
+
+        self.assertEqual(set(scenarios), {"get_associated_devices", "device_count", "list_api"})
+        self.assertEqual(set(skipped), {"is_device_associated", "device_panel_render"})
+
+    def test_management_command_emits_json(self):
+        """Test that the command writes a JSON report to standard output."""
+        stdout = io.StringIO()
+        call_command("benchmark_service_now_groups", "--sizes", "100", "--repeat", "1", stdout=stdout, stderr=io.StringIO())
+
+        report = json.loads(stdout.getvalue())
+        self.assertEqual([result["devices"] for result in report["results"]], [100])
@@ -0,0 +1,109 @@
+"""Tests for the ServiceNow Groups membership cache."""
+
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+
+from service_now_groups import cache
+from service_now_groups.device_sets import DeviceSet, device_set
+from service_now_groups.models import ServiceNowGroup
+from service_now_groups.tasks import device_count_refresh_suspended
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ServiceNowGroupMembershipCacheTestCase(TestCase):
+    """Test cases for the Redis-backed membership cache."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Run the on-commit invalidations of the memberships created here
+        with self.captureOnCommitCallbacks(execute=True), device_count_refresh_suspended():
+            # Create test locations
+            self.location1 = Location.objects.create(name="Test Location 1", slug="test-location-1")
+            self.location2 = Location.objects.create(name="Test Location 2", slug="test-location-2")
+
+            # Create test device components
+            self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+            self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+            self.device_type = DeviceType.objects.create(
+                manufacturer=self.manufacturer,
+                model="Test Model",
+                slug="test-model"
+            )
+            self.status = Status.objects.get(slug="active")
+
+            # Create test device
+            self.device = Device.objects.create(
+                name="Test Device",
+                device_type=self.device_type,
+                device_role=self.device_role,
+                location=self.location1,
+                status=self.status
+            )
+
+            self.group = ServiceNowGroup.objects.create(name="Test Group")
+            self.group.locations.add(self.location1)
+
+    def test_repeated_lookups_hit_the_cache(self):
+        """Test that a second lookup is served from the cache."""
+        expected = device_set(Device.objects.filter(pk=self.device.pk))
+        before = cache.get_statistics()
+
+        self.assertEqual(cache.get_group_device_ids(self.group.pk), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get_group_device_ids(self.group.pk), expected)
+
+        after = cache.get_statistics()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+    def test_device_move_invalidates_entries(self):
+        """Test that moving a device invalidates both the group and the device entries."""
+        self.assertTrue(self.group.is_device_associated(self.device))
+        self.assertEqual(cache.get_group_device_ids(self.group.pk), device_set(Device.objects.filter(pk=self.device.pk)))
+
+        self.device.location = self.location2
+        self.device.save()
+
+        self.assertFalse(self.group.is_device_associated(self.device))
+        self.assertEqual(cache.get_group_device_ids(self.group.pk), DeviceSet())
+
+    def test_invalidation_is_batched_on_commit(self):
+        """Test that a transaction's changes are invalidated together, in one call, once it commits."""
+        self.assertTrue(self.group.is_device_associated(self.device))
+
+        with mock.patch.object(cache.cache, "delete_many", wraps=cache.cache.delete_many) as delete_many:
+            with self.captureOnCommitCallbacks(execute=True), device_count_refresh_suspended():
+                self.group.locations.remove(self.location1)
+                self.group.devices.add(self.device)
+                self.group.locations.add(self.location2)
+                delete_many.assert_not_called()
+
+        delete_many.assert_called_once()
+        self.assertTrue(self.group.is_device_associated(self.device))
+        self.assertEqual(cache.get_device_group_ids(self.device.pk), frozenset([self.group.pk]))
+
+    def test_assignment_change_invalidates_entries(self):
+        """Test that editing a group's assignments invalidates its entry."""
+        self.assertEqual(cache.get_device_group_ids(self.device.pk), frozenset([self.group.pk]))
+
+        self.group.locations.remove(self.location1)
+
+        self.assertEqual(cache.get_device_group_ids(self.device.pk), frozenset())
+        self.assertEqual(cache.get_group_device_ids(self.group.pk), DeviceSet())
+
+    def test_cache_can_be_disabled(self):
+        """Test that lookups bypass the cache when disabled in PLUGINS_CONFIG."""
+        plugins_config = {"service_now_groups": {"enable_membership_cache": False}}
+        with override_settings(PLUGINS_CONFIG={**settings.PLUGINS_CONFIG, **plugins_config}):
+            before = cache.get_statistics()
+            self.assertTrue(self.group.is_device_associated(self.device))
+            after = cache.get_statistics()
+
+        self.assertFalse(after["enabled"])
+        self.assertEqual(after["hits"] + after["misses"], before["hits"] + before["misses"])
@@ -0,0 +1,103 @@
+"""Tests for compact device sets and dense device indexes."""
+
+import pickle
+import uuid
+
+from django.test import TestCase
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+
+from service_now_groups.device_sets import DeviceSet, device_set, index_devices
+from service_now_groups.models import DeviceIndex
+
+
+class DeviceSetTestCase(TestCase):
+    """Test cases for DeviceSet set algebra and serialization."""
+
+    def test_set_algebra(self):
+        """Test union, intersection, difference and counts."""
+        first = DeviceSet([9, 1, 5, 3, 3])
+        second = DeviceSet([3, 4, 5])
+
+        self.assertEqual(list(first), [1, 3, 5, 9])
+        self.assertEqual(len(first), 4)
+        self.assertEqual(first | second, DeviceSet([1, 3, 4, 5, 9]))
+        self.assertEqual(first & second, DeviceSet([3, 5]))
+        self.assertEqual(first - second, DeviceSet([1, 9]))
+        self.assertEqual(first.union(), first)
+        self.assertEqual(first.intersection_count(second), 2)
+        self.assertIn(5, first)
+        self.assertNotIn(4, first)
+        self.assertNotIn(10, first)
+
+    def test_empty_set(self):
+        """Test that an empty set is falsy and combines like any other."""
+        first = DeviceSet([1, 2])
+
+        self.assertFalse(DeviceSet())
+        self.assertEqual(len(DeviceSet()), 0)
+        self.assertEqual(list(DeviceSet()), [])
+        self.assertEqual(first | DeviceSet(), first)
+        self.assertEqual(first & DeviceSet(), DeviceSet())
+        self.assertEqual(first - DeviceSet(), first)
+        self.assertEqual(DeviceSet.from_bytes(DeviceSet().to_bytes()), DeviceSet())
+
+    def test_pickles_as_compressed_bitmap(self):
+        """Test that a pickled set takes at most a bit per index, and far less when sparse."""
+        devices = DeviceSet(range(0, 100000, 2))
+        sparse = DeviceSet([1, 1000000])
+
+        data = pickle.dumps(devices)
+
+        self.assertLess(len(data), 100000 // 8 + 200)
+        self.assertLess(len(pickle.dumps(sparse)), 1000)
+        self.assertEqual(pickle.loads(data), devices)
+        self.assertEqual(pickle.loads(pickle.dumps(sparse)), sparse)
+        self.assertEqual(DeviceSet.from_bytes(devices.to_bytes()), devices)
+
+
+class DeviceIndexTestCase(TestCase):
+    """Test cases for dense device indexes."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test device components
+        self.location = Location.objects.create(name="Test Location", slug="test-location")
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+    def _device(self, name, **kwargs):
+        """Return an unsaved device."""
+        return Device(
+            name=name,
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location,
+            status=self.status,
+            **kwargs
+        )
+
+    def test_new_devices_are_indexed(self):
+        """Test that saving a new device gives it an index."""
+        device = self._device("Test Device")
+        device.save()
+
+        self.assertTrue(DeviceIndex.objects.filter(device=device).exists())
+
+    def test_unindexed_devices_are_a_miss(self):
+        """Test that devices created without signals make a set unavailable until they are indexed."""
+        devices = Device.objects.bulk_create([self._device(f"Bulk Device {i}", id=uuid.uuid4()) for i in range(3)])
+        queryset = Device.objects.filter(pk__in=[device.pk for device in devices])
+
+        self.assertIsNone(device_set(queryset))
+        self.assertFalse(DeviceIndex.objects.filter(device__in=devices).exists())
+
+        self.assertEqual(index_devices(), 3)
+        self.assertEqual(len(device_set(queryset)), 3)
+        self.assertEqual(index_devices(), 0)
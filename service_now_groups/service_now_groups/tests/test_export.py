@@ -0,0 +1,96 @@
+"""Tests for the streaming ServiceNow group membership export."""
+
+import csv
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+
+from service_now_groups.export import iter_membership_rows, parse_columns, render_export
+from service_now_groups.models import ServiceNowGroup
+
+
+class MembershipExportTestCase(TestCase):
+    """Test cases for the membership export helpers and management command."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test locations
+        self.location = Location.objects.create(name="Test Location", slug="test-location")
+        self.other_location = Location.objects.create(name="Other Location", slug="other-location")
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create test devices
+        self.device1 = Device.objects.create(
+            name="Test Device 1",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location,
+            status=self.status
+        )
+        self.device2 = Device.objects.create(
+            name="Test Device 2",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.other_location,
+            status=self.status
+        )
+
+        # Device 1 is assigned twice, by location and explicitly
+        self.group = ServiceNowGroup.objects.create(name="Test Group")
+        self.group.locations.add(self.location)
+        self.group.devices.add(self.device1, self.device2)
+
+    def test_one_row_per_pair(self):
+        """Test that a pair matched by several sources is exported once with all sources."""
+        rows = list(iter_membership_rows(["device_name", "sources"]))
+
+        self.assertEqual(
+            sorted(rows, key=lambda row: row["device_name"]),
+            [
+                {"device_name": "Test Device 1", "sources": "device|location"},
+                {"device_name": "Test Device 2", "sources": "device"},
+            ],
+        )
+
+    def test_rows_are_read_in_one_query(self):
+        """Test that the export is a single query regardless of the number of rows."""
+        with self.assertNumQueries(1):
+            rows = list(iter_membership_rows(parse_columns(None), chunk_size=1))
+        self.assertEqual(len(rows), 2)
+
+    def test_parse_columns_rejects_unknown_columns(self):
+        """Test that unknown columns are rejected."""
+        with self.assertRaises(ValueError):
+            parse_columns(["group_name", "password"])
+
+    def test_render_csv(self):
+        """Test that CSV output starts with a header row."""
+        columns = ["group_name", "device_name"]
+        output = "".join(render_export(iter_membership_rows(columns), columns, "csv"))
+
+        rows = list(csv.reader(io.StringIO(output)))
+        self.assertEqual(rows[0], columns)
+        self.assertEqual(len(rows), 3)
+
+    def test_management_command(self):
+        """Test that the command writes NDJSON to standard output."""
+        stdout = io.StringIO()
+        call_command("export_service_now_group_memberships", "--columns", "group_name,device_id", stdout=stdout)
+
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["group_name"], "Test Group")
+        self.assertEqual(set(rows[0]), {"group_name", "device_id"})
@@ -0,0 +1,145 @@
+"""Tests for the ServiceNow Groups GraphQL fields."""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+
+from service_now_groups.graphql.types import DeviceServiceNowGroupsLoader
+from service_now_groups.models import ServiceNowGroup
+
+User = get_user_model()
+
+FOR_DEVICES_QUERY = """
+query ($device: [String]) {
+    service_now_groups_for_devices(device: $device) {
+        device {
+            name
+        }
+        service_now_groups {
+            name
+        }
+    }
+}
+"""
+
+
+class ServiceNowGroupGraphQLTestCase(TestCase):
+    """Test cases for service_now_groups_for_devices."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test user
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass123",
+            is_superuser=True,
+            is_staff=True
+        )
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create test locations and devices
+        self.location1 = Location.objects.create(name="Test Location 1", slug="test-location-1")
+        self.location2 = Location.objects.create(name="Test Location 2", slug="test-location-2")
+        self.device1 = self._create_device("Test Device 1", self.location1)
+        self.device2 = self._create_device("Test Device 2", self.location2)
+
+        # Create test ServiceNow groups: one by location, one by explicit device
+        self.location_group = ServiceNowGroup.objects.create(name="Location Group")
+        self.location_group.locations.add(self.location1)
+        self.device_group = ServiceNowGroup.objects.create(name="Device Group")
+        self.device_group.devices.add(self.device1, self.device2)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_device(self, name, location):
+        """Create a device at ``location``."""
+        return Device.objects.create(
+            name=name,
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=location,
+            status=self.status
+        )
+
+    def _execute(self, query, variables=None):
+        """Execute a GraphQL query and return its data."""
+        response = self.client.post(
+            reverse("graphql-api"), {"query": query, "variables": variables or {}}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertNotIn("errors", response.json())
+        return response.json()["data"]
+
+    def _groups(self, data):
+        """Return the group names of each device in a query result, by device name."""
+        return {
+            result["device"]["name"]: [group["name"] for group in result["service_now_groups"]]
+            for result in data["service_now_groups_for_devices"]
+        }
+
+    def test_service_now_groups_for_devices(self):
+        """Test that the query includes groups assigned through locations."""
+        data = self._execute(FOR_DEVICES_QUERY)
+
+        self.assertEqual(
+            self._groups(data),
+            {
+                "Test Device 1": ["Device Group", "Location Group"],
+                "Test Device 2": ["Device Group"],
+            },
+        )
+
+    def test_filter_by_device_id_or_name(self):
+        """Test that devices can be selected by ID or by name."""
+        for device in ([str(self.device1.pk)], [self.device1.name]):
+            data = self._execute(FOR_DEVICES_QUERY, {"device": device})
+
+            self.assertEqual(self._groups(data), {"Test Device 1": ["Device Group", "Location Group"]})
+
+    def test_groups_are_batched(self):
+        """Test that resolving groups for more devices does not add queries."""
+        with CaptureQueriesContext(connection) as small:
+            self._execute(FOR_DEVICES_QUERY)
+
+        for i in range(10):
+            self.device_group.devices.add(self._create_device(f"Extra Device {i}", self.location1))
+        with CaptureQueriesContext(connection) as large:
+            data = self._execute(FOR_DEVICES_QUERY)
+
+        self.assertEqual(len(data["service_now_groups_for_devices"]), 12)
+        self.assertEqual(len(large), len(small))
+
+    def test_loader_follows_requested_order(self):
+        """Test that the loader returns each device's groups in the order of the requested IDs."""
+        loader = DeviceServiceNowGroupsLoader(self.user)
+
+        groups = loader.batch_load_fn([self.device2.pk, self.device1.pk]).get()
+
+        self.assertEqual(
+            [[group.name for group in device_groups] for device_groups in groups],
+            [["Device Group"], ["Device Group", "Location Group"]],
+        )
+
+    def test_results_are_restricted_to_viewable_objects(self):
+        """Test that devices and groups the user may not view are left out."""
+        self.user.is_superuser = False
+        self.user.save()
+
+        data = self._execute(FOR_DEVICES_QUERY, {"device": [str(self.device1.pk)]})
+
+        self.assertEqual(data["service_now_groups_for_devices"], [])
@@ -0,0 +1,105 @@
+"""Tests for hierarchical location assignment backed by the location closure."""
+
+from django.test import TestCase
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+
+from service_now_groups.location_closure import rebuild_location_closure
+from service_now_groups.models import LocationClosure, ServiceNowGroup
+
+
+class LocationClosureTestCase(TestCase):
+    """Test cases for LocationClosure maintenance and descendant matching."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create a region > country > campus location tree and a separate region
+        self.region = Location.objects.create(name="Test Region", slug="test-region")
+        self.country = Location.objects.create(name="Test Country", slug="test-country", parent=self.region)
+        self.campus = Location.objects.create(name="Test Campus", slug="test-campus", parent=self.country)
+        self.other_region = Location.objects.create(name="Other Region", slug="other-region")
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create a device deep in the tree
+        self.device = Device.objects.create(
+            name="Test Device",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.campus,
+            status=self.status
+        )
+
+        self.group = ServiceNowGroup.objects.create(name="Test Group", include_descendant_locations=True)
+        self.group.locations.add(self.region)
+
+    def _ancestors(self, location):
+        """Return the ancestors recorded for a location, with their depth."""
+        return dict(LocationClosure.objects.filter(descendant=location).values_list("ancestor_id", "depth"))
+
+    def test_closure_rows_for_new_locations(self):
+        """Test that creating locations records every ancestor."""
+        self.assertEqual(
+            self._ancestors(self.campus),
+            {self.campus.pk: 0, self.country.pk: 1, self.region.pk: 2},
+        )
+
+    def test_moving_a_subtree_updates_descendants(self):
+        """Test that re-parenting a location replaces the ancestors of its whole subtree."""
+        self.country.parent = self.other_region
+        self.country.save()
+
+        self.assertEqual(
+            self._ancestors(self.campus),
+            {self.campus.pk: 0, self.country.pk: 1, self.other_region.pk: 2},
+        )
+
+    def test_rebuild_location_closure(self):
+        """Test that a full rebuild restores lost rows."""
+        expected = self._ancestors(self.campus)
+        LocationClosure.objects.all().delete()
+
+        self.assertEqual(rebuild_location_closure(), 7)
+        self.assertEqual(self._ancestors(self.campus), expected)
+
+    def test_descendant_locations_are_matched(self):
+        """Test that a group assigned to a region matches devices in campuses below it."""
+        self.assertTrue(self.group.is_device_associated(self.device))
+        with self.assertNumQueries(1):
+            self.assertEqual(list(self.group.get_associated_devices(live=True)), [self.device])
+
+    def test_descendants_are_opt_in(self):
+        """Test that only the exact locations match when descendants are not included."""
+        self.group.include_descendant_locations = False
+        self.group.save()
+
+        self.assertFalse(self.group.is_device_associated(self.device))
+
+    def test_new_device_in_descendant_location(self):
+        """Test that a device created below an assigned location joins the group."""
+        device = Device.objects.create(
+            name="Test Device 2",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.country,
+            status=self.status
+        )
+
+        self.assertTrue(self.group.is_device_associated(device))
+
+    def test_moving_a_subtree_updates_memberships(self):
+        """Test that moving a subtree out of an assigned region drops its devices."""
+        self.country.parent = self.other_region
+        self.country.save()
+        self.assertFalse(self.group.is_device_associated(self.device))
+
+        self.group.locations.add(self.other_region)
+        self.assertTrue(self.group.is_device_associated(self.device))
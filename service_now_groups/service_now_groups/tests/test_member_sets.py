@@ -0,0 +1,196 @@
+"""Tests for the dynamic group member set cache."""
+
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+from nautobot.extras.models import DynamicGroup, Tag
+
+from service_now_groups import member_sets
+from service_now_groups.device_sets import DeviceSet, device_set
+from service_now_groups.member_sets import MemberSetCache, member_set_cache
+from service_now_groups.membership import rebuild_groups_membership
+from service_now_groups.models import ServiceNowGroup
+from service_now_groups.resolver import DynamicGroupEvaluator
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MemberSetCacheTestCase(TestCase):
+    """Test cases for get_member_ids and MemberSetCache."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Run the on-commit data version bumps of the objects created here
+        with self.captureOnCommitCallbacks(execute=True):
+            # Create test locations
+            self.location1 = Location.objects.create(name="Test Location 1", slug="test-location-1")
+            self.location2 = Location.objects.create(name="Test Location 2", slug="test-location-2")
+
+            # Create test device components
+            self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+            self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+            self.device_type = DeviceType.objects.create(
+                manufacturer=self.manufacturer,
+                model="Test Model",
+                slug="test-model"
+            )
+            self.status = Status.objects.get(slug="active")
+
+            # Create test devices
+            self.device1 = self._create_device("Test Device 1", self.location1)
+            self.device2 = self._create_device("Test Device 2", self.location2)
+
+            # Create test dynamic group
+            self.dynamic_group = DynamicGroup.objects.create(
+                name="Test Dynamic Group",
+                slug="test-dynamic-group",
+                content_type_id=Device._meta.pk,
+                filter={"location": [self.location1.slug]}
+            )
+        member_set_cache.clear()
+
+    def _create_device(self, name, location):
+        """Create a device at ``location``."""
+        return Device.objects.create(
+            name=name,
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=location,
+            status=self.status
+        )
+
+    def _device_set(self, *devices):
+        """Return the DeviceSet of ``devices``."""
+        return device_set(Device.objects.filter(pk__in=[device.pk for device in devices]))
+
+    def _patch_members(self):
+        """Patch DynamicGroup.members to count evaluations."""
+        return mock.patch.object(
+            DynamicGroup,
+            "members",
+            new_callable=mock.PropertyMock,
+            side_effect=lambda: Device.objects.filter(location=self.location1),
+        )
+
+    def test_member_set_is_evaluated_once(self):
+        """Test that repeated lookups are served from the cache."""
+        with self._patch_members() as members:
+            self.assertEqual(DynamicGroupEvaluator().member_ids(self.dynamic_group), self._device_set(self.device1))
+            self.assertEqual(DynamicGroupEvaluator().member_ids(self.dynamic_group), self._device_set(self.device1))
+
+        self.assertEqual(members.call_count, 1)
+
+    def test_filter_change_reevaluates(self):
+        """Test that editing the filter makes the cached member set unreachable."""
+        DynamicGroupEvaluator().member_ids(self.dynamic_group)
+
+        self.dynamic_group.filter = {"location": [self.location2.slug]}
+        self.dynamic_group.save()
+
+        self.assertEqual(DynamicGroupEvaluator().member_ids(self.dynamic_group), self._device_set(self.device2))
+
+    def test_device_change_bumps_data_version(self):
+        """Test that creating a device is seen by its own transaction and makes cached member sets stale once committed."""
+        self.assertEqual(DynamicGroupEvaluator().member_ids(self.dynamic_group), self._device_set(self.device1))
+        version = member_sets.data_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            device3 = self._create_device("Test Device 3", self.location1)
+            self.assertEqual(DynamicGroupEvaluator().member_ids(self.dynamic_group), self._device_set(self.device1, device3))
+            self.assertEqual(member_sets.data_version(), version)
+
+        self.assertGreater(member_sets.data_version(), version)
+        self.assertEqual(DynamicGroupEvaluator().member_ids(self.dynamic_group), self._device_set(self.device1, device3))
+
+    def test_failures_are_not_cached(self):
+        """Test that a dynamic group that can't be evaluated is retried on the next lookup."""
+        with mock.patch.object(DynamicGroup, "members", new_callable=mock.PropertyMock, side_effect=ValueError):
+            self.assertIsNone(DynamicGroupEvaluator().member_ids(self.dynamic_group))
+
+        self.assertEqual(DynamicGroupEvaluator().member_ids(self.dynamic_group), self._device_set(self.device1))
+
+    def test_device_type_change_bumps_data_version(self):
+        """Test that editing an object device filters reference makes cached member sets stale."""
+        DynamicGroupEvaluator().member_ids(self.dynamic_group)
+        version = member_sets.data_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.device_type.comments = "Updated"
+            self.device_type.save()
+
+        self.assertGreater(member_sets.data_version(), version)
+
+    def test_data_version_is_bumped_once_per_transaction(self):
+        """Test that many changes in one transaction bump the data version a single time."""
+        version = member_sets.data_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                self._create_device(f"Bulk Device {i}", self.location1)
+            self.device_type.comments = "Updated"
+            self.device_type.save()
+
+        self.assertEqual(member_sets.data_version(), version + 1)
+
+    def test_device_tag_change_bumps_data_version(self):
+        """Test that tagging a device makes cached member sets stale."""
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = Tag.objects.create(name="Test Tag", slug="test-tag")
+        version = member_sets.data_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.device1.tags.add(tag)
+
+        self.assertGreater(member_sets.data_version(), version)
+
+    def test_rebuilds_share_cached_member_sets(self):
+        """Test that rebuilds of groups sharing a dynamic group evaluate it once, across rebuilds too."""
+        groups = [ServiceNowGroup.objects.create(name=f"Test Group {i}") for i in range(3)]
+
+        with self._patch_members() as members:
+            for group in groups:
+                group.dynamic_groups.add(self.dynamic_group)
+            rebuild_groups_membership([group.pk for group in groups])
+
+        self.assertEqual(members.call_count, 1)
+        for group in groups:
+            self.assertTrue(group.is_device_associated(self.device1))
+            self.assertFalse(group.is_device_associated(self.device2))
+
+    def test_cache_can_be_disabled(self):
+        """Test that a cache size of 0 evaluates on every lookup."""
+        plugins_config = {
+            **settings.PLUGINS_CONFIG,
+            "service_now_groups": {**settings.PLUGINS_CONFIG.get("service_now_groups", {}), "dynamic_group_cache_size": 0},
+        }
+        with override_settings(PLUGINS_CONFIG=plugins_config), self._patch_members() as members:
+            DynamicGroupEvaluator().member_ids(self.dynamic_group)
+            DynamicGroupEvaluator().member_ids(self.dynamic_group)
+
+        self.assertEqual(members.call_count, 2)
+        self.assertEqual(len(member_set_cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the LRU keeps at most ``max_entries`` entries, dropping the least recently used."""
+        lru = MemberSetCache()
+        lru.set("a", DeviceSet([1]), max_entries=2, timeout=60)
+        lru.set("b", DeviceSet([2]), max_entries=2, timeout=60)
+        lru.get("a")
+        lru.set("c", DeviceSet([3]), max_entries=2, timeout=60)
+
+        self.assertEqual(lru.get("a"), DeviceSet([1]))
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("c"), DeviceSet([3]))
+
+    def test_entries_expire(self):
+        """Test that entries are dropped once their timeout has passed."""
+        lru = MemberSetCache()
+        with mock.patch.object(member_sets.time, "monotonic", return_value=1000.0):
+            lru.set("a", DeviceSet([1]), max_entries=2, timeout=60)
+        with mock.patch.object(member_sets.time, "monotonic", return_value=1061.0):
+            self.assertIsNone(lru.get("a"))
+        self.assertEqual(len(lru), 0)
@@ -0,0 +1,291 @@
+"""Tests for the materialized ServiceNow group membership table."""
+
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+from nautobot.extras.models import DynamicGroup, Tag
+
+from service_now_groups.choices import MembershipSourceChoices
+from service_now_groups.membership import (
+    rebuild_all_memberships,
+    rebuild_group_membership,
+    refresh_device_membership,
+)
+from service_now_groups.models import ServiceNowGroup, ServiceNowGroupMembership
+from service_now_groups.tasks import (
+    device_count_refresh_suspended,
+    rebuild_dynamic_group_memberships,
+    refresh_device_counts,
+)
+
+
+class ServiceNowGroupMembershipTestCase(TestCase):
+    """Test cases for incremental maintenance of ServiceNowGroupMembership."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test locations
+        self.location1 = Location.objects.create(name="Test Location 1", slug="test-location-1")
+        self.location2 = Location.objects.create(name="Test Location 2", slug="test-location-2")
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create test devices
+        self.device1 = Device.objects.create(
+            name="Test Device 1",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location1,
+            status=self.status
+        )
+        self.device2 = Device.objects.create(
+            name="Test Device 2",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location2,
+            status=self.status
+        )
+
+        # Create test dynamic group
+        self.dynamic_group = DynamicGroup.objects.create(
+            name="Test Dynamic Group",
+            slug="test-dynamic-group",
+            content_type_id=Device._meta.pk,
+            filter={"location": [self.location1.pk]}
+        )
+
+        self.group = ServiceNowGroup.objects.create(name="Test Group")
+
+    def _sources(self, device):
+        """Return the membership sources recorded for a device in the test group."""
+        return set(
+            ServiceNowGroupMembership.objects.filter(group=self.group, device=device).values_list("source", flat=True)
+        )
+
+    def test_location_assignment_creates_memberships(self):
+        """Test that adding a location records its devices."""
+        self.group.locations.add(self.location1)
+
+        self.assertEqual(self._sources(self.device1), {MembershipSourceChoices.SOURCE_LOCATION})
+        self.assertEqual(self._sources(self.device2), set())
+
+    def test_location_removal_deletes_memberships(self):
+        """Test that removing a location drops its devices."""
+        self.group.locations.add(self.location1)
+        self.group.locations.remove(self.location1)
+
+        self.assertFalse(self.group.memberships.exists())
+
+    def test_explicit_assignment_from_device_side(self):
+        """Test that reverse M2M edits are tracked."""
+        self.device2.service_now_groups.add(self.group)
+        self.assertEqual(self._sources(self.device2), {MembershipSourceChoices.SOURCE_DEVICE})
+
+        self.device2.service_now_groups.clear()
+        self.assertEqual(self._sources(self.device2), set())
+
+    def test_multiple_sources_are_recorded_separately(self):
+        """Test that a device matched by several methods has one row per method."""
+        self.group.locations.add(self.location1)
+        self.group.devices.add(self.device1)
+
+        self.assertEqual(
+            self._sources(self.device1),
+            {MembershipSourceChoices.SOURCE_LOCATION, MembershipSourceChoices.SOURCE_DEVICE},
+        )
+        self.assertEqual(self.group.device_count, 1)
+
+    def test_device_location_change_updates_memberships(self):
+        """Test that moving a device refreshes its location memberships."""
+        self.group.locations.add(self.location1)
+
+        self.device2.location = self.location1
+        self.device2.save()
+        self.assertTrue(self.group.is_device_associated(self.device2))
+
+        self.device1.location = self.location2
+        self.device1.save()
+        self.assertFalse(self.group.is_device_associated(self.device1))
+
+    def test_new_device_joins_dynamic_group_membership(self):
+        """Test that a newly created device is evaluated against dynamic groups."""
+        self.group.dynamic_groups.add(self.dynamic_group)
+
+        device3 = Device.objects.create(
+            name="Test Device 3",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location1,
+            status=self.status
+        )
+        self.assertEqual(self._sources(device3), {MembershipSourceChoices.SOURCE_DYNAMIC_GROUP})
+
+    def test_dynamic_group_filter_edit_updates_memberships(self):
+        """Test that editing a dynamic group filter refreshes its memberships."""
+        self.group.dynamic_groups.add(self.dynamic_group)
+
+        self.dynamic_group.filter = {"location": [self.location2.pk]}
+        self.dynamic_group.save()
+
+        self.assertFalse(self.group.is_device_associated(self.device1))
+        self.assertTrue(self.group.is_device_associated(self.device2))
+
+    def test_dynamic_group_delete_removes_memberships(self):
+        """Test that deleting a dynamic group drops the memberships it contributed."""
+        self.group.dynamic_groups.add(self.dynamic_group)
+        self.group.devices.add(self.device1)
+
+        self.dynamic_group.delete()
+
+        self.assertEqual(self._sources(self.device1), {MembershipSourceChoices.SOURCE_DEVICE})
+        self.assertFalse(
+            self.group.memberships.filter(source=MembershipSourceChoices.SOURCE_DYNAMIC_GROUP).exists()
+        )
+
+    def test_device_tag_change_updates_memberships(self):
+        """Test that tagging and untagging a device refreshes its dynamic group memberships."""
+        tag = Tag.objects.create(name="Test Tag", slug="test-tag")
+        tagged = DynamicGroup.objects.create(
+            name="Tagged Devices",
+            slug="tagged-devices",
+            content_type_id=Device._meta.pk,
+            filter={"tag": [tag.slug]}
+        )
+        self.group.dynamic_groups.add(tagged)
+        self.assertFalse(self.group.is_device_associated(self.device2))
+
+        self.device2.tags.add(tag)
+        self.assertEqual(self._sources(self.device2), {MembershipSourceChoices.SOURCE_DYNAMIC_GROUP})
+
+        self.device2.tags.remove(tag)
+        self.assertEqual(self._sources(self.device2), set())
+
+    def test_device_refresh_checks_dynamic_groups_in_one_query(self):
+        """Test that refreshing a device matches it against every dynamic group with a single query."""
+        for i in range(3):
+            self.group.dynamic_groups.add(
+                DynamicGroup.objects.create(
+                    name=f"Dynamic Group {i}",
+                    slug=f"dynamic-group-{i}",
+                    content_type_id=Device._meta.pk,
+                    filter={"location": [self.location1.pk]}
+                )
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            refresh_device_membership(self.device1)
+
+        self.assertEqual(len([query for query in queries if "EXISTS" in query["sql"].upper()]), 1)
+        self.assertEqual(self._sources(self.device1), {MembershipSourceChoices.SOURCE_DYNAMIC_GROUP})
+
+    def test_referenced_object_edit_schedules_dynamic_group_rebuild(self):
+        """Test that editing objects dynamic group filters reference enqueues one rebuild on commit."""
+        with mock.patch("service_now_groups.tasks.rebuild_dynamic_group_memberships.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.location2.description = "Updated"
+                self.location2.save()
+                self.device_role.description = "Updated"
+                self.device_role.save()
+                delay.assert_not_called()
+
+        delay.assert_called_once_with()
+
+    def test_dynamic_group_rebuild_task(self):
+        """Test that the background rebuild restores the dynamic-group-sourced memberships."""
+        self.group.dynamic_groups.add(self.dynamic_group)
+        ServiceNowGroupMembership.objects.all().delete()
+
+        self.assertEqual(rebuild_dynamic_group_memberships(), 1)
+        self.assertEqual(self._sources(self.device1), {MembershipSourceChoices.SOURCE_DYNAMIC_GROUP})
+
+    def test_device_delete_removes_memberships(self):
+        """Test that deleting a device removes its memberships."""
+        self.group.devices.add(self.device1)
+        self.device1.delete()
+
+        self.assertFalse(self.group.memberships.exists())
+
+    def test_rebuild_all_memberships(self):
+        """Test that a full rebuild restores lost rows."""
+        self.group.locations.add(self.location1)
+        self.group.devices.add(self.device2)
+        ServiceNowGroupMembership.objects.all().delete()
+
+        written = rebuild_all_memberships()
+
+        self.assertEqual(written, 2)
+        self.assertEqual(self.group.device_count, 2)
+
+    def test_live_resolution_matches_membership_table(self):
+        """Test that live resolution is a single lazy query agreeing with the table."""
+        self.group.locations.add(self.location1)
+        self.group.dynamic_groups.add(self.dynamic_group)
+        self.group.devices.add(self.device2)
+
+        live_devices = self.group.get_associated_devices(live=True)
+        with self.assertNumQueries(1):
+            self.assertEqual(live_devices.count(), 2)
+        self.assertEqual(set(live_devices), set(self.group.get_associated_devices()))
+
+    def test_rebuild_only_writes_changed_rows(self):
+        """Test that an unchanged group rebuild writes nothing."""
+        self.group.locations.add(self.location1)
+
+        self.assertEqual(rebuild_group_membership(self.group), 0)
+
+    def test_refresh_device_counts(self):
+        """Test that the stored device count matches the membership table once refreshed."""
+        self.group.locations.add(self.location1)
+        self.group.devices.add(self.device1, self.device2)
+
+        self.assertEqual(refresh_device_counts([str(self.group.pk)]), 1)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.cached_device_count, 2)
+
+        self.group.devices.clear()
+        self.group.locations.clear()
+        refresh_device_counts()
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.cached_device_count, 0)
+
+    def test_membership_change_schedules_device_count_refresh(self):
+        """Test that a membership change enqueues a device count refresh on commit."""
+        with mock.patch("service_now_groups.tasks.refresh_device_counts.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.group.locations.add(self.location1)
+
+        delay.assert_called_once()
+        self.assertIn(str(self.group.pk), delay.call_args[0][0])
+
+    def test_device_count_refreshes_are_batched_per_transaction(self):
+        """Test that every membership change of one transaction is refreshed by a single task."""
+        other_group = ServiceNowGroup.objects.create(name="Other Group")
+
+        with mock.patch("service_now_groups.tasks.refresh_device_counts.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.group.locations.add(self.location1)
+                self.group.devices.add(self.device2)
+                other_group.devices.add(self.device1)
+
+        delay.assert_called_once()
+        self.assertTrue({str(self.group.pk), str(other_group.pk)} <= set(delay.call_args[0][0]))
+
+    def test_device_count_refresh_can_be_suspended(self):
+        """Test that no refresh is enqueued while refreshes are suspended."""
+        with mock.patch("service_now_groups.tasks.refresh_device_counts.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True), device_count_refresh_suspended():
+                self.group.locations.add(self.location1)
+
+        delay.assert_not_called()
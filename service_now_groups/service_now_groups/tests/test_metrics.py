@@ -0,0 +1,145 @@
+"""Tests for the Prometheus metrics of the ServiceNow Groups app."""
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+from nautobot.extras.models import DynamicGroup
+
+from service_now_groups import ServiceNowGroupsConfig, cache, resolver, stats
+from service_now_groups.member_sets import member_set_cache
+from service_now_groups.metrics import metrics
+from service_now_groups.models import ServiceNowGroup
+from service_now_groups.resolver import DynamicGroupEvaluator, ServiceNowGroupResolver
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def sample_value(name, labels=None):
+    """Return the value of one sample collected from the app's metrics, or None if it is absent."""
+    for collector in metrics:
+        for family in collector():
+            for sample in family.samples:
+                if sample.name == name and sample.labels == (labels or {}):
+                    return sample.value
+    return None
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MetricsTestCase(TestCase):
+    """Test cases for the resolution, evaluation, group size and cache metrics."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create test location and devices
+        self.location = Location.objects.create(name="Test Location", slug="test-location")
+        self.devices = [
+            Device.objects.create(
+                name=f"Test Device {i}",
+                device_type=self.device_type,
+                device_role=self.device_role,
+                location=self.location,
+                status=self.status
+            )
+            for i in range(3)
+        ]
+
+        # Create test ServiceNow groups
+        self.group = ServiceNowGroup.objects.create(name="Location Group")
+        self.group.locations.add(self.location)
+        self.small_group = ServiceNowGroup.objects.create(name="Device Group")
+        self.small_group.devices.add(self.devices[0])
+
+        self.dynamic_group = DynamicGroup.objects.create(
+            name="Test Dynamic Group",
+            slug="test-dynamic-group",
+            content_type_id=Device._meta.pk,
+            filter={"location": [self.location.slug]}
+        )
+        stats.invalidate()
+
+    def test_app_config_exports_metrics(self):
+        """Test that the app config points Nautobot at the metrics list."""
+        self.assertEqual(ServiceNowGroupsConfig.metrics, "metrics.metrics")
+
+    def test_resolution_time_is_split_by_direction(self):
+        """Test that forward and reverse resolutions are observed separately."""
+        forward = sample_value("nautobot_service_now_groups_resolution_seconds_count", {"direction": "forward"}) or 0
+        reverse = sample_value("nautobot_service_now_groups_resolution_seconds_count", {"direction": "reverse"}) or 0
+
+        self.assertEqual(self.group.device_count, 3)
+        self.assertTrue(self.group.is_device_associated(self.devices[1]))
+        ServiceNowGroupResolver().prefetch([device.pk for device in self.devices])
+
+        self.assertEqual(
+            sample_value("nautobot_service_now_groups_resolution_seconds_count", {"direction": "forward"}),
+            forward + 1,
+        )
+        self.assertEqual(
+            sample_value("nautobot_service_now_groups_resolution_seconds_count", {"direction": "reverse"}),
+            reverse + 2,
+        )
+
+    def test_dynamic_group_evaluations_and_failures_are_counted(self):
+        """Test that every dynamic group evaluation is counted and timed, and failures counted separately."""
+        member_set_cache.clear()
+        evaluations = sample_value("nautobot_service_now_groups_dynamic_group_evaluations_total")
+        failures = sample_value("nautobot_service_now_groups_dynamic_group_evaluation_failures_total")
+        timings = sample_value("nautobot_service_now_groups_dynamic_group_evaluation_seconds_count")
+
+        evaluator = DynamicGroupEvaluator()
+        evaluator.members(self.dynamic_group)
+        evaluator.member_ids(self.dynamic_group)
+        evaluator.member_ids(self.dynamic_group)
+        with mock.patch.object(DynamicGroup, "members", new_callable=mock.PropertyMock, side_effect=ValueError):
+            self.assertIsNone(DynamicGroupEvaluator().members(self.dynamic_group))
+
+        self.assertEqual(
+            sample_value("nautobot_service_now_groups_dynamic_group_evaluations_total"), evaluations + 2
+        )
+        self.assertEqual(
+            sample_value("nautobot_service_now_groups_dynamic_group_evaluation_failures_total"), failures + 1
+        )
+        self.assertEqual(
+            sample_value("nautobot_service_now_groups_dynamic_group_evaluation_seconds_count"), timings + 2
+        )
+
+    def test_slow_evaluations_are_logged(self):
+        """Test that a dynamic group slower to evaluate than the threshold is logged by name."""
+        with mock.patch.object(resolver, "SLOW_EVALUATION_SECONDS", 0):
+            with self.assertLogs("service_now_groups.resolver", level="WARNING") as logs:
+                DynamicGroupEvaluator().members(self.dynamic_group)
+
+        self.assertIn(str(self.dynamic_group), logs.output[0])
+
+    def test_group_size_gauges(self):
+        """Test that group counts and sizes are reported from the statistics."""
+        self.assertEqual(sample_value("nautobot_service_now_groups_groups"), 2)
+        self.assertEqual(sample_value("nautobot_service_now_groups_covered_devices"), 3)
+        self.assertEqual(sample_value("nautobot_service_now_groups_group_size_devices", {"statistic": "min"}), 1)
+        self.assertEqual(sample_value("nautobot_service_now_groups_group_size_devices", {"statistic": "max"}), 3)
+
+    def test_cache_hit_ratio_gauge(self):
+        """Test that the hit ratio follows the membership cache counters."""
+        self.group.device_count
+        self.group.device_count
+
+        statistics = cache.get_statistics()
+        self.assertEqual(
+            sample_value("nautobot_service_now_groups_membership_cache_lookups", {"outcome": "hit"}),
+            statistics["hits"],
+        )
+        self.assertEqual(
+            sample_value("nautobot_service_now_groups_membership_cache_hit_ratio"), statistics["hit_ratio"]
+        )
@@ -0,0 +1,211 @@
+"""Query-count regression tests for the ServiceNow Groups views, API actions and template hooks."""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.context_processors import PermWrapper
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+from nautobot.extras.models import DynamicGroup
+
+from service_now_groups import stats
+from service_now_groups.models import ServiceNowGroup
+from service_now_groups.tasks import refresh_device_counts
+from service_now_groups.template_content import DeviceServiceNowGroups
+from service_now_groups.templatetags.service_now_groups_extras import (
+    device_service_now_groups_panel,
+    device_service_now_groups_count,
+    has_servicenow_groups
+)
+
+User = get_user_model()
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Maximum number of queries per view, action and template hook. Every budget must
+# also hold regardless of the number of groups, locations, dynamic groups and
+# devices involved; tighten a budget here when a change lowers its query count.
+QUERY_BUDGETS = {
+    "api_list": 15,
+    "api_detail": 15,
+    "api_associated_devices": 15,
+    "api_statistics": 5,
+    "ui_list": 50,
+    "ui_detail": 50,
+    "left_page": 10,
+    "panel_tag": 10,
+    "count_tag": 1,
+    "has_servicenow_groups_filter": 1,
+}
+
+# Objects added per round of fan-out.
+GROUPS_PER_ROUND = 5
+LOCATIONS_PER_ROUND = 3
+DYNAMIC_GROUPS_PER_ROUND = 2
+DEVICES_PER_LOCATION = 2
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QueryBudgetTestCase(TestCase):
+    """Test that every view, action and template hook stays within a fixed query budget."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test user
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass123",
+            is_superuser=True,
+            is_staff=True
+        )
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create the device every group applies to
+        self.location = Location.objects.create(name="Test Location", slug="test-location")
+        self.device = Device.objects.create(
+            name="Test Device",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location,
+            status=self.status
+        )
+
+        self.group = None
+        self.rounds = 0
+        self.factory = RequestFactory()
+        self.client.force_login(self.user)
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def _add_fan_out(self):
+        """Add groups assigned to new locations, dynamic groups and devices, and to the test device."""
+        index = self.rounds
+        self.rounds += 1
+
+        locations = [
+            Location.objects.create(name=f"Fan-out Location {index}-{i}", slug=f"fan-out-location-{index}-{i}")
+            for i in range(LOCATIONS_PER_ROUND)
+        ]
+        devices = [
+            Device.objects.create(
+                name=f"Fan-out Device {index}-{i}-{j}",
+                device_type=self.device_type,
+                device_role=self.device_role,
+                location=location,
+                status=self.status
+            )
+            for i, location in enumerate(locations)
+            for j in range(DEVICES_PER_LOCATION)
+        ]
+        dynamic_groups = [
+            DynamicGroup.objects.create(
+                name=f"Fan-out Dynamic Group {index}-{i}",
+                slug=f"fan-out-dynamic-group-{index}-{i}",
+                content_type_id=Device._meta.pk,
+                filter={"location": [location.pk for location in locations]}
+            )
+            for i in range(DYNAMIC_GROUPS_PER_ROUND)
+        ]
+        for i in range(GROUPS_PER_ROUND):
+            group = ServiceNowGroup.objects.create(
+                name=f"Fan-out Group {index}-{i}",
+                description=f"Group {i} of fan-out round {index}"
+            )
+            group.locations.add(self.location, *locations)
+            group.dynamic_groups.add(*dynamic_groups)
+            group.devices.add(self.device, *devices)
+            self.group = self.group or group
+
+        # Stored device counts are refreshed in the background after commit
+        refresh_device_counts()
+
+    def _request(self):
+        """Return a request by the test user."""
+        request = self.factory.get("/")
+        request.user = self.user
+        return request
+
+    def _run(self, name):
+        """Run one budgeted operation against fresh instances and return its number of queries."""
+        # Fresh instances, so nothing memoized on them by an earlier run is reused
+        device = Device.objects.get(pk=self.device.pk)
+        request = self._request()
+        stats.invalidate()
+
+        with CaptureQueriesContext(connection) as queries:
+            if name == "api_list":
+                response = self.api_client.get(reverse("plugins-api:service_now_groups-api:servicenowgroup-list"))
+            elif name == "api_detail":
+                response = self.api_client.get(
+                    reverse("plugins-api:service_now_groups-api:servicenowgroup-detail", kwargs={"pk": self.group.pk})
+                )
+            elif name == "api_associated_devices":
+                response = self.api_client.get(
+                    reverse(
+                        "plugins-api:service_now_groups-api:servicenowgroup-associated-devices",
+                        kwargs={"pk": self.group.pk},
+                    )
+                )
+            elif name == "api_statistics":
+                response = self.api_client.get(reverse("plugins-api:service_now_groups-api:servicenowgroup-statistics"))
+            elif name == "ui_list":
+                response = self.client.get(reverse("service_now_groups:servicenowgroup_list"))
+            elif name == "ui_detail":
+                response = self.client.get(
+                    reverse("service_now_groups:servicenowgroup_detail", kwargs={"pk": self.group.pk})
+                )
+            elif name == "left_page":
+                extension = DeviceServiceNowGroups({
+                    'object': device,
+                    'request': request,
+                    'settings': settings,
+                    'perms': PermWrapper(self.user),
+                })
+                response = extension.left_page(request, device)
+            elif name == "panel_tag":
+                context = device_service_now_groups_panel({'object': device, 'request': request})
+                response = render_to_string(
+                    'service_now_groups/device_service_now_groups.html', context, request=request
+                )
+            elif name == "count_tag":
+                response = device_service_now_groups_count({'object': device, 'request': request})
+            elif name == "has_servicenow_groups_filter":
+                response = has_servicenow_groups(device)
+
+        if hasattr(response, "status_code"):
+            self.assertEqual(response.status_code, 200, name)
+        return len(queries)
+
+    def _run_all(self):
+        """Return the number of queries of every budgeted operation."""
+        return {name: self._run(name) for name in QUERY_BUDGETS}
+
+    def test_query_budgets_hold_at_any_fan_out(self):
+        """Test every query budget with one round of fan-out and again with four."""
+        self._add_fan_out()
+        # Warm one-off caches such as content types before measuring
+        self._run_all()
+        small = self._run_all()
+
+        for _ in range(3):
+            self._add_fan_out()
+        large = self._run_all()
+
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(name=name):
+                self.assertEqual(large[name], small[name], f"{name} queries grow with the number of objects")
+                self.assertLessEqual(large[name], budget, f"{name} exceeds its query budget")
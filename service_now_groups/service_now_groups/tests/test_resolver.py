@@ -0,0 +1,91 @@
+"""Tests for the ServiceNow Groups membership resolver."""
+
+from unittest import mock
+
+from django.test import TestCase, RequestFactory
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+from nautobot.extras.models import DynamicGroup
+
+from service_now_groups.member_sets import member_set_cache
+from service_now_groups.membership import rebuild_groups_membership
+from service_now_groups.models import ServiceNowGroup
+from service_now_groups.resolver import ServiceNowGroupResolver
+
+
+class ServiceNowGroupResolverTestCase(TestCase):
+    """Test cases for ServiceNowGroupResolver and DynamicGroupEvaluator."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test locations
+        self.location1 = Location.objects.create(name="Test Location 1", slug="test-location-1")
+        self.location2 = Location.objects.create(name="Test Location 2", slug="test-location-2")
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create test devices
+        self.device1 = Device.objects.create(
+            name="Test Device 1",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location1,
+            status=self.status
+        )
+        self.device2 = Device.objects.create(
+            name="Test Device 2",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location2,
+            status=self.status
+        )
+
+        # Create test dynamic group shared by several ServiceNow groups
+        self.dynamic_group = DynamicGroup.objects.create(
+            name="Test Dynamic Group",
+            slug="test-dynamic-group",
+            content_type_id=Device._meta.pk,
+            filter={"location": [self.location1.pk]}
+        )
+        self.groups = []
+        for i in range(5):
+            group = ServiceNowGroup.objects.create(name=f"Test Group {i}")
+            group.dynamic_groups.add(self.dynamic_group)
+            self.groups.append(group)
+
+        self.factory = RequestFactory()
+
+    def test_resolver_answers_every_group_check_from_one_query(self):
+        """Test that all group checks for a device cost a single query."""
+        resolver = ServiceNowGroupResolver()
+
+        with self.assertNumQueries(1):
+            for group in self.groups:
+                self.assertTrue(resolver.is_device_associated(group, self.device1))
+                self.assertFalse(resolver.is_device_associated(group, self.device2))
+
+    def test_resolver_is_shared_per_request(self):
+        """Test that the resolver is memoized on the request."""
+        request = self.factory.get('/')
+
+        self.assertIs(ServiceNowGroupResolver.for_request(request), ServiceNowGroupResolver.for_request(request))
+        self.assertIsNot(ServiceNowGroupResolver.for_request(request), ServiceNowGroupResolver.for_request(None))
+
+    def test_shared_dynamic_group_is_evaluated_once(self):
+        """Test that rebuilding several groups evaluates a shared dynamic group once."""
+        # Start without the member set evaluated while the groups were set up
+        member_set_cache.clear()
+        with mock.patch.object(
+            DynamicGroup, "members", new_callable=mock.PropertyMock, return_value=Device.objects.none()
+        ) as dynamic_group_members:
+            rebuild_groups_membership([group.pk for group in self.groups])
+
+        self.assertEqual(dynamic_group_members.call_count, 1)
@@ -0,0 +1,66 @@
+"""Tests for the bulk synthetic topology seeder."""
+
+import io
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from nautobot.dcim.models import Device, Location
+
+from service_now_groups.models import ServiceNowGroup, ServiceNowGroupMembership
+from service_now_groups.seeding import seed_topology
+
+
+class SeedTopologyTestCase(TestCase):
+    """Test cases for seed_topology and the generate_synthetic_data command."""
+
+    def _assignments(self, prefix):
+        """Return every seeded group's assignments by name, without the prefix."""
+        return {
+            group.name[len(prefix):]: (
+                group.include_descendant_locations,
+                sorted(location.name[len(prefix):] for location in group.locations.all()),
+                sorted(device.name[len(prefix):] for device in group.devices.all()),
+            )
+            for group in ServiceNowGroup.objects.filter(name__startswith=prefix).prefetch_related("locations", "devices")
+        }
+
+    def test_seed_topology_counts(self):
+        """Test that the requested topology is created with consistent memberships."""
+        counts = seed_topology(regions=2, sites_per_region=3, devices_per_site=4, groups=10, dynamic_groups=3)
+
+        self.assertEqual(counts["locations"], 8)
+        self.assertEqual(counts["devices"], 24)
+        self.assertEqual(counts["dynamic_groups"], 3)
+        self.assertEqual(counts["groups"], 10)
+        self.assertEqual(Device.objects.filter(name__startswith="seed-").count(), 24)
+        self.assertEqual(
+            ServiceNowGroup.devices.through.objects.count(),
+            counts["device_assignments"],
+        )
+        for group in ServiceNowGroup.objects.all():
+            self.assertEqual(group.cached_device_count, group.get_associated_devices(live=True).count())
+        self.assertEqual(ServiceNowGroupMembership.objects.count(), counts["memberships"])
+
+    def test_seed_is_deterministic(self):
+        """Test that the same seed produces the same assignments."""
+        seed_topology(regions=2, sites_per_region=2, devices_per_site=3, groups=8, dynamic_groups=2, prefix="one")
+        seed_topology(regions=2, sites_per_region=2, devices_per_site=3, groups=8, dynamic_groups=2, prefix="two")
+
+        self.assertEqual(self._assignments("one"), self._assignments("two"))
+
+    def test_existing_prefix_is_rejected(self):
+        """Test that seeding twice with the same prefix fails in the management command."""
+        call_command(
+            "generate_synthetic_data",
+            "--regions", "1",
+            "--sites-per-region", "1",
+            "--devices-per-site", "2",
+            "--groups", "2",
+            stdout=io.StringIO(),
+        )
+
+        self.assertTrue(Location.objects.filter(slug="seed-region-000").exists())
+        with self.assertRaises(CommandError):
+            call_command("generate_synthetic_data", "--regions", "1", stdout=io.StringIO())
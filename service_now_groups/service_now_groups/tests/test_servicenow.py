@@ -0,0 +1,173 @@
+"""Tests for pushing ServiceNow group membership to ServiceNow."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase, TestCase
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+
+from service_now_groups.models import ServiceNowGroup
+from service_now_groups.servicenow import (
+    API_TABLE,
+    ServiceNowClient,
+    ServiceNowError,
+    push_group_membership,
+)
+
+
+class MockServiceNowServer:
+    """
+    Local HTTP server standing in for a ServiceNow instance.
+
+    Every request is recorded in ``requests`` as ``(path, body, headers)``. The
+    ``(status, headers)`` pairs queued in ``responses`` are answered first, in
+    order; afterwards every request is answered with 201 Created.
+    """
+
+    def __init__(self):
+        """Start the server on a free local port."""
+        self.requests = []
+        self.responses = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server._lock:
+                    server.requests.append((self.path, body, dict(self.headers)))
+                    status, headers = server.responses.pop(0) if server.responses else (201, {})
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(b'{"result": []}')
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the server."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class ServiceNowClientTestCase(SimpleTestCase):
+    """Test cases for ServiceNowClient against a mock ServiceNow server."""
+
+    def setUp(self):
+        """Start the mock server and a client that records its retry delays."""
+        self.server = MockServiceNowServer()
+        self.addCleanup(self.server.stop)
+        self.delays = []
+        self.client = ServiceNowClient(
+            self.server.url,
+            username="nautobot",
+            password="secret",
+            table="u_staging",
+            batch_size=10,
+            max_workers=3,
+            max_retries=2,
+            sleep=self.delays.append,
+        )
+
+    def _records(self, count):
+        return [{"u_device_name": f"device-{i}"} for i in range(count)]
+
+    def test_records_are_pushed_in_batches(self):
+        """Test that records are sent to insertMultiple in batches of batch_size."""
+        result = self.client.push(self._records(25))
+
+        self.assertEqual((result.records, result.batches, result.requests), (25, 3, 3))
+        self.assertEqual({path for path, _, _ in self.server.requests}, {"/api/now/import/u_staging/insertMultiple"})
+        self.assertEqual(sorted(len(body["records"]) for _, body, _ in self.server.requests), [5, 10, 10])
+        self.assertTrue(self.server.requests[0][2]["Authorization"].startswith("Basic "))
+
+    def test_table_api_posts_each_record(self):
+        """Test that the table API receives one request per record."""
+        self.client.api = API_TABLE
+        result = self.client.push(self._records(4))
+
+        self.assertEqual(result.requests, 4)
+        self.assertEqual({path for path, _, _ in self.server.requests}, {"/api/now/table/u_staging"})
+
+    def test_rate_limit_honors_retry_after(self):
+        """Test that a 429 response is retried after the Retry-After delay."""
+        self.server.responses = [(429, {"Retry-After": "7"})]
+        result = self.client.push(self._records(1))
+
+        self.assertEqual(result.retries, 1)
+        self.assertEqual(self.delays, [7.0])
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_server_errors_back_off_exponentially(self):
+        """Test that 5xx responses are retried with growing delays and eventually fail."""
+        self.server.responses = [(503, {})] * 3
+
+        with self.assertRaises(ServiceNowError):
+            self.client.push(self._records(1))
+        self.assertEqual(self.delays, [0.5, 1.0])
+
+    def test_client_errors_are_not_retried(self):
+        """Test that a 4xx response other than 429 fails immediately."""
+        self.server.responses = [(403, {})]
+
+        with self.assertRaises(ServiceNowError):
+            self.client.push(self._records(1))
+        self.assertEqual(len(self.server.requests), 1)
+
+
+class PushGroupMembershipTestCase(TestCase):
+    """Test cases for push_group_membership."""
+
+    def setUp(self):
+        """Set up test data and the mock server."""
+        # Create test location
+        self.location = Location.objects.create(name="Test Location", slug="test-location")
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create test devices
+        for i in range(3):
+            Device.objects.create(
+                name=f"Test Device {i}",
+                device_type=self.device_type,
+                device_role=self.device_role,
+                location=self.location,
+                status=self.status
+            )
+
+        self.group = ServiceNowGroup.objects.create(name="Test Group")
+        self.group.locations.add(self.location)
+
+        self.server = MockServiceNowServer()
+        self.addCleanup(self.server.stop)
+
+    def test_push_group_membership(self):
+        """Test that every device of the group is pushed as a prefixed record."""
+        client = ServiceNowClient(self.server.url, batch_size=2)
+        result = push_group_membership(self.group, client=client)
+
+        self.assertEqual((result.records, result.batches), (3, 2))
+        records = [record for _, body, _ in self.server.requests for record in body["records"]]
+        self.assertEqual(
+            sorted(record["u_device_name"] for record in records),
+            ["Test Device 0", "Test Device 1", "Test Device 2"],
+        )
+        self.assertEqual({record["u_group_name"] for record in records}, {"Test Group"})
@@ -0,0 +1,103 @@
+"""Tests for ServiceNow group membership snapshots and diffs."""
+
+import time
+import uuid
+
+from django.test import SimpleTestCase, TestCase
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+
+from service_now_groups.models import ServiceNowGroup
+from service_now_groups.snapshots import diff_sorted, get_membership_diff, pack, take_snapshot, unpack
+
+
+class MembershipSnapshotTestCase(TestCase):
+    """Test cases for taking snapshots and diffing against them."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test locations
+        self.location1 = Location.objects.create(name="Test Location 1", slug="test-location-1")
+        self.location2 = Location.objects.create(name="Test Location 2", slug="test-location-2")
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create test devices
+        self.device1 = Device.objects.create(
+            name="Test Device 1",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location1,
+            status=self.status
+        )
+        self.device2 = Device.objects.create(
+            name="Test Device 2",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location2,
+            status=self.status
+        )
+
+        self.group = ServiceNowGroup.objects.create(name="Test Group")
+        self.group.locations.add(self.location1)
+
+    def test_diff_without_snapshot_reports_every_device_as_added(self):
+        """Test that a group that was never synced diffs against an empty snapshot."""
+        diff = get_membership_diff(self.group)
+
+        self.assertIsNone(diff.snapshot)
+        self.assertEqual(diff.added, [self.device1.pk])
+        self.assertEqual(diff.removed, [])
+
+    def test_diff_against_latest_snapshot(self):
+        """Test that adds and removes since the latest snapshot are reported."""
+        snapshot = take_snapshot(self.group)
+        self.assertEqual(snapshot.device_count, 1)
+
+        self.group.locations.remove(self.location1)
+        self.group.locations.add(self.location2)
+        diff = get_membership_diff(self.group)
+
+        self.assertEqual(diff.snapshot, snapshot)
+        self.assertEqual(diff.added, [self.device2.pk])
+        self.assertEqual(diff.removed, [self.device1.pk])
+
+    def test_unchanged_membership_has_an_empty_diff(self):
+        """Test that an unchanged group is detected from the snapshot digest."""
+        take_snapshot(self.group)
+        diff = get_membership_diff(self.group)
+
+        self.assertEqual((diff.added, diff.removed), ([], []))
+
+    def test_old_snapshots_are_pruned(self):
+        """Test that only the newest snapshots are retained."""
+        for _ in range(7):
+            take_snapshot(self.group)
+
+        self.assertEqual(self.group.snapshots.count(), 5)
+
+
+class MembershipDiffBenchmarkTestCase(SimpleTestCase):
+    """Benchmark of the merge-based diff."""
+
+    def test_diff_100k_member_groups_under_one_second(self):
+        """Test that diffing two 100k-device snapshots with 1% churn takes under a second."""
+        old = sorted(uuid.uuid4().bytes for _ in range(100_000))
+        new = sorted(old[1000:] + [uuid.uuid4().bytes for _ in range(1000)])
+        old_blob, new_blob = pack(old), pack(new)
+
+        start = time.perf_counter()
+        added, removed = diff_sorted(unpack(old_blob), unpack(new_blob))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual((len(added), len(removed)), (1000, 1000))
+        self.assertEqual(removed, old[:1000])
+        self.assertLess(elapsed, 1.0)
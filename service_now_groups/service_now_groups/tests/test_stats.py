@@ -0,0 +1,79 @@
+"""Tests for the cached ServiceNow group statistics."""
+
+from django.test import TestCase, override_settings
+
+from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manufacturer, Status
+
+from service_now_groups import stats
+from service_now_groups.models import ServiceNowGroup
+from service_now_groups.tasks import refresh_device_counts
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ServiceNowGroupStatisticsTestCase(TestCase):
+    """Test cases for stats.compute_statistics and stats.get_statistics."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test locations
+        self.location1 = Location.objects.create(name="Test Location 1", slug="test-location-1")
+        self.location2 = Location.objects.create(name="Test Location 2", slug="test-location-2")
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create test devices; device 3 is in no group
+        self.devices = [
+            Device.objects.create(
+                name=f"Test Device {i}",
+                device_type=self.device_type,
+                device_role=self.device_role,
+                location=location,
+                status=self.status
+            )
+            for i, location in enumerate([self.location1, self.location1, self.location2], start=1)
+        ]
+
+        # Group 1 covers devices 1 and 2, group 2 covers device 1 again, group 3 is empty
+        group1 = ServiceNowGroup.objects.create(name="Test Group 1")
+        group1.locations.add(self.location1)
+        group2 = ServiceNowGroup.objects.create(name="Test Group 2")
+        group2.devices.add(self.devices[0])
+        ServiceNowGroup.objects.create(name="Test Group 3")
+
+        # Stored device counts are refreshed in the background after commit
+        refresh_device_counts()
+
+    def test_compute_statistics_in_one_query(self):
+        """Test that every aggregate is computed by a single query."""
+        with self.assertNumQueries(1):
+            statistics = stats.compute_statistics()
+
+        self.assertEqual(statistics["total_groups"], 3)
+        self.assertEqual(statistics["groups_with_locations"], 1)
+        self.assertEqual(statistics["groups_with_devices"], 1)
+        self.assertEqual(statistics["groups_with_dynamic_groups"], 0)
+        self.assertEqual(statistics["total_devices"], 3)
+        self.assertEqual(statistics["covered_devices"], 2)
+        self.assertEqual(statistics["uncovered_devices"], 1)
+        self.assertEqual(statistics["group_size"], {"min": 0, "median": 1, "p95": 2, "max": 2})
+        self.assertEqual(statistics["average_groups_per_device"], 1.5)
+
+    def test_statistics_are_cached_until_membership_changes(self):
+        """Test that cached statistics are reused and dropped on membership changes."""
+        self.assertEqual(stats.get_statistics()["covered_devices"], 2)
+        with self.assertNumQueries(0):
+            stats.get_statistics()
+
+        ServiceNowGroup.objects.get(name="Test Group 3").locations.add(self.location2)
+
+        self.assertEqual(stats.get_statistics()["covered_devices"], 3)
@@ -0,0 +1,330 @@
+"""Tests for the API-based synthetic data generator, generate_synthetic_data_via_api.py."""
+
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+# The script lives at the repository root, next to the app's project directory
+SCRIPT_PATH = Path(__file__).resolve().parents[3] / "generate_synthetic_data_via_api.py"
+
+
+def load_script():
+    """Import the generator script as a module."""
+    spec = importlib.util.spec_from_file_location("generate_synthetic_data_via_api", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeAPI:
+    """In-memory stand-in for the Nautobot REST API, recording every request."""
+
+    def __init__(self):
+        """Initialize with no objects."""
+        self.objects = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.next_id = 1
+
+    def _create(self, endpoint, payload):
+        with self.lock:
+            pk = f"{endpoint.strip('/').replace('/', '-')}-{self.next_id}"
+            self.next_id += 1
+            obj = {**payload, "id": pk, "url": f"http://nautobot/api/{endpoint}{pk}/"}
+            self.objects.setdefault(endpoint, []).append(obj)
+        return dict(obj)
+
+    def _update(self, pk, changes):
+        for objects in self.objects.values():
+            for obj in objects:
+                if obj["id"] == pk:
+                    obj.update(changes)
+                    return dict(obj)
+        return None
+
+    def get(self, endpoint, params=None):
+        """Return one page of the objects of ``endpoint``."""
+        params = params or {}
+        with self.lock:
+            self.requests.append(("GET", endpoint))
+        objects = self.objects.get(endpoint, [])
+        offset, limit = params.get("offset", 0), params.get("limit", 50)
+        return {"count": len(objects), "results": [dict(obj) for obj in objects[offset:offset + limit]]}
+
+    def post(self, endpoint, data):
+        """Create one object, or a list of objects."""
+        with self.lock:
+            self.requests.append(("POST", endpoint))
+        if isinstance(data, list):
+            return [self._create(endpoint, payload) for payload in data]
+        return self._create(endpoint, data)
+
+    def patch(self, url, data):
+        """Update one object by its URL, or a list of objects by their IDs."""
+        with self.lock:
+            self.requests.append(("PATCH", url))
+        if isinstance(data, list):
+            return [self._update(item["id"], {k: v for k, v in item.items() if k != "id"}) for item in data]
+        return self._update(url.rstrip("/").rsplit("/", 1)[-1], data)
+
+    def count(self, method):
+        """Return the number of requests made with ``method``."""
+        return sum(1 for request_method, _ in self.requests if request_method == method)
+
+
+@unittest.skipUnless(SCRIPT_PATH.exists(), "generate_synthetic_data_via_api.py is not available")
+class SyntheticDataTestCase(SimpleTestCase):
+    """Shared setup running the generator against a FakeAPI."""
+
+    def setUp(self):
+        """Load a fresh copy of the script and route its requests to a FakeAPI."""
+        self.script = load_script()
+        self.api = FakeAPI()
+        for name, method in (("api_get", self.api.get), ("api_post", self.api.post), ("api_patch", self.api.patch)):
+            patcher = mock.patch.object(self.script, name, side_effect=method)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.checkpoint = mock.Mock()
+
+    def submit(self, *waves, created=None):
+        """Submit ``waves`` in order, silencing progress output, and return the created objects."""
+        created = {} if created is None else created
+        with redirect_stdout(io.StringIO()):
+            for wave in waves:
+                self.script.submit_wave(wave, created, self.checkpoint)
+        return created
+
+
+class WaveSubmissionTestCase(SyntheticDataTestCase):
+    """Test cases for dependency-ordered, parallel wave submission."""
+
+    def test_object_graph_is_in_dependency_order(self):
+        """Test that every reference points to an object of the same or an earlier wave."""
+        waves = self.script.build_object_graph()
+
+        self.assertEqual(
+            [wave.name for wave in waves],
+            [
+                "location-types",
+                "sites",
+                "locations",
+                "manufacturers",
+                "device-roles",
+                "device-types",
+                "devices",
+                "dynamic-groups",
+                "servicenow-groups",
+            ],
+        )
+        seen = {}
+        for wave in waves:
+            seen[wave.name] = wave.objects
+            for payload in wave.objects.values():
+                for ref_wave, ref_key in self.script.references(payload):
+                    self.assertIn(ref_wave, seen, f"{wave.name} references later wave {ref_wave}")
+                    self.assertIn(ref_key, seen[ref_wave])
+
+    def test_nested_objects_are_submitted_after_their_parents(self):
+        """Test that same-wave references are resolved to the IDs of objects created in an earlier tier."""
+        wave = self.script.Wave(
+            "locations",
+            "dcim/locations/",
+            ["name"],
+            False,
+            {
+                "campus": {"name": "Campus", "parent": ("locations", "region")},
+                "region": {"name": "Region"},
+            },
+        )
+
+        created = self.submit(wave)
+
+        region, campus = created["locations"]["region"], created["locations"]["campus"]
+        self.assertEqual(campus["parent"], region["id"])
+        self.assertEqual(self.api.count("POST"), 2)
+
+    def test_bulk_waves_are_posted_in_batches(self):
+        """Test that bulk waves are created with one list POST per batch."""
+        wave = self.script.Wave(
+            "devices", "dcim/devices/", ["name"], True, {f"device-{i}": {"name": f"Device {i}"} for i in range(5)}
+        )
+
+        with mock.patch.object(self.script, "BATCH_SIZE", 2):
+            created = self.submit(wave)
+
+        self.assertEqual(len(created["devices"]), 5)
+        self.assertEqual(self.api.count("POST"), 3)
+
+    def test_unresolvable_objects_are_skipped(self):
+        """Test that objects whose dependencies were not created are skipped rather than submitted."""
+        wave = self.script.Wave(
+            "devices", "dcim/devices/", ["name"], False, {"orphan": {"name": "Orphan", "location": ("locations", "x")}}
+        )
+
+        created = self.submit(wave)
+
+        self.assertEqual(created["devices"], {})
+        self.assertEqual(self.api.count("POST"), 0)
+
+    def test_throughput_summary(self):
+        """Test that each wave is recorded in the throughput summary."""
+        wave = self.script.Wave("manufacturers", "dcim/manufacturers/", ["slug"], False, {"acme": {"slug": "acme"}})
+
+        self.submit(wave)
+
+        ((name, objects, created, updated, _, _),) = self.script.THROUGHPUT.waves
+        self.assertEqual((name, objects, created, updated), ("manufacturers", 1, 1, 0))
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.script.THROUGHPUT.print_summary()
+        self.assertIn("manufacturers", output.getvalue())
+
+
+class ExistenceIndexTestCase(SyntheticDataTestCase):
+    """Test cases for indexing existing objects once per wave instead of per-object lookups."""
+
+    def _wave(self, objects):
+        """Return a bulk device wave of ``objects``."""
+        return self.script.Wave("devices", "dcim/devices/", ["name"], True, objects)
+
+    def test_fetch_index_reads_every_page(self):
+        """Test that existing objects are listed in pages and keyed by their unique fields."""
+        for i in range(5):
+            self.api.post("dcim/locations/", {"name": f"Location {i}", "parent": {"id": "parent-1", "display": "Parent"}})
+        self.api.requests.clear()
+        wave = self.script.Wave("locations", "dcim/locations/", ["name", "parent"], False, {})
+
+        with mock.patch.object(self.script, "PAGE_SIZE", 2):
+            index = self.script.fetch_index(wave)
+
+        self.assertEqual(set(index), {(f"Location {i}", "parent-1") for i in range(5)})
+        self.assertEqual(self.api.count("GET"), 3)
+
+    def test_rerun_sends_no_writes(self):
+        """Test that submitting the same objects again only reads."""
+        objects = {f"device-{i}": {"name": f"Device {i}", "serial": str(i)} for i in range(3)}
+        self.submit(self._wave(objects))
+        self.api.requests.clear()
+
+        created = self.submit(self._wave(objects))
+
+        self.assertEqual(len(created["devices"]), 3)
+        self.assertEqual(self.api.count("POST"), 0)
+        self.assertEqual(self.api.count("PATCH"), 0)
+        self.assertEqual(self.api.count("GET"), 1)
+
+    def test_only_missing_objects_are_created_and_differences_patched(self):
+        """Test that a rerun creates what is missing and patches only the fields that differ."""
+        self.submit(self._wave({"device-0": {"name": "Device 0", "serial": "0", "tags": ["a", "b"]}}))
+        self.api.requests.clear()
+
+        self.submit(
+            self._wave(
+                {
+                    "device-0": {"name": "Device 0", "serial": "changed", "tags": ["b", "a"]},
+                    "device-1": {"name": "Device 1", "serial": "1", "tags": []},
+                }
+            )
+        )
+
+        self.assertEqual(self.api.count("POST"), 1)
+        self.assertEqual(self.api.count("PATCH"), 1)
+        device = next(obj for obj in self.api.objects["dcim/devices/"] if obj["name"] == "Device 0")
+        self.assertEqual(device["serial"], "changed")
+
+    def test_differences(self):
+        """Test that nested objects compare by ID and lists regardless of order."""
+        existing = {"parent": {"id": "parent-1"}, "tags": [{"id": "b"}, {"id": "a"}], "status": {"value": "active"}}
+
+        self.assertEqual(
+            self.script.differences(existing, {"parent": "parent-1", "tags": ["a", "b"], "status": "active"}), {}
+        )
+        self.assertEqual(self.script.differences(existing, {"parent": "parent-2", "new": 1}), {"parent": "parent-2"})
+
+
+class CheckpointTestCase(SyntheticDataTestCase):
+    """Test cases for checkpointed, resumable runs."""
+
+    def setUp(self):
+        """Write checkpoints to a temporary directory."""
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "checkpoint.json")
+        self.settings = {"api_url": "http://nautobot/api/", "scale": 1}
+
+    def _checkpoint(self, settings=None):
+        """Return a checkpoint at the test path."""
+        return self.script.Checkpoint(self.path, settings or self.settings)
+
+    def test_round_trip(self):
+        """Test that completed waves and created IDs are reloaded as written, without temporary files left."""
+        checkpoint = self._checkpoint()
+        checkpoint.add("sites", {"site-a": {"id": "1"}})
+        checkpoint.complete("sites")
+
+        resumed = self._checkpoint()
+        with redirect_stdout(io.StringIO()):
+            resumed.load()
+
+        self.assertEqual(resumed.completed, ["sites"])
+        self.assertEqual(resumed.created(), {"sites": {"site-a": {"id": "1"}}})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["checkpoint.json"])
+
+    def test_missing_checkpoint_starts_from_the_beginning(self):
+        """Test that resuming without a checkpoint file starts empty."""
+        checkpoint = self._checkpoint()
+        with redirect_stdout(io.StringIO()):
+            checkpoint.load()
+
+        self.assertEqual((checkpoint.completed, checkpoint.created()), ([], {}))
+
+    def test_different_settings_are_refused(self):
+        """Test that a checkpoint written with other settings is not resumed."""
+        self._checkpoint().save(force=True)
+
+        with self.assertRaises(SystemExit):
+            self._checkpoint({**self.settings, "scale": 2}).load()
+
+    def test_saves_are_throttled(self):
+        """Test that progress is written at most once per interval unless forced."""
+        checkpoint = self._checkpoint()
+        checkpoint.save(force=True)
+        checkpoint.ids = {"sites": {"site-a": "1"}}
+
+        checkpoint.save()
+        with open(self.path) as checkpoint_file:
+            self.assertEqual(json.load(checkpoint_file)["ids"], {})
+
+        checkpoint.save(force=True)
+        with open(self.path) as checkpoint_file:
+            self.assertEqual(json.load(checkpoint_file)["ids"], {"sites": {"site-a": "1"}})
+
+    def test_resume_skips_recorded_objects(self):
+        """Test that objects recorded before an interruption are not submitted again."""
+        wave = self.script.Wave(
+            "devices", "dcim/devices/", ["name"], False, {f"device-{i}": {"name": f"Device {i}"} for i in range(3)}
+        )
+        interrupted = self._checkpoint()
+        interrupted.add("devices", {"device-0": self.api.post("dcim/devices/", {"name": "Device 0"})})
+        interrupted.save(force=True)
+        self.api.requests.clear()
+
+        resumed = self._checkpoint()
+        with redirect_stdout(io.StringIO()):
+            resumed.load()
+        self.checkpoint = resumed
+        created = self.submit(wave, created=resumed.created())
+
+        self.assertEqual(self.api.count("POST"), 2)
+        self.assertEqual(set(created["devices"]), {"device-0", "device-1", "device-2"})
+        self.assertEqual(resumed.completed, ["devices"])
@@ -1,7 +1,11 @@
 """Tests for the ServiceNow Groups templates."""
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.context_processors import PermWrapper
+from django.db import connection
 from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.template import Context, Template
 from django.template.loader import render_to_string
@@ -10,6 +14,7 @@ from nautobot.dcim.models import Device, Location, DeviceRole, DeviceType, Manuf
 from nautobot.extras.models import DynamicGroup
 
 from service_now_groups.models import ServiceNowGroup
+from service_now_groups.template_content import DeviceServiceNowGroups
 from service_now_groups.templatetags.service_now_groups_extras import (
     device_service_now_groups_panel,
     device_service_now_groups_count,
@@ -217,6 +222,24 @@ class ServiceNowGroupTemplateTestCase(TestCase):
         )
         self.assertFalse(has_servicenow_groups(device3))
 
+    def test_template_tags_count_deduplicates_groups(self):
+        """Test that a group matching a device by several methods is counted once."""
+        self.group1.devices.add(self.device1)
+
+        context = {'object': self.device1}
+        self.assertEqual(device_service_now_groups_count(context), 1)
+
+    def test_template_tags_share_one_resolution_per_request(self):
+        """Test that the panel, count and filter resolve membership once per request."""
+        request = self.factory.get('/')
+        request.user = self.user
+        context = {'object': self.device1, 'request': request}
+
+        device_service_now_groups_panel(context)
+        with self.assertNumQueries(0):
+            self.assertEqual(device_service_now_groups_count(context), 1)
+            self.assertTrue(has_servicenow_groups(self.device1))
+
     def test_template_with_multiple_assignment_methods(self):
         """Test template rendering with multiple assignment methods."""
         # Create a group with multiple assignment methods
@@ -455,4 +478,88 @@ class ServiceNowGroupTemplateIntegrationTestCase(TestCase):
         result = device_service_now_groups_panel(context)
         
         # Device1 should be associated with groups 0, 2, 4, 6, 8 (via location)
-        self.assertEqual(len(result['servicenow_groups']), 5) 
\ No newline at end of file
+        self.assertEqual(len(result['servicenow_groups']), 5)
+
+
+class DeviceServiceNowGroupsQueryCountTestCase(TestCase):
+    """Test that the device detail panel renders in a fixed number of queries."""
+
+    def setUp(self):
+        """Set up test data."""
+        # Create test user
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass123"
+        )
+
+        # Create test location
+        self.location = Location.objects.create(name="Test Location", slug="test-location")
+
+        # Create test device components
+        self.device_role = DeviceRole.objects.create(name="Test Role", slug="test-role")
+        self.manufacturer = Manufacturer.objects.create(name="Test Manufacturer", slug="test-manufacturer")
+        self.device_type = DeviceType.objects.create(
+            manufacturer=self.manufacturer,
+            model="Test Model",
+            slug="test-model"
+        )
+        self.status = Status.objects.get(slug="active")
+
+        # Create test device
+        self.device = Device.objects.create(
+            name="Test Device",
+            device_type=self.device_type,
+            device_role=self.device_role,
+            location=self.location,
+            status=self.status
+        )
+
+        self.factory = RequestFactory()
+
+    def _create_group(self, index, dynamic_group):
+        """Create a group assigned to the test device by every method."""
+        group = ServiceNowGroup.objects.create(
+            name=f"Panel Group {index}",
+            description=f"Group {index} for query count testing"
+        )
+        group.locations.add(self.location)
+        group.dynamic_groups.add(dynamic_group)
+        group.devices.add(self.device)
+        return group
+
+    def _render_panel(self):
+        """Render the panel and return the number of queries it issued."""
+        request = self.factory.get('/')
+        request.user = self.user
+        extension = DeviceServiceNowGroups({
+            'object': self.device,
+            'request': request,
+            'settings': settings,
+            'perms': PermWrapper(self.user),
+        })
+
+        with CaptureQueriesContext(connection) as queries:
+            rendered = extension.left_page(request, self.device)
+        return rendered, len(queries)
+
+    def test_panel_query_count_is_independent_of_group_count(self):
+        """Test the panel query count with 50 groups and 10 dynamic groups."""
+        dynamic_groups = [
+            DynamicGroup.objects.create(
+                name=f"Panel Dynamic Group {i}",
+                slug=f"panel-dynamic-group-{i}",
+                content_type_id=Device._meta.pk,
+                filter={"location": [self.location.pk]}
+            )
+            for i in range(10)
+        ]
+        self._create_group(0, dynamic_groups[0])
+        _, baseline_queries = self._render_panel()
+
+        for i in range(1, 50):
+            self._create_group(i, dynamic_groups[i % 10])
+        rendered, queries = self._render_panel()
+
+        self.assertEqual(queries, baseline_queries)
+        self.assertIn("Panel Group 49", rendered)
+        self.assertIn("1 location(s), 1 dynamic group(s), 1 explicit device(s)", rendered)
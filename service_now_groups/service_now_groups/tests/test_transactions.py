@@ -0,0 +1,43 @@
+"""Tests for work deferred until a transaction commits."""
+
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+
+from service_now_groups.transactions import OnCommitBatch
+
+
+class OnCommitBatchTestCase(TestCase):
+    """Test cases for OnCommitBatch."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.flush = mock.Mock()
+        self.batch = OnCommitBatch(self.flush)
+
+    def test_keys_are_flushed_once_on_commit(self):
+        """Test that keys added within a transaction are flushed together, once, after it commits."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.batch.add(["a", "b"])
+            self.batch.add(["b", "c"])
+            self.flush.assert_not_called()
+
+        self.flush.assert_called_once_with({"a", "b", "c"})
+        self.assertEqual(self.batch.pending, set())
+
+    def test_rolled_back_keys_are_flushed_with_the_next_commit(self):
+        """Test that keys of a rolled back transaction are not lost but flushed with the next commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.batch.add(["a"])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.flush.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.batch.add(["b"])
+
+        self.flush.assert_called_once_with({"a", "b"})
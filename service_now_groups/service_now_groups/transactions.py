@@ -0,0 +1,48 @@
+"""Work collected during a transaction and performed once it commits."""
+
+import threading
+from typing import Callable, Iterable, Set
+
+from django.db import transaction
+
+
+class OnCommitBatch:
+    """
+    Keys collected by a thread and flushed together once its transaction commits.
+
+    Every ``add`` registers an on-commit callback, but only the first callback to
+    run finds keys to flush; the others find the batch empty. Outside a
+    transaction the batch is flushed at once. Keys added in a transaction that is
+    rolled back stay pending and are flushed with the thread's next commit, so
+    ``flush`` must be harmless to call for keys that did not change.
+    """
+
+    def __init__(self, flush: Callable[[Set], None]):
+        """
+        Initialize an empty batch.
+
+        Args:
+            flush: Called with the set of pending keys once they are committed
+        """
+        self._flush = flush
+        self._local = threading.local()
+
+    @property
+    def pending(self) -> Set:
+        """Return the keys of the current thread waiting to be flushed."""
+        if not hasattr(self._local, "keys"):
+            self._local.keys = set()
+        return self._local.keys
+
+    def add(self, keys: Iterable) -> None:
+        """Add ``keys`` to the current thread's batch, to be flushed once the current transaction commits."""
+        self.pending.update(keys)
+        transaction.on_commit(self.flush)
+
+    def flush(self) -> None:
+        """Flush the current thread's pending keys, if any."""
+        keys = self.pending
+        if not keys:
+            return
+        self._local.keys = set()
+        self._flush(keys)
@@ -9,7 +9,8 @@ from .filters import ServiceNowGroupFilterSet
 class ServiceNowGroupUIViewSet(NautobotUIViewSet):
     """UI ViewSet for ServiceNowGroup model."""
 
-    queryset = ServiceNowGroup.objects.all()
+    # Assignments are shown by the detail view and the optional table columns
+    queryset = ServiceNowGroup.objects.prefetch_related("locations", "dynamic_groups", "devices")
     form_class = ServiceNowGroupForm
     table_class = ServiceNowGroupTable
     filterset_class = ServiceNowGroupFilterSet
@@ -18,4 +19,9 @@ class ServiceNowGroupUIViewSet(NautobotUIViewSet):
         """
         Return any additional context data for the object detail view.
         """
-        return {"associated_devices": instance.get_associated_devices()} 
\ No newline at end of file
+        return {
+            "associated_devices": instance.get_associated_devices().select_related(
+                "location", "device_role", "status", "platform"
+            ),
+            "device_count": instance.device_count,
+        } 
\ No newline at end of file